@@ -0,0 +1,24 @@
+"""Index lessons by course for listings and ETag version lookups."""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0003_lesson_course_index"
+down_revision = "0002_course_soft_delete"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_lessons_course_id_updated_at",
+        "lessons",
+        ["course_id", "updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lessons_course_id_updated_at", table_name="lessons")
@@ -0,0 +1,20 @@
+"""Index users by lower-cased email for case-insensitive cohort lookups."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_user_email_lower_index"
+down_revision = "0004_catalog_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from . import auth, courses, enrollments, lessons, stats, users
+from . import admin, auth, courses, debug, enrollments, lessons, stats, users
 
 
 api_router = APIRouter()
@@ -12,5 +12,7 @@ api_router.include_router(courses.router)
 api_router.include_router(lessons.router)
 api_router.include_router(enrollments.router)
 api_router.include_router(stats.router)
+api_router.include_router(admin.router)
+api_router.include_router(debug.router)
 
 __all__ = ["api_router"]
@@ -0,0 +1,37 @@
+"""Administrative routes."""
+
+import io
+
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import require_role
+from app.db.session import get_session
+from app.models import UserRole
+from app.schemas import ImportEntity, ImportFormat, ImportReport
+from app.services.bulk_import import detect_format, get_hashing_pool, import_rows, iter_rows
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+
+@router.post("/import/{entity}", response_model=ImportReport)
+async def bulk_import(
+    entity: ImportEntity,
+    file: UploadFile = File(...),
+    import_format: ImportFormat | None = Query(default=None, alias="format"),
+    session: AsyncSession = Depends(get_session),
+) -> ImportReport:
+    """Bulk import users, courses, lessons or enrollments from a CSV or JSONL upload."""
+
+    file_format = import_format or detect_format(file.filename)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return await import_rows(
+            session,
+            entity,
+            iter_rows(stream, file_format),
+            executor=get_hashing_pool() if entity == ImportEntity.USERS else None,
+        )
+    finally:
+        stream.detach()
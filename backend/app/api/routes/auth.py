@@ -2,12 +2,13 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_user_from_token
+from app.core.dependencies import get_current_profile
+from app.core.rate_limit import limit_by_email
 from app.core.security import create_access_token, get_password_hash, verify_password
 from app.db.session import get_session
 from app.models import User, UserRole
@@ -19,10 +20,12 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
-    payload: UserCreate, session: AsyncSession = Depends(get_session)
+    request: Request, payload: UserCreate, session: AsyncSession = Depends(get_session)
 ) -> AuthResponse:
     """Register a new user account."""
 
+    await limit_by_email(request, payload.email)
+
     result = await session.execute(select(User).where(User.email == payload.email))
     if result.scalars().first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
@@ -63,10 +66,14 @@ async def register_user(
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_session)
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(get_session),
 ) -> Token:
     """Authenticate user and issue JWT."""
 
+    await limit_by_email(request, form_data.username)
+
     result = await session.execute(select(User).where(User.email == form_data.username))
     user = result.scalars().first()
     if not user or not verify_password(form_data.password, user.hashed_password):
@@ -77,7 +84,7 @@ async def login_for_access_token(
 
 
 @router.get("/me", response_model=UserRead)
-async def get_profile(current_user: User = Depends(get_user_from_token)) -> UserRead:
+async def get_profile(current_user: User = Depends(get_current_profile)) -> UserRead:
     """Return the current authenticated user profile."""
 
     return UserRead.model_validate(current_user)
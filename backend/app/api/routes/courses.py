@@ -1,5 +1,6 @@
 """Course management routes."""
 
+import logging
 import os
 import uuid
 from enum import Enum
@@ -7,74 +8,80 @@ from pathlib import Path
 from typing import Annotated
 
 import aiofiles
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+import aiofiles.os
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy import Update, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.config import get_settings
 from app.core.dependencies import get_user_from_token, require_role
-from app.db.session import get_session
-from app.models import Course, CourseStatus, Enrollment, User, UserRole
-from app.schemas import CourseCreate, CourseDetail, CourseRead, CourseSummary, CourseUpdate, LessonRead
+from app.core.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from app.core.serialization import FastJSONResponse, dumps
+from app.db.session import get_session, get_session_factory
+from app.models import Course, CourseStatus, User, UserRole
+from app.schemas import (
+    CourseCreate,
+    CourseDetail,
+    CourseOutline,
+    CourseRead,
+    CourseSummary,
+    CourseUpdate,
+    CourseView,
+)
+from app.services import read_models
+from app.services.course_purge import purge_deleted_course
+from app.services.invalidation import CATALOG, catalog_cache, course_cache, course_key, publish
+from app.services.single_flight import SingleFlight
+from app.utils.errors import missing_or_forbidden
 
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+# Columns needed to build a CourseRead straight from a RETURNING clause.
+COURSE_READ_COLUMNS = read_models.COURSE_COLUMNS
+
+# Concurrent requests for the same course page share one version lookup and
+# one load + serialization.
+course_reads: SingleFlight = SingleFlight("course_reads", timeout=settings.single_flight_timeout_seconds)
+
+
+def _owned_course(statement, course_id: uuid.UUID, current_user: User):
+    """Scope a course statement to one course the current user may modify."""
+
+    statement = statement.where(Course.id == course_id, Course.deleted_at.is_(None))
+    if current_user.role != UserRole.ADMIN:
+        statement = statement.where(Course.instructor_id == current_user.id)
+    if isinstance(statement, Update):
+        statement = statement.execution_options(synchronize_session=False)
+    return statement
+
 
 @router.get("", response_model=list[CourseSummary])
 async def list_courses(
+    request: Request,
     session: AsyncSession = Depends(get_session),
     search: str | None = None,
     category: str | None = None,
     level: str | None = None,
     status_filter: CourseStatus | None = None,
-) -> list[CourseSummary]:
+) -> Response:
     """Return catalog of courses with optional filters."""
 
-    # Use a subquery for enrollment count to avoid GROUP BY issues with relationships
-    enrollment_subquery = (
-        select(Enrollment.course_id, func.count(Enrollment.id).label("enrollment_count"))
-        .group_by(Enrollment.course_id)
-        .subquery()
-    )
+    version = await catalog_cache.get(CATALOG, "version", lambda: read_models.catalog_version(session))
+    etag = make_etag(tuple(version), search, category, level, status_filter)
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.catalog_cache_control)
 
-    query = (
-        select(
-            Course,
-            func.coalesce(enrollment_subquery.c.enrollment_count, 0).label("enrollment_count")
+    async def load_cards() -> bytes:
+        cards = await read_models.catalog_cards(
+            session, search=search, category=category, level=level, status=status_filter
         )
-        .outerjoin(enrollment_subquery, enrollment_subquery.c.course_id == Course.id)
-        .order_by(Course.created_at.desc())
-    )
+        return dumps(cards)
 
-    if search:
-        like_pattern = f"%{search.lower()}%"
-        query = query.where(func.lower(Course.title).like(like_pattern))
-    if category:
-        query = query.where(func.lower(Course.category) == category.lower())
-    if level:
-        query = query.where(func.lower(Course.level) == level.lower())
-    if status_filter:
-        query = query.where(Course.status == status_filter)
-
-    result = await session.execute(query)
-    summaries: list[CourseSummary] = []
-    for course, enrollment_count in result.all():
-        summaries.append(
-            CourseSummary(
-                id=course.id,
-                title=course.title,
-                description=course.description,
-                category=course.category,
-                level=course.level,
-                status=course.status,
-                thumbnail_url=course.thumbnail_url,
-                enrollment_count=int(enrollment_count) if enrollment_count else 0,
-            )
-        )
-    return summaries
+    body = await catalog_cache.get(CATALOG, ("cards", search, category, level, status_filter), load_cards)
+    return FastJSONResponse(body, headers=cache_headers(etag, settings.catalog_cache_control))
 
 
 @router.get(
@@ -85,25 +92,10 @@ async def list_courses(
 async def list_my_courses(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_user_from_token),
-) -> list[CourseRead]:
+) -> FastJSONResponse:
     """Return courses owned by the current instructor."""
 
-    courses = (
-        await session.execute(select(Course).where(Course.instructor_id == current_user.id))
-    ).scalars().all()
-    return [
-        CourseRead(
-            id=course.id,
-            title=course.title,
-            description=course.description,
-            category=course.category,
-            level=course.level,
-            status=course.status,
-            thumbnail_url=course.thumbnail_url,
-            instructor_id=course.instructor_id,
-        )
-        for course in courses
-    ]
+    return FastJSONResponse(await read_models.instructor_courses(session, current_user.id))
 
 
 @router.post("", response_model=CourseRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))])
@@ -113,17 +105,12 @@ async def create_course(
     current_user: User = Depends(get_user_from_token),
 ) -> CourseRead:
     """Create a new course."""
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"Creating course with payload: {payload.model_dump()}")
 
     # Convert enum to its value (lowercase string) for database
     # This ensures we store the enum value, not the enum name
     level_value = payload.level.value if hasattr(payload.level, 'value') else str(payload.level)
     status_value = payload.status.value if hasattr(payload.status, 'value') else str(payload.status)
-    
-    logger.info(f"Converted level: {level_value}, status: {status_value}")
-    
+
     course = Course(
         title=payload.title,
         description=payload.description,
@@ -134,8 +121,11 @@ async def create_course(
         thumbnail_url=payload.thumbnail_url,
     )
     session.add(course)
+    await session.flush()
+    await publish(session, CATALOG, course_key(course.id))
     await session.commit()
     await session.refresh(course)
+    logger.info(f"Course {course.id} created by {current_user.id}")
     return CourseRead(
         id=course.id,
         title=course.title,
@@ -148,45 +138,43 @@ async def create_course(
     )
 
 
-@router.get("/{course_id}", response_model=CourseDetail)
+@router.get("/{course_id}", response_model=CourseDetail | CourseOutline)
 async def get_course(
     course_id: uuid.UUID,
-    session: AsyncSession = Depends(get_session),
-) -> CourseDetail:
-    """Return course detail including lessons."""
-
-    result = await session.execute(
-        select(Course)
-        .where(Course.id == course_id)
-        .options(selectinload(Course.lessons))
+    request: Request,
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    view: CourseView = CourseView.FULL,
+) -> Response:
+    """Return course detail including lessons.
+
+    ``view=outline`` leaves out lesson content and video so course pages can
+    fetch each lesson body on demand from ``GET /lessons/{lesson_id}``.
+    """
+
+    async def load_version():
+        async with sessions() as session:
+            return await read_models.course_version(session, course_id)
+
+    version = await course_cache.get(
+        course_key(course_id), "version", lambda: course_reads.do(("version", course_id), load_version)
     )
-    course = result.scalars().first()
-    if not course:
+    if version is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    etag = make_etag(tuple(version), view)
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.course_cache_control)
 
-    lessons = [
-        LessonRead(
-            id=lesson.id,
-            title=lesson.title,
-            content=lesson.content,
-            video_url=lesson.video_url,
-            position=lesson.position,
-            course_id=lesson.course_id,
-        )
-        for lesson in course.lessons
-    ]
+    async def load_course() -> bytes | None:
+        async with sessions() as session:
+            course = await read_models.course_detail(session, course_id, outline=view == CourseView.OUTLINE)
+        return None if course is None else dumps(course)
 
-    return CourseDetail(
-        id=course.id,
-        title=course.title,
-        description=course.description,
-        category=course.category,
-        level=course.level,
-        status=course.status,
-        thumbnail_url=course.thumbnail_url,
-        instructor_id=course.instructor_id,
-        lessons=lessons,
+    body = await course_cache.get(
+        course_key(course_id), view, lambda: course_reads.do(("detail", course_id, view, etag), load_course)
     )
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return FastJSONResponse(body, headers=cache_headers(etag, settings.course_cache_control))
 
 
 @router.put("/{course_id}", response_model=CourseRead, dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))])
@@ -198,54 +186,46 @@ async def update_course(
 ) -> CourseRead:
     """Update a course belonging to the instructor."""
 
-    course = await session.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot modify this course")
-
     update_data = payload.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(course, key, value)
+    if update_data:
+        statement = update(Course).values(**update_data).returning(*COURSE_READ_COLUMNS)
+    else:
+        statement = select(*COURSE_READ_COLUMNS)
+    row = (await session.execute(_owned_course(statement, course_id, current_user))).first()
+    if row is None:
+        raise await missing_or_forbidden(
+            session, Course, course_id, "Cannot modify this course", Course.deleted_at.is_(None)
+        )
 
-    session.add(course)
+    if update_data:
+        await publish(session, CATALOG, course_key(course_id))
     await session.commit()
-    await session.refresh(course)
-    return CourseRead(
-        id=course.id,
-        title=course.title,
-        description=course.description,
-        category=course.category,
-        level=course.level,
-        status=course.status,
-        thumbnail_url=course.thumbnail_url,
-        instructor_id=course.instructor_id,
-    )
+    return CourseRead.model_validate(row)
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))])
 async def delete_course(
     course_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_user_from_token),
 ) -> None:
-    """Delete a course."""
+    """Delete a course.
 
-    # Load course with relationships to ensure cascade delete works properly
-    result = await session.execute(
-        select(Course)
-        .where(Course.id == course_id)
-        .options(selectinload(Course.enrollments), selectinload(Course.lessons))
-    )
-    course = result.scalars().first()
-    
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot delete this course")
+    The course is hidden immediately by a soft delete; its lessons,
+    enrollments and progress are purged in batches after the response.
+    """
+
+    statement = update(Course).values(deleted_at=func.now()).returning(Course.id)
+    deleted = (await session.execute(_owned_course(statement, course_id, current_user))).first()
+    if deleted is None:
+        raise await missing_or_forbidden(
+            session, Course, course_id, "Cannot delete this course", Course.deleted_at.is_(None)
+        )
 
-    await session.delete(course)
+    await publish(session, CATALOG, course_key(course_id))
     await session.commit()
+    background_tasks.add_task(purge_deleted_course, course_id)
 
 
 @router.post(
@@ -261,34 +241,36 @@ async def upload_thumbnail(
 ) -> CourseRead:
     """Upload and attach a thumbnail image for a course."""
 
-    course = await session.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot modify this course")
-
     extension = Path(file.filename or "thumbnail").suffix
-    filename = f"{course.id}{extension}"
+    filename = f"{course_id}{extension}"
     media_path = Path("media/thumbnails")
     media_path.mkdir(parents=True, exist_ok=True)
     file_path = media_path / filename
+    # Write to a private temp file first; it only replaces the public one
+    # once the ownership-checked UPDATE has matched the course and committed.
+    temp_path = media_path / f".{filename}.{uuid.uuid4().hex}.part"
 
-    async with aiofiles.open(file_path, "wb") as buffer:
+    async with aiofiles.open(temp_path, "wb") as buffer:
         content = await file.read()
         await buffer.write(content)
 
-    course.thumbnail_url = f"/media/thumbnails/{filename}"
-    session.add(course)
-    await session.commit()
-    await session.refresh(course)
-
-    return CourseRead(
-        id=course.id,
-        title=course.title,
-        description=course.description,
-        category=course.category,
-        level=course.level,
-        status=course.status,
-        thumbnail_url=course.thumbnail_url,
-        instructor_id=course.instructor_id,
+    statement = (
+        update(Course)
+        .values(thumbnail_url=f"/media/thumbnails/{filename}")
+        .returning(*COURSE_READ_COLUMNS)
     )
+    row = (await session.execute(_owned_course(statement, course_id, current_user))).first()
+    if row is None:
+        await aiofiles.os.remove(temp_path)
+        raise await missing_or_forbidden(
+            session, Course, course_id, "Cannot modify this course", Course.deleted_at.is_(None)
+        )
+
+    await publish(session, CATALOG, course_key(course_id))
+    try:
+        await session.commit()
+    except BaseException:
+        await aiofiles.os.remove(temp_path)
+        raise
+    await aiofiles.os.replace(temp_path, file_path)
+    return CourseRead.model_validate(row)
@@ -0,0 +1,125 @@
+"""Admin debugging routes."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core import memory
+from app.core.dependencies import require_role
+from app.core.profiling import RequestProfile, profile_store
+from app.models import UserRole
+from app.schemas import (
+    MemorySnapshotComparison,
+    MemorySnapshotReport,
+    MemoryStatus,
+    ObjectCounts,
+    ProfileDetail,
+    ProfileSummary,
+)
+
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_role(UserRole.ADMIN))])
+
+
+def _get_profile(profile_id: str) -> RequestProfile:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles", response_model=list[ProfileSummary])
+async def list_profiles() -> list[RequestProfile]:
+    """List the profiles kept in memory, newest first."""
+
+    return profile_store.recent()
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail)
+async def get_profile(profile_id: str) -> RequestProfile:
+    """Return a profile's folded stacks and the SQL it executed."""
+
+    return _get_profile(profile_id)
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def get_profile_collapsed(profile_id: str) -> str:
+    """Return a profile in the folded stack format read by flamegraph.pl and speedscope."""
+
+    return _get_profile(profile_id).collapsed()
+
+
+def _memory_status() -> MemoryStatus:
+    current, peak = memory.traced_memory()
+    return MemoryStatus(
+        tracing=memory.is_tracing(),
+        current_bytes=current,
+        peak_bytes=peak,
+        snapshots=memory.list_snapshots(),
+    )
+
+
+def _get_snapshot(snapshot_id: int) -> memory.MemorySnapshot:
+    snapshot = memory.get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return snapshot
+
+
+@router.get("/memory", response_model=MemoryStatus)
+async def get_memory_status() -> MemoryStatus:
+    """Report whether allocations are traced in this worker and the snapshots kept."""
+
+    return _memory_status()
+
+
+@router.post("/memory/tracing", response_model=MemoryStatus)
+async def start_memory_tracing(frames: int = Query(default=1, ge=1, le=50)) -> MemoryStatus:
+    """Start tracing allocations in this worker."""
+
+    memory.start_tracing(frames)
+    return _memory_status()
+
+
+@router.delete("/memory/tracing", response_model=MemoryStatus)
+async def stop_memory_tracing() -> MemoryStatus:
+    """Stop tracing allocations and drop this worker's snapshots."""
+
+    memory.stop_tracing()
+    return _memory_status()
+
+
+@router.post("/memory/snapshots", response_model=MemorySnapshotReport, status_code=status.HTTP_201_CREATED)
+async def take_memory_snapshot(limit: int = Query(default=20, ge=1, le=500)) -> MemorySnapshotReport:
+    """Snapshot traced allocations and return the top allocation sites."""
+
+    if not memory.is_tracing():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Memory tracing is not running")
+    snapshot = memory.take_snapshot()
+    return MemorySnapshotReport(snapshot=snapshot, top=memory.top_allocations(snapshot, limit))
+
+
+@router.get("/memory/snapshots/{snapshot_id}", response_model=MemorySnapshotReport)
+async def get_memory_snapshot(snapshot_id: int, limit: int = Query(default=20, ge=1, le=500)) -> MemorySnapshotReport:
+    """Return the top allocation sites of a kept snapshot."""
+
+    snapshot = _get_snapshot(snapshot_id)
+    return MemorySnapshotReport(snapshot=snapshot, top=memory.top_allocations(snapshot, limit))
+
+
+@router.get("/memory/snapshots/{snapshot_id}/compare/{other_id}", response_model=MemorySnapshotComparison)
+async def compare_memory_snapshots(
+    snapshot_id: int,
+    other_id: int,
+    limit: int = Query(default=20, ge=1, le=500),
+) -> MemorySnapshotComparison:
+    """Return the allocation sites that changed most from ``snapshot_id`` to ``other_id``."""
+
+    older, newer = _get_snapshot(snapshot_id), _get_snapshot(other_id)
+    return MemorySnapshotComparison(older=older, newer=newer, changes=memory.compare_snapshots(older, newer, limit))
+
+
+@router.get("/memory/objects", response_model=ObjectCounts)
+async def get_object_counts() -> ObjectCounts:
+    """Count live ORM instances, pydantic models and identity map entries in this worker."""
+
+    return ObjectCounts(**memory.object_counts())
@@ -1,66 +1,117 @@
 """Enrollment and learning progress routes."""
 
+import csv
+import io
+import json
 import uuid
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Row, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import UUID, array_agg, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_user_from_token, require_role
-from app.db.session import get_session
+from app.core.serialization import FastJSONResponse
+from app.db.session import AsyncSessionLocal, get_session
 from app.models import Course, CourseStatus, Enrollment, EnrollmentStatus, Lesson, LessonProgress, User, UserRole
-from app.schemas import CertificateRead, EnrollmentCreate, EnrollmentRead, LessonProgressRead, ProgressUpdate
+from app.schemas import (
+    BulkEnrollmentCreate,
+    BulkEnrollmentResult,
+    CertificateRead,
+    EnrollmentCreate,
+    EnrollmentRead,
+    ExportFormat,
+    LessonProgressRead,
+    ProgressUpdate,
+)
+from app.services import read_models
+from app.services.invalidation import CATALOG, publish
 
 
 router = APIRouter(prefix="/enrollments", tags=["enrollments"])
 
+# Rows fetched per server-side cursor round-trip while streaming exports.
+EXPORT_BATCH_SIZE = 500
+
 
 @router.post("", response_model=EnrollmentRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_role(UserRole.STUDENT, UserRole.ADMIN))])
 async def enroll_in_course(
     payload: EnrollmentCreate,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_user_from_token),
 ) -> EnrollmentRead:
-    """Enroll the current student in a course."""
+    """Enroll the current student in a course.
+
+    Enrolling is idempotent: repeating the request (double-clicks, client
+    retries) returns the existing enrollment with 200 instead of failing,
+    also once the course has been unpublished.
+    """
+
+    enrollments = Enrollment.__table__
+    # Only insert when the course exists and is open to this user; the no-op
+    # DO UPDATE makes RETURNING yield the existing row on conflict, and
+    # xmax = 0 tells a fresh insert apart from it.
+    source = select(
+        literal(uuid.uuid4(), UUID(as_uuid=True)),
+        literal(current_user.id, UUID(as_uuid=True)),
+        Course.id,
+        literal(EnrollmentStatus.ACTIVE, enrollments.c.status.type),
+        literal(0.0),
+    ).where(Course.id == payload.course_id, Course.deleted_at.is_(None))
+    if current_user.role == UserRole.STUDENT:
+        source = source.where(Course.status == CourseStatus.PUBLISHED)
+
+    statement = insert(enrollments).from_select(
+        ["id", "student_id", "course_id", "status", "progress_percent"], source
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="uq_enrollment_student_course",
+        set_={"student_id": statement.excluded.student_id},
+    ).returning(*enrollments.c, literal_column("(xmax = 0)", Boolean).label("inserted"))
+
+    row = (await session.execute(statement)).first()
+    if row is not None and row.inserted:
+        # Catalog cards show enrollment counts.
+        await publish(session, CATALOG)
+    await session.commit()
 
-    course = await session.get(Course, payload.course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if course.status != CourseStatus.PUBLISHED and current_user.role == UserRole.STUDENT:
+    if row is None:
+        # The course takes no new students (unpublished, or deleted and not
+        # yet purged), but one already enrolled gets their enrollment back.
+        existing = (
+            await session.execute(
+                select(*enrollments.c).where(
+                    enrollments.c.student_id == current_user.id, enrollments.c.course_id == payload.course_id
+                )
+            )
+        ).first()
+        if existing is not None:
+            response.status_code = status.HTTP_200_OK
+            return EnrollmentRead.model_validate(existing)
+        course_exists = await session.scalar(
+            select(Course.id).where(Course.id == payload.course_id, Course.deleted_at.is_(None))
+        )
+        if not course_exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Course not open for enrollment")
 
-    existing = await session.execute(
-        select(Enrollment).where(
-            Enrollment.course_id == payload.course_id, Enrollment.student_id == current_user.id
-        )
-    )
-    if existing.scalars().first():
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already enrolled in this course")
-
-    # Create enrollment with status as string value to match database enum
-    enrollment = Enrollment(
-        course_id=payload.course_id,
-        student_id=current_user.id,
-        status=EnrollmentStatus.ACTIVE.value  # Use enum value (lowercase "active")
-    )
-    session.add(enrollment)
-    await session.commit()
-    await session.refresh(enrollment)
-    return EnrollmentRead.model_validate(enrollment)
+    if not row.inserted:
+        response.status_code = status.HTTP_200_OK
+    return EnrollmentRead.model_validate(row)
 
 
 @router.get("/me", response_model=list[EnrollmentRead], dependencies=[Depends(require_role(UserRole.STUDENT, UserRole.ADMIN))])
 async def my_enrollments(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_user_from_token),
-) -> list[EnrollmentRead]:
+) -> FastJSONResponse:
     """Return enrollments for the current student."""
 
-    enrollments = (
-        await session.execute(select(Enrollment).where(Enrollment.student_id == current_user.id))
-    ).scalars().all()
-    return [EnrollmentRead.model_validate(enrollment) for enrollment in enrollments]
+    return FastJSONResponse(await read_models.student_enrollments(session, current_user.id))
 
 
 @router.get(
@@ -72,19 +123,245 @@ async def course_enrollments(
     course_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_user_from_token),
-) -> list[EnrollmentRead]:
+) -> FastJSONResponse:
     """Return enrollments for a course the instructor owns."""
 
-    course = await session.get(Course, course_id)
-    if not course:
+    instructor_id = await read_models.course_instructor_id(session, course_id)
+    if instructor_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
+    if current_user.role != UserRole.ADMIN and instructor_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot view enrollments for this course")
 
-    enrollments = (
-        await session.execute(select(Enrollment).where(Enrollment.course_id == course_id))
-    ).scalars().all()
-    return [EnrollmentRead.model_validate(enrollment) for enrollment in enrollments]
+    return FastJSONResponse(await read_models.course_enrollment_rows(session, course_id))
+
+
+@router.post(
+    "/course/{course_id}/bulk",
+    response_model=BulkEnrollmentResult,
+    dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))],
+)
+async def bulk_enroll(
+    course_id: uuid.UUID,
+    payload: BulkEnrollmentCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_user_from_token),
+) -> BulkEnrollmentResult:
+    """Enroll a cohort of existing users in a course with one set-based insert."""
+
+    instructor_id = await read_models.course_instructor_id(session, course_id)
+    if instructor_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if current_user.role != UserRole.ADMIN and instructor_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot enroll students in this course")
+
+    student_ids = set(payload.student_ids)
+    student_emails = {email.lower() for email in payload.student_emails}
+
+    # matched: users named in the payload; inserted: the enrollments actually
+    # created for the students among them. Existing (student, course) pairs
+    # are skipped by the unique constraint, so the whole cohort is one
+    # INSERT ... SELECT round-trip.
+    matched = (
+        select(User.id.label("student_id"), func.lower(User.email).label("email"), User.role.label("role"))
+        .where(or_(User.id.in_(student_ids), func.lower(User.email).in_(student_emails)))
+        .cte("matched")
+    )
+    enrollments = Enrollment.__table__
+    inserted = (
+        insert(enrollments)
+        .from_select(
+            ["id", "student_id", "course_id", "status", "progress_percent"],
+            select(
+                func.gen_random_uuid(),
+                matched.c.student_id,
+                literal(course_id, UUID(as_uuid=True)),
+                literal(EnrollmentStatus.ACTIVE, enrollments.c.status.type),
+                literal(0.0),
+            ).where(matched.c.role == UserRole.STUDENT),
+        )
+        .on_conflict_do_nothing(constraint="uq_enrollment_student_course")
+        .returning(enrollments.c.student_id)
+        .cte("inserted")
+    )
+    rows = (
+        await session.execute(
+            select(
+                matched.c.student_id,
+                matched.c.email,
+                matched.c.role,
+                inserted.c.student_id.is_not(None).label("created"),
+            ).outerjoin(inserted, inserted.c.student_id == matched.c.student_id)
+        )
+    ).all()
+    created = sum(1 for row in rows if row.created)
+    if created:
+        await publish(session, CATALOG)
+    await session.commit()
+
+    found_ids = {row.student_id for row in rows}
+    found_emails = {row.email for row in rows}
+    not_found = [str(student_id) for student_id in student_ids if student_id not in found_ids]
+    not_found.extend(email for email in student_emails if email not in found_emails)
+    not_students = [
+        str(row.student_id) if row.student_id in student_ids else row.email
+        for row in rows
+        if row.role != UserRole.STUDENT
+    ]
+
+    return BulkEnrollmentResult(
+        course_id=course_id,
+        requested=len(rows) + len(not_found),
+        created=created,
+        skipped=len(rows) - created,
+        not_found=not_found,
+        not_students=not_students,
+    )
+
+
+@router.get(
+    "/course/{course_id}/export",
+    dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))],
+)
+async def export_course_enrollments(
+    course_id: uuid.UUID,
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_user_from_token),
+) -> StreamingResponse:
+    """Stream the roster of a course with per-lesson completion as CSV or NDJSON."""
+
+    instructor_id = await read_models.course_instructor_id(session, course_id)
+    if instructor_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if current_user.role != UserRole.ADMIN and instructor_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot export enrollments for this course")
+
+    lessons = (
+        await session.execute(
+            select(Lesson.id, Lesson.title, Lesson.position)
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.position)
+        )
+    ).all()
+
+    if export_format == ExportFormat.NDJSON:
+        body = _export_ndjson(course_id, lessons)
+        media_type = "application/x-ndjson"
+    else:
+        body = _export_csv(course_id, lessons)
+        media_type = "text/csv"
+
+    filename = f"course-{course_id}-enrollments.{export_format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _iter_export_rows(course_id: uuid.UUID) -> AsyncIterator[Row]:
+    """Yield one roster row per enrollment from a server-side cursor.
+
+    The stream owns its session because it outlives the request handler's
+    dependency-scoped one.
+    """
+
+    completed_lessons = array_agg(LessonProgress.lesson_id).filter(LessonProgress.is_completed.is_(True))
+    query = (
+        select(
+            Enrollment.id,
+            Enrollment.student_id,
+            User.full_name,
+            User.email,
+            Enrollment.status,
+            Enrollment.progress_percent,
+            Enrollment.created_at,
+            completed_lessons.label("completed_lesson_ids"),
+        )
+        .join(User, User.id == Enrollment.student_id)
+        .outerjoin(LessonProgress, LessonProgress.enrollment_id == Enrollment.id)
+        .where(Enrollment.course_id == course_id)
+        .group_by(Enrollment.id, User.id)
+        .order_by(User.full_name, Enrollment.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            for row in partition:
+                yield row
+
+
+async def _export_csv(course_id: uuid.UUID, lessons: Sequence[Row]) -> AsyncIterator[str]:
+    """Render roster rows as CSV, one chunk per cursor batch."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        [
+            "enrollment_id",
+            "student_id",
+            "student_name",
+            "student_email",
+            "status",
+            "progress_percent",
+            "enrolled_at",
+            *(f"lesson_{lesson.position}: {lesson.title}" for lesson in lessons),
+        ]
+    )
+
+    pending = 0
+    async for row in _iter_export_rows(course_id):
+        completed = set(row.completed_lesson_ids or ())
+        writer.writerow(
+            [
+                row.id,
+                row.student_id,
+                row.full_name,
+                row.email,
+                row.status.value,
+                row.progress_percent,
+                row.created_at.isoformat() if row.created_at else "",
+                *(1 if lesson.id in completed else 0 for lesson in lessons),
+            ]
+        )
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue()
+
+
+async def _export_ndjson(course_id: uuid.UUID, lessons: Sequence[Row]) -> AsyncIterator[str]:
+    """Render roster rows as newline-delimited JSON objects."""
+
+    chunk: list[str] = []
+    async for row in _iter_export_rows(course_id):
+        completed = set(row.completed_lesson_ids or ())
+        record = {
+            "enrollment_id": str(row.id),
+            "student_id": str(row.student_id),
+            "student_name": row.full_name,
+            "student_email": row.email,
+            "status": row.status.value,
+            "progress_percent": row.progress_percent,
+            "enrolled_at": row.created_at.isoformat() if row.created_at else None,
+            "lessons": [
+                {"lesson_id": str(lesson.id), "position": lesson.position, "is_completed": lesson.id in completed}
+                for lesson in lessons
+            ],
+        }
+        chunk.append(json.dumps(record))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+
+    if chunk:
+        yield "\n".join(chunk) + "\n"
 
 
 @router.post(
@@ -103,6 +380,8 @@ async def update_progress(
     enrollment = await session.get(Enrollment, enrollment_id)
     if not enrollment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
+    if enrollment.course.deleted_at is not None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
     if current_user.role != UserRole.ADMIN and enrollment.student_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot update this enrollment")
 
@@ -205,19 +484,16 @@ async def list_progress(
     enrollment_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_user_from_token),
-) -> list[LessonProgressRead]:
+) -> FastJSONResponse:
     """Return lesson progress for an enrollment."""
 
-    enrollment = await session.get(Enrollment, enrollment_id)
-    if not enrollment:
+    student_id = await session.scalar(select(Enrollment.student_id).where(Enrollment.id == enrollment_id))
+    if student_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
-    if current_user.role == UserRole.STUDENT and enrollment.student_id != current_user.id:
+    if current_user.role == UserRole.STUDENT and student_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot view this enrollment")
 
-    progress_rows = (
-        await session.execute(select(LessonProgress).where(LessonProgress.enrollment_id == enrollment_id))
-    ).scalars().all()
-    return [LessonProgressRead.model_validate(progress) for progress in progress_rows]
+    return FastJSONResponse(await read_models.enrollment_progress(session, enrollment_id))
 
 
 @router.get(
@@ -237,7 +513,7 @@ async def get_certificate(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
 
     course = await session.get(Course, enrollment.course_id)
-    if not course:
+    if not course or course.deleted_at is not None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
     student = await session.get(User, enrollment.student_id)
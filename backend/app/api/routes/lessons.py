@@ -5,18 +5,48 @@ from pathlib import Path
 from typing import Annotated
 
 import aiofiles
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+import aiofiles.os
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy import Delete, Update, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import get_settings
 from app.core.dependencies import get_user_from_token, require_role
-from app.db.session import get_session
+from app.core.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from app.core.serialization import FastJSONResponse, dumps
+from app.db.session import get_session, get_session_factory
 from app.models import Course, Lesson, User, UserRole
 from app.schemas import LessonCreate, LessonRead, LessonUpdate
+from app.services import read_models
+from app.services.invalidation import course_cache, course_key, publish
+from app.services.single_flight import SingleFlight
+from app.utils.errors import missing_or_forbidden
 
 
+settings = get_settings()
 router = APIRouter(prefix="/lessons", tags=["lessons"])
 
+# Columns needed to build a LessonRead straight from a RETURNING clause.
+LESSON_READ_COLUMNS = read_models.LESSON_COLUMNS
+
+# Concurrent requests for the same lesson list share one lookup and load.
+lesson_reads: SingleFlight = SingleFlight("lesson_reads", timeout=settings.single_flight_timeout_seconds)
+
+# Lessons of soft-deleted courses count as missing, not forbidden.
+LIVE_LESSON = Lesson.course_id.in_(select(Course.id).where(Course.deleted_at.is_(None)))
+
+
+def _owned_lesson(statement, lesson_id: uuid.UUID, current_user: User):
+    """Scope a lesson statement to one lesson whose course the current user may modify."""
+
+    writable_courses = select(Course.id).where(Course.deleted_at.is_(None))
+    if current_user.role != UserRole.ADMIN:
+        writable_courses = writable_courses.where(Course.instructor_id == current_user.id)
+    statement = statement.where(Lesson.id == lesson_id, Lesson.course_id.in_(writable_courses))
+    if isinstance(statement, (Update, Delete)):
+        statement = statement.execution_options(synchronize_session=False)
+    return statement
+
 
 @router.post("", response_model=LessonRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))])
 async def create_lesson(
@@ -26,36 +56,58 @@ async def create_lesson(
 ) -> LessonRead:
     """Create a lesson for a course."""
 
-    course = await session.get(Course, payload.course_id)
-    if not course:
+    instructor_id = await read_models.course_instructor_id(session, payload.course_id)
+    if instructor_id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
+    if current_user.role != UserRole.ADMIN and instructor_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot modify lessons for this course")
 
-    lesson = Lesson(
-        course_id=payload.course_id,
-        title=payload.title,
-        content=payload.content,
-        video_url=payload.video_url,
-        thumbnail_url=payload.thumbnail_url,
-        position=payload.position,
-    )
-    session.add(lesson)
+    # Lesson.content is deferred, so return the new row straight from RETURNING
+    # rather than refreshing an ORM instance and lazy-loading it.
+    statement = insert(Lesson).values(**payload.model_dump()).returning(*LESSON_READ_COLUMNS)
+    row = (await session.execute(statement)).one()
+    await publish(session, course_key(payload.course_id))
     await session.commit()
-    await session.refresh(lesson)
-    return LessonRead.model_validate(lesson)
+    return LessonRead.model_validate(row)
 
 
 @router.get("/course/{course_id}", response_model=list[LessonRead])
-async def list_lessons(course_id: uuid.UUID, session: AsyncSession = Depends(get_session)) -> list[LessonRead]:
+async def list_lessons(
+    course_id: uuid.UUID,
+    request: Request,
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> Response:
     """Return lessons for a course ordered by position."""
 
-    lessons = (
-        await session.execute(
-            select(Lesson).where(Lesson.course_id == course_id).order_by(Lesson.position)
-        )
-    ).scalars().all()
-    return [LessonRead.model_validate(lesson) for lesson in lessons]
+    async def load_version():
+        async with sessions() as session:
+            return await read_models.course_version(session, course_id)
+
+    version = await course_cache.get(
+        course_key(course_id), "version", lambda: lesson_reads.do(("version", course_id), load_version)
+    )
+    etag = make_etag(tuple(version) if version else None)
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.lessons_cache_control)
+
+    async def load_lessons() -> bytes:
+        async with sessions() as session:
+            return dumps(await read_models.course_lessons(session, course_id))
+
+    body = await course_cache.get(
+        course_key(course_id), "lessons", lambda: lesson_reads.do(("lessons", course_id, etag), load_lessons)
+    )
+    return FastJSONResponse(body, headers=cache_headers(etag, settings.lessons_cache_control))
+
+
+@router.get("/{lesson_id}", response_model=LessonRead)
+async def get_lesson(lesson_id: uuid.UUID, session: AsyncSession = Depends(get_session)) -> FastJSONResponse:
+    """Return a single lesson including its content."""
+
+    lesson = await read_models.lesson(session, lesson_id)
+    if lesson is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
+    return FastJSONResponse(lesson)
 
 
 @router.put("/{lesson_id}", response_model=LessonRead, dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))])
@@ -67,24 +119,19 @@ async def update_lesson(
 ) -> LessonRead:
     """Update a lesson."""
 
-    lesson = await session.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
-
-    course = await session.get(Course, lesson.course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot modify this lesson")
-
     update_data = payload.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(lesson, key, value)
-
-    session.add(lesson)
+    if update_data:
+        statement = update(Lesson).values(**update_data).returning(*LESSON_READ_COLUMNS)
+    else:
+        statement = select(*LESSON_READ_COLUMNS)
+    row = (await session.execute(_owned_lesson(statement, lesson_id, current_user))).first()
+    if row is None:
+        raise await missing_or_forbidden(session, Lesson, lesson_id, "Cannot modify this lesson", LIVE_LESSON)
+
+    if update_data:
+        await publish(session, course_key(row.course_id))
     await session.commit()
-    await session.refresh(lesson)
-    return LessonRead.model_validate(lesson)
+    return LessonRead.model_validate(row)
 
 
 @router.delete("/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_role(UserRole.INSTRUCTOR, UserRole.ADMIN))])
@@ -95,17 +142,13 @@ async def delete_lesson(
 ) -> None:
     """Delete a lesson."""
 
-    lesson = await session.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
-
-    course = await session.get(Course, lesson.course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot delete this lesson")
+    # Lesson progress rows go with it through the ON DELETE CASCADE foreign key.
+    statement = delete(Lesson).returning(Lesson.course_id)
+    deleted = (await session.execute(_owned_lesson(statement, lesson_id, current_user))).first()
+    if deleted is None:
+        raise await missing_or_forbidden(session, Lesson, lesson_id, "Cannot delete this lesson", LIVE_LESSON)
 
-    await session.delete(lesson)
+    await publish(session, course_key(deleted.course_id))
     await session.commit()
 
 
@@ -122,29 +165,34 @@ async def upload_lesson_thumbnail(
 ) -> LessonRead:
     """Upload and attach a thumbnail image for a lesson."""
 
-    lesson = await session.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
-
-    course = await session.get(Course, lesson.course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if current_user.role != UserRole.ADMIN and course.instructor_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot modify this lesson")
-
     extension = Path(file.filename or "thumbnail").suffix
-    filename = f"{lesson.id}{extension}"
+    filename = f"{lesson_id}{extension}"
     media_path = Path("media/lesson-thumbnails")
     media_path.mkdir(parents=True, exist_ok=True)
     file_path = media_path / filename
+    # Write to a private temp file first; it only replaces the public one
+    # once the ownership-checked UPDATE has matched the lesson and committed.
+    temp_path = media_path / f".{filename}.{uuid.uuid4().hex}.part"
 
-    async with aiofiles.open(file_path, "wb") as buffer:
+    async with aiofiles.open(temp_path, "wb") as buffer:
         content = await file.read()
         await buffer.write(content)
 
-    lesson.thumbnail_url = f"/media/lesson-thumbnails/{filename}"
-    session.add(lesson)
-    await session.commit()
-    await session.refresh(lesson)
-
-    return LessonRead.model_validate(lesson)
+    statement = (
+        update(Lesson)
+        .values(thumbnail_url=f"/media/lesson-thumbnails/{filename}")
+        .returning(*LESSON_READ_COLUMNS)
+    )
+    row = (await session.execute(_owned_lesson(statement, lesson_id, current_user))).first()
+    if row is None:
+        await aiofiles.os.remove(temp_path)
+        raise await missing_or_forbidden(session, Lesson, lesson_id, "Cannot modify this lesson", LIVE_LESSON)
+
+    await publish(session, course_key(row.course_id))
+    try:
+        await session.commit()
+    except BaseException:
+        await aiofiles.os.remove(temp_path)
+        raise
+    await aiofiles.os.replace(temp_path, file_path)
+    return LessonRead.model_validate(row)
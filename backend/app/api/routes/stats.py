@@ -1,32 +1,67 @@
 """Public statistics routes."""
 
+import time
+
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
+from app.core.config import get_settings
+from app.core.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from app.core.metrics import record_cache
+from app.core.serialization import FastJSONResponse
 from app.db.session import get_session
 from app.models import Course, Enrollment, EnrollmentStatus, User, UserRole
 from app.schemas.stats import PlatformStats
 
+settings = get_settings()
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+# (expires_at, etag, stats): the counts scan whole tables, so they are
+# recomputed at most every ``stats_cache_seconds`` per worker.
+_cached_stats: tuple[float, str, PlatformStats] | None = None
+
 
 @router.get("", response_model=PlatformStats)
-async def get_platform_stats(session: AsyncSession = Depends(get_session)) -> PlatformStats:
+async def get_platform_stats(request: Request, session: AsyncSession = Depends(get_session)) -> Response:
     """Return public platform statistics."""
 
-    # Query all users and filter by role in Python
-    # This is more reliable than SQL enum comparison with custom TypeDecorator
-    all_users_result = await session.execute(select(User))
-    all_users = all_users_result.scalars().all()
-    
-    total_students = sum(1 for user in all_users if user.role == UserRole.STUDENT)
-    total_instructors = sum(1 for user in all_users if user.role == UserRole.INSTRUCTOR)
+    etag, stats = await cached_platform_stats(session)
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.stats_cache_control)
+    return FastJSONResponse(stats, headers=cache_headers(etag, settings.stats_cache_control))
+
+
+async def cached_platform_stats(session: AsyncSession) -> tuple[str, PlatformStats]:
+    """Return the ETag and stats, recomputing them once the cached pair expired."""
+
+    global _cached_stats
+    fresh = _cached_stats is not None and _cached_stats[0] > time.monotonic()
+    record_cache("platform_stats", fresh)
+    if not fresh:
+        stats = await _compute_platform_stats(session)
+        # The ETag depends only on the values, so workers agree on it.
+        _cached_stats = (time.monotonic() + settings.stats_cache_seconds, make_etag(stats.model_dump()), stats)
+
+    _, etag, stats = _cached_stats
+    return etag, stats
+
+
+async def _compute_platform_stats(session: AsyncSession) -> PlatformStats:
+    """Count users, courses and enrollments."""
+
+    # Count users per role with GROUP BY and compare the decoded roles in
+    # Python, which avoids SQL enum comparison with the custom TypeDecorator
+    role_counts_result = await session.execute(select(User.role, func.count(User.id)).group_by(User.role))
+    role_counts = {role: count for role, count in role_counts_result.all()}
+
+    total_students = role_counts.get(UserRole.STUDENT, 0)
+    total_instructors = role_counts.get(UserRole.INSTRUCTOR, 0)
 
     # Count total courses (only published)
     courses_result = await session.execute(
-        select(func.count(Course.id))
+        select(func.count(Course.id)).where(Course.deleted_at.is_(None))
     )
     total_courses = courses_result.scalar() or 0
 
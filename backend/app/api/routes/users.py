@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.dependencies import get_user_from_token
+from app.core.dependencies import get_current_profile, get_user_from_token
 from app.db.session import get_session
 from app.models import Course, Enrollment, EnrollmentStatus, LessonProgress, User, UserRole
 from app.schemas import (
@@ -25,7 +25,7 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=ProfileRead)
-async def read_current_user(current_user: User = Depends(get_user_from_token)) -> ProfileRead:
+async def read_current_user(current_user: User = Depends(get_current_profile)) -> ProfileRead:
     """Return current authenticated user's profile."""
 
     return ProfileRead.model_validate(current_user)
@@ -35,7 +35,7 @@ async def read_current_user(current_user: User = Depends(get_user_from_token)) -
 async def update_profile(
     payload: ProfileUpdate,
     session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_user_from_token),
+    current_user: User = Depends(get_current_profile),
 ) -> ProfileRead:
     """Update user profile fields."""
 
@@ -62,7 +62,9 @@ async def update_profile(
 
     session.add(current_user)
     await session.commit()
-    await session.refresh(current_user)
+    # Reload only the columns; refreshing everything would load the
+    # eagerly loaded relationships as well.
+    await session.refresh(current_user, ["date_of_birth", "updated_at"])
     return ProfileRead.model_validate(current_user)
 
 
@@ -84,19 +86,34 @@ async def _student_dashboard(session: AsyncSession, user_id: UUID) -> StudentDas
     """Compute student dashboard metrics."""
 
     enrollments = (
-        await session.execute(select(Enrollment).where(Enrollment.student_id == user_id))
-    ).scalars().all()
+        await session.execute(
+            select(
+                Enrollment.id,
+                Enrollment.course_id,
+                Enrollment.status,
+                Enrollment.progress_percent,
+                Course.title.label("course_title"),
+            )
+            .join(Course, Course.id == Enrollment.course_id)
+            .where(Enrollment.student_id == user_id, Course.deleted_at.is_(None))
+        )
+    ).all()
 
     enrollment_ids = [enrollment.id for enrollment in enrollments]
     progress_rows = []
     if enrollment_ids:
         progress_rows = (
             await session.execute(
-                select(LessonProgress)
+                select(
+                    LessonProgress.enrollment_id,
+                    LessonProgress.lesson_id,
+                    LessonProgress.is_completed,
+                    LessonProgress.completed_at,
+                )
                 .where(LessonProgress.enrollment_id.in_(enrollment_ids))
                 .order_by(LessonProgress.completed_at.desc().nullslast())
             )
-        ).scalars().all()
+        ).all()
 
     enrolled_courses = len(enrollments)
     completed_courses = sum(1 for enrollment in enrollments if enrollment.status == EnrollmentStatus.COMPLETED)
@@ -112,14 +129,7 @@ async def _student_dashboard(session: AsyncSession, user_id: UUID) -> StudentDas
         )
 
     overviews: list[ProgressOverview] = []
-    course_titles: dict[UUID, str] = {}
     if enrollments:
-        course_ids = [enrollment.course_id for enrollment in enrollments]
-        course_objects = (
-            await session.execute(select(Course).where(Course.id.in_(course_ids)))
-        ).scalars().all()
-        course_titles = {course.id: course.title for course in course_objects}
-
         for enrollment in enrollments:
             # Get completed_at timestamps for this enrollment, filtering out None values
             enrollment_progress_dates = [
@@ -133,7 +143,7 @@ async def _student_dashboard(session: AsyncSession, user_id: UUID) -> StudentDas
                 ProgressOverview(
                     enrollment_id=enrollment.id,
                     course_id=enrollment.course_id,
-                    course_title=course_titles.get(enrollment.course_id, ""),
+                    course_title=enrollment.course_title,
                     progress_percent=enrollment.progress_percent,
                     last_viewed=last_viewed,
                 )
@@ -152,15 +162,20 @@ async def _instructor_dashboard(session: AsyncSession, user_id: UUID) -> Instruc
     """Compute instructor dashboard metrics."""
 
     courses = (
-        await session.execute(select(Course).where(Course.instructor_id == user_id))
-    ).scalars().all()
+        await session.execute(
+            select(Course.id, Course.title).where(Course.instructor_id == user_id, Course.deleted_at.is_(None))
+        )
+    ).all()
 
     course_ids = [course.id for course in courses]
     enrollment_rows = []
     if course_ids:
         enrollment_rows = (
-            await session.execute(select(Enrollment).where(Enrollment.course_id.in_(course_ids)))
-        ).scalars().all()
+            await session.execute(
+                select(Enrollment.course_id, Enrollment.student_id, Enrollment.progress_percent)
+                .where(Enrollment.course_id.in_(course_ids))
+            )
+        ).all()
 
     total_students = len({enrollment.student_id for enrollment in enrollment_rows})
     completion_rates = [enrollment.progress_percent for enrollment in enrollment_rows]
@@ -0,0 +1,253 @@
+"""Admission control: shed excess load before it queues on the database pool.
+
+Every API request is put in a route class (``route_class``). A request runs
+only while its class is below its concurrency limit and the worker is below
+``ADMISSION_MAX_CONCURRENT`` admitted requests in total, which defaults to
+the connections its pool can open, so admitted requests rarely wait for a
+connection. Otherwise it waits in its class's bounded queue. When a slot
+frees, waiters are admitted by class priority (learning traffic first,
+heavy analytics last), then in arrival order.
+
+A request is rejected with ``503`` and ``Retry-After`` when its class's
+queue is full or it waited longer than the class allows. Rejecting early
+keeps latency bounded for the traffic that does get in, instead of every
+request slowly timing out.
+
+Health, readiness and metrics endpoints, static files, CORS preflights and
+the admin debug routes are never queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import itertools
+import re
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUED,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT,
+)
+
+
+settings = get_settings()
+
+
+class RouteClass(str, Enum):  # type: ignore[misc]
+    LEARNING = "learning"
+    AUTH = "auth"
+    WRITE = "write"
+    READ = "read"
+    ANALYTICS = "analytics"
+
+
+@dataclass(frozen=True)
+class ClassLimits:
+    concurrency: int
+    queue: int
+    max_wait_seconds: float
+    # Lower is admitted first.
+    priority: int
+
+
+# concurrency, queue, max wait, priority; ADMISSION_LIMITS overrides the first three.
+DEFAULT_LIMITS: dict[RouteClass, ClassLimits] = {
+    RouteClass.LEARNING: ClassLimits(15, 64, 5.0, 0),
+    # Bounded by the bcrypt process pool rather than by connections.
+    RouteClass.AUTH: ClassLimits(4, 16, 2.0, 1),
+    RouteClass.WRITE: ClassLimits(8, 32, 3.0, 2),
+    RouteClass.READ: ClassLimits(12, 64, 2.0, 3),
+    RouteClass.ANALYTICS: ClassLimits(2, 4, 1.0, 4),
+}
+
+# (methods, path below the API prefix) -> class; the first match wins, and
+# anything else is READ for GET/HEAD and WRITE otherwise.
+_RULES: list[tuple[frozenset[str], re.Pattern[str], RouteClass]] = [
+    (frozenset({"POST"}), re.compile(r"/auth/(token|register)"), RouteClass.AUTH),
+    (frozenset({"GET"}), re.compile(r"/users/me/dashboard"), RouteClass.ANALYTICS),
+    (frozenset({"GET"}), re.compile(r"/enrollments/course/[^/]+/export"), RouteClass.ANALYTICS),
+    (frozenset({"POST"}), re.compile(r"/admin/import/[^/]+"), RouteClass.ANALYTICS),
+    (frozenset({"GET", "POST"}), re.compile(r"/enrollments/[^/]+/progress"), RouteClass.LEARNING),
+    (frozenset({"GET"}), re.compile(r"/enrollments/(me|[^/]+/certificate)"), RouteClass.LEARNING),
+    (frozenset({"GET"}), re.compile(r"/lessons/(course/)?[^/]+"), RouteClass.LEARNING),
+    (frozenset({"GET"}), re.compile(r"/courses/(?!mine$)[^/]+"), RouteClass.LEARNING),
+]
+_EXEMPT_PREFIXES = ("/debug/",)
+
+
+def route_pattern(template: str) -> re.Pattern[str]:
+    """Compile a path template such as ``/courses/{course_id}`` to a pattern for ``fullmatch``."""
+
+    return re.compile(re.sub(r"\\\{[^}]*\\\}", "[^/]+", re.escape(template)))
+
+
+def route_class(method: str, path: str) -> RouteClass | None:
+    """Return the class of an API request, or ``None`` if it is not admission-controlled."""
+
+    prefix = settings.api_v1_prefix
+    if method == "OPTIONS" or not path.startswith(prefix + "/"):
+        return None
+    path = path[len(prefix):]
+    if path.startswith(_EXEMPT_PREFIXES):
+        return None
+    for methods, pattern, klass in _RULES:
+        if method in methods and pattern.fullmatch(path):
+            return klass
+    return RouteClass.READ if method in ("GET", "HEAD") else RouteClass.WRITE
+
+
+def configured_limits() -> dict[RouteClass, ClassLimits]:
+    limits = dict(DEFAULT_LIMITS)
+    for name, (concurrency, queue, max_wait) in settings.admission_limits.items():
+        klass = RouteClass(name)
+        limits[klass] = ClassLimits(concurrency, queue, max_wait, DEFAULT_LIMITS[klass].priority)
+    return limits
+
+
+class Rejected(Exception):
+    """The request was not admitted; ``reason`` is ``queue_full`` or ``timeout``."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    klass: RouteClass = field(compare=False)
+    granted: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """Per-worker concurrency limits with bounded, prioritized wait queues."""
+
+    def __init__(self, limits: dict[RouteClass, ClassLimits], max_concurrent: int) -> None:
+        self.limits = limits
+        self.max_concurrent = max_concurrent
+        self.running = dict.fromkeys(RouteClass, 0)
+        self.queued = dict.fromkeys(RouteClass, 0)
+        self.total_running = 0
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        for klass, class_limits in limits.items():
+            ADMISSION_LIMIT.labels(klass.value).set(class_limits.concurrency)
+
+    def _has_room(self, klass: RouteClass) -> bool:
+        return self.total_running < self.max_concurrent and self.running[klass] < self.limits[klass].concurrency
+
+    def _start(self, klass: RouteClass) -> None:
+        self.running[klass] += 1
+        self.total_running += 1
+        ADMISSION_IN_FLIGHT.labels(klass.value).inc()
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        self.queued[waiter.klass] -= 1
+        ADMISSION_QUEUED.labels(waiter.klass.value).dec()
+
+    async def acquire(self, klass: RouteClass) -> float:
+        """Wait for a slot and return the seconds waited; raise ``Rejected`` if there is none in time."""
+
+        # Freed slots are handed to waiters directly, so room now means nobody
+        # of this class is waiting for it.
+        if self._has_room(klass):
+            self._start(klass)
+            return 0.0
+        limits = self.limits[klass]
+        if self.queued[klass] >= limits.queue:
+            raise Rejected("queue_full")
+
+        waiter = _Waiter(limits.priority, next(self._sequence), klass, asyncio.get_running_loop().create_future())
+        bisect.insort(self._waiters, waiter)
+        self.queued[klass] += 1
+        ADMISSION_QUEUED.labels(klass.value).inc()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.granted), limits.max_wait_seconds)
+        except asyncio.TimeoutError:
+            # Granted in the same loop iteration as the timeout: keep the slot.
+            if not waiter.granted.done():
+                self._dequeue(waiter)
+                raise Rejected("timeout") from None
+        except asyncio.CancelledError:
+            # The client went away; give the slot on if it was granted meanwhile.
+            if waiter.granted.done():
+                self.release(klass)
+            else:
+                self._dequeue(waiter)
+            raise
+        return time.perf_counter() - started
+
+    def release(self, klass: RouteClass) -> None:
+        self.running[klass] -= 1
+        self.total_running -= 1
+        ADMISSION_IN_FLIGHT.labels(klass.value).dec()
+        for waiter in list(self._waiters):
+            if self.total_running >= self.max_concurrent:
+                break
+            if self._has_room(waiter.klass):
+                self._dequeue(waiter)
+                self._start(waiter.klass)
+                waiter.granted.set_result(None)
+
+
+def _max_concurrent() -> int:
+    return settings.admission_max_concurrent or settings.db_pool_size + settings.db_max_overflow
+
+
+class AdmissionMiddleware:
+    """Admit API requests through ``AdmissionController`` or answer 503."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.controller = AdmissionController(configured_limits(), _max_concurrent())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        klass = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if klass is None or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            waited = await self.controller.acquire(klass)
+        except Rejected as exc:
+            ADMISSION_REJECTED.labels(klass.value, exc.reason).inc()
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry"},
+                status_code=503,
+                headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        ADMISSION_WAIT.labels(klass.value).observe(waited)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release(klass)
+
+        async def send_wrapper(message: Message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # The response is complete; background tasks run without a slot.
+                release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
@@ -23,9 +23,93 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 60 * 24  # 24 hours
 
     database_url: str = Field(..., env="DATABASE_URL")
+    # Connections per worker process; app.server derives them from its
+    # --db-connections budget and the worker count.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
 
     smtp_enabled: bool = False
 
+    # Logging (see app.core.logs). Records go through a bounded queue to a
+    # writer thread; repeated warnings and errors per call site are sampled.
+    log_level: str = "INFO"
+    log_json: bool = True
+    log_queue_size: int = 10_000
+    log_max_message_chars: int = 2000
+    log_max_body_bytes: int = 1024
+    log_sample_burst: int = 10
+    log_sample_window_seconds: float = 60.0
+
+    bulk_import_batch_size: int = 1000
+    password_hash_workers: int = 2
+    course_purge_batch_size: int = 5000
+    course_purge_interval_seconds: float = 600.0
+
+    idempotency_ttl_seconds: int = 60 * 60 * 24  # 24 hours
+    idempotency_max_entries: int = 10_000
+    idempotency_wait_timeout_seconds: float = 30.0
+
+    # Cache-Control sent with ETag'd GET responses. "no-cache" lets clients
+    # store the response but revalidate it (cheap 304s) on every use.
+    catalog_cache_control: str = "public, no-cache"
+    course_cache_control: str = "public, no-cache"
+    lessons_cache_control: str = "public, no-cache"
+    stats_cache_control: str = "public, max-age=60"
+    stats_cache_seconds: int = 60
+
+    # Upper bound for a read shared between concurrent identical requests.
+    single_flight_timeout_seconds: float = 10.0
+
+    # Request profiling (see app.core.profiling). Admins opt in per request
+    # with X-Debug-Profile; a non-zero sample rate also profiles random traffic.
+    profiling_sample_rate: float = 0.0
+    profiling_interval_seconds: float = 0.005
+    profiling_max_profiles: int = 100
+    profiling_max_concurrent: int = 4
+
+    # tracemalloc snapshots kept per worker; each can take tens of megabytes.
+    memory_max_snapshots: int = 5
+
+    # Admission control (see app.core.admission). Total admitted requests per
+    # worker default to the pool's connections; ADMISSION_LIMITS overrides
+    # [concurrent, queued, max wait seconds] per route class as JSON, e.g.
+    # '{"analytics": [1, 2, 0.5]}'.
+    admission_enabled: bool = True
+    admission_max_concurrent: int | None = None
+    admission_limits: dict[str, tuple[int, int, float]] = {}
+    admission_retry_after_seconds: int = 1
+
+    # Request deadlines (see app.core.deadlines). REQUEST_TIMEOUTS overrides
+    # the seconds allowed per route class or "METHOD /path/{template}" as JSON,
+    # e.g. '{"read": 3, "GET /courses/{course_id}": 2}'.
+    request_deadlines_enabled: bool = True
+    request_timeouts: dict[str, float] = {}
+    request_deadline_grace_seconds: float = 1.0
+
+    # Rate limiting (see app.core.rate_limit). RATE_LIMITS overrides
+    # [requests per minute, burst] per route class or "METHOD /path/{template}"
+    # and key kind ("ip", "email", "user") as JSON, e.g.
+    # '{"POST /auth/token": {"ip": [20, 5]}}'. RATE_LIMIT_REDIS_URL shares the
+    # buckets between workers (requires the redis package).
+    rate_limit_enabled: bool = True
+    rate_limits: dict[str, dict[str, tuple[float, int]]] = {}
+    rate_limit_redis_url: str | None = None
+    rate_limit_max_keys: int = 100_000
+
+    # Startup warm-up (see app.lifespan); /readyz reports 503 until it is done.
+    warmup_enabled: bool = True
+    warmup_connections: int = 5
+    warmup_retry_seconds: float = 2.0
+
+    # Worker-local caches kept coherent with LISTEN/NOTIFY (see
+    # app.services.invalidation); each worker holds one extra connection.
+    invalidation_enabled: bool = True
+    invalidation_channel: str = "cache_invalidation"
+    invalidation_batch_seconds: float = 0.05
+    invalidation_reconnect_seconds: float = 1.0
+    invalidation_ping_seconds: float = 30.0
+    local_cache_max_entries: int = 1000
+
     class Config:
         env_file = ".env"
         case_sensitive = False
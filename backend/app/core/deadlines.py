@@ -0,0 +1,158 @@
+"""Request deadlines carried into database statement timeouts.
+
+``DeadlineMiddleware`` gives every admission-controlled API request (see
+``app.core.admission.route_class``) a deadline when it arrives. The budget
+is the route's default, from ``REQUEST_TIMEOUTS`` keyed by ``"METHOD
+/path/{template}"`` or by route class, falling back to ``DEFAULT_TIMEOUTS``.
+Clients can ask for less, never more, with ``X-Request-Timeout: <seconds>``.
+
+Every session transaction started while handling the request first runs
+``SET LOCAL statement_timeout`` with the time left. A query that runs past
+the deadline is cancelled by Postgres: the transaction rolls back, the
+connection goes back to the pool in a clean state and the client gets
+``503`` with ``Retry-After``. Work that overruns outside the database is
+cancelled ``REQUEST_DEADLINE_GRACE_SECONDS`` after the deadline, so the
+statement timeout normally fires first. Background tasks that run after the
+response has been sent are not limited.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, SessionTransaction
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import RouteClass, route_class, route_pattern
+from app.core.config import get_settings
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TIMEOUT_HEADER = b"x-request-timeout"
+QUERY_CANCELED = "57014"
+
+DEFAULT_TIMEOUTS: dict[str, float] = {
+    RouteClass.LEARNING.value: 5.0,
+    RouteClass.AUTH.value: 10.0,
+    RouteClass.WRITE.value: 10.0,
+    RouteClass.READ.value: 5.0,
+    RouteClass.ANALYTICS.value: 30.0,
+    # Streams every enrollment and progress row of a course.
+    "GET /enrollments/course/{course_id}/export": 600.0,
+    "POST /admin/import/{entity}": 300.0,
+}
+
+# perf_counter() value after which the current request is out of time.
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def _compile_route_timeouts(timeouts: dict[str, float]) -> list[tuple[str, re.Pattern[str], float]]:
+    routes = []
+    for key, seconds in timeouts.items():
+        method, _, template = key.partition(" ")
+        if template:
+            routes.append((method.upper(), route_pattern(template), seconds))
+    return routes
+
+
+_timeouts = {**DEFAULT_TIMEOUTS, **settings.request_timeouts}
+_route_timeouts = _compile_route_timeouts(_timeouts)
+
+
+def route_timeout(method: str, path: str, klass: RouteClass) -> float:
+    """Return the default budget in seconds for a request below the API prefix."""
+
+    path = path[len(settings.api_v1_prefix):]
+    for route_method, pattern, seconds in _route_timeouts:
+        if route_method == method and pattern.fullmatch(path):
+            return seconds
+    return _timeouts[klass.value]
+
+
+def remaining() -> float | None:
+    """Seconds left before the current request's deadline, or ``None`` outside a request."""
+
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.perf_counter()
+
+
+def is_query_canceled(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == QUERY_CANCELED
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    left = remaining()
+    if left is not None:
+        # SET cannot take a bind parameter; the value is an integer we computed.
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(left * 1000))}")
+
+
+def _requested_timeout(scope: Scope) -> float | None:
+    for name, value in scope["headers"]:
+        if name == TIMEOUT_HEADER:
+            try:
+                seconds = float(value)
+            except ValueError:
+                return None
+            return seconds if seconds > 0 else None
+    return None
+
+
+def deadline_exceeded_response() -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Request deadline exceeded, please retry"},
+        status_code=503,
+        headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+    )
+
+
+class DeadlineMiddleware:
+    """Set the request deadline and cancel requests that overrun it."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        klass = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if klass is None or not settings.request_deadlines_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        budget = route_timeout(scope["method"], scope["path"], klass)
+        requested = _requested_timeout(scope)
+        if requested is not None:
+            budget = min(budget, requested)
+        token = _deadline.set(time.perf_counter() + budget)
+        response_started = False
+        try:
+            async with asyncio.timeout(budget + settings.request_deadline_grace_seconds) as overrun:
+
+                async def send_wrapper(message: Message) -> None:
+                    nonlocal response_started
+                    response_started = True
+                    if message["type"] == "http.response.body" and not message.get("more_body", False):
+                        # The response is complete; background tasks run without a deadline.
+                        overrun.reschedule(None)
+                        _deadline.set(None)
+                    await send(message)
+
+                await self.app(scope, receive, send_wrapper)
+        except TimeoutError:
+            # Timeouts raised by the app itself are not ours to answer.
+            if response_started or not overrun.expired():
+                raise
+            logger.warning(f"Deadline of {budget:g}s exceeded")
+            await deadline_exceeded_response()(scope, receive, send)
+        finally:
+            _deadline.reset(token)
@@ -5,7 +5,7 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy import select
 import uuid
 
@@ -13,6 +13,7 @@ from app.core.config import get_settings
 from app.core.security import decode_access_token
 from app.db.session import get_session
 from app.models import User, UserRole
+from app.services.invalidation import principal_cache, user_key
 
 
 settings = get_settings()
@@ -20,8 +21,26 @@ settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_v1_prefix}/auth/token")
 
 
+# Cached per worker for every token, so only what authorization needs.
+PRINCIPAL_COLUMNS = (User.id, User.role)
+# Loaded for the routes that return the user's profile; never the password hash.
+PROFILE_COLUMNS = tuple(column for column in User.__table__.c if column.key != "hashed_password")
+
+
+def _detached_user(row) -> User:
+    # Each request gets its own detached instance, as if loaded by a query;
+    # routes that change the user add it to their session.
+    user = User(**row)
+    make_transient_to_detached(user)
+    return user
+
+
 async def get_user_from_token(token: Annotated[str, Depends(oauth2_scheme)], session: Annotated[AsyncSession, Depends(get_session)]) -> User:
-    """Resolve the user associated with the provided bearer token."""
+    """Resolve the user associated with the provided bearer token.
+
+    Only ``id`` and ``role`` are loaded; routes that return the user's profile
+    depend on ``get_current_profile`` instead.
+    """
 
     try:
         payload = decode_access_token(token)
@@ -37,11 +56,26 @@ async def get_user_from_token(token: Annotated[str, Depends(oauth2_scheme)], ses
     except (TypeError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject") from exc
 
-    result = await session.execute(select(User).options(selectinload(User.enrollments)).where(User.id == user_uuid))
-    user = result.scalars().first()
-    if not user:
+    async def load_principal():
+        result = await session.execute(select(*PRINCIPAL_COLUMNS).where(User.id == user_uuid))
+        return result.mappings().first()
+
+    row = await principal_cache.get(user_key(user_uuid), None, load_principal)
+    if row is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return _detached_user(row)
+
+
+async def get_current_profile(
+    user: Annotated[User, Depends(get_user_from_token)], session: Annotated[AsyncSession, Depends(get_session)]
+) -> User:
+    """Load the authenticated user's own columns, without relationships or the password hash."""
+
+    result = await session.execute(select(*PROFILE_COLUMNS).where(User.id == user.id))
+    row = result.mappings().first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return _detached_user(row)
 
 
 def require_role(*allowed_roles: UserRole):
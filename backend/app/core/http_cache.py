@@ -0,0 +1,51 @@
+"""ETag and conditional GET helpers.
+
+Cacheable routes compute a cheap version for the resource first (timestamps
+and row counts, never the resource itself), turn it into a strong ETag and
+answer a matching ``If-None-Match`` with ``304 Not Modified`` before loading
+or serializing anything. ``Cache-Control`` for each route comes from
+settings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+from app.core.metrics import record_cache
+
+
+def make_etag(*parts: Any) -> str:
+    """Return a strong ETag for the given version parts."""
+
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Return True if the request's ``If-None-Match`` matches ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+    """
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = (value.strip() for value in header.split(","))
+    matched = header.strip() == "*" or etag in (value.removeprefix("W/") for value in candidates)
+    record_cache("etag", matched)
+    return matched
+
+
+def cache_headers(etag: str, cache_control: str) -> dict[str, str]:
+    """Validator headers sent with both full and ``304`` responses."""
+
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Return an empty ``304 Not Modified`` response."""
+
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, cache_control))
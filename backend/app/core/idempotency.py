@@ -0,0 +1,233 @@
+"""Idempotency-Key support for mutating requests.
+
+A client retrying ``POST``/``PUT``/``PATCH``/``DELETE`` with the same
+``Idempotency-Key`` header gets the stored response of the first attempt
+replayed without the handler running again. Entries are keyed by
+(principal, key, method, path) and kept for ``idempotency_ttl_seconds``.
+Duplicates arriving while the first request is still running wait for its
+result instead of executing concurrently. Server errors and responses that
+ask the client to retry later (timeouts, conflicts, rate limits) are not
+stored, so the retry runs the handler again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import islice
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import record_cache
+from app.core.security import decode_access_token
+
+
+settings = get_settings()
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+MAX_KEY_LENGTH = 255
+# Statuses below 500 that say "try again" rather than give the request's outcome.
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+
+CacheKey = tuple[str, str, str, str]
+
+
+@dataclass
+class StoredResponse:
+    """Response captured from the first request carrying a key."""
+
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    done: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class IdempotencyConflict(Exception):
+    """The key was reused for a request with a different body."""
+
+
+class InMemoryIdempotencyStore:
+    """Per-process LRU of idempotent responses with a time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+
+    async def begin(self, key: CacheKey, fingerprint: str, wait_timeout: float) -> StoredResponse | None:
+        """Return a stored response to replay, or ``None`` if the caller should run the request.
+
+        Raises ``IdempotencyConflict`` on a body mismatch and
+        ``asyncio.TimeoutError`` if an in-flight duplicate does not finish in time.
+        """
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic() and entry.done.done():
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self._entries[key] = _Entry(fingerprint=fingerprint, expires_at=time.monotonic() + self.ttl_seconds)
+            self._evict()
+            return None
+
+        if entry.fingerprint != fingerprint:
+            raise IdempotencyConflict
+        self._entries.move_to_end(key)
+        response = await asyncio.wait_for(asyncio.shield(entry.done), timeout=wait_timeout)
+        if response is None:
+            # The first attempt failed without a storable response; let this one run.
+            return await self.begin(key, fingerprint, wait_timeout)
+        return response
+
+    def complete(self, key: CacheKey, response: StoredResponse) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and not entry.done.done():
+            entry.done.set_result(response)
+
+    def abandon(self, key: CacheKey) -> None:
+        """Forget an in-flight key so the next retry executes normally."""
+
+        entry = self._entries.pop(key, None)
+        if entry is not None and not entry.done.done():
+            entry.done.set_result(None)
+
+    def _evict(self) -> None:
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            return
+        # Oldest completed entries go first; in-flight requests are never dropped.
+        completed = (key for key, entry in self._entries.items() if entry.done.done())
+        for key in list(islice(completed, overflow)):
+            del self._entries[key]
+
+
+def _principal(headers: Headers) -> str:
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return str(decode_access_token(token).get("sub") or "anonymous")
+        except ValueError:
+            pass
+    return "anonymous"
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware replaying stored responses for repeated Idempotency-Keys."""
+
+    def __init__(self, app: ASGIApp, store: InMemoryIdempotencyStore | None = None) -> None:
+        self.app = app
+        self.store = store or InMemoryIdempotencyStore(
+            max_entries=settings.idempotency_max_entries,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)(scope, receive, send)
+            return
+
+        body, receive = await _buffer_body(receive)
+        cache_key = (_principal(headers), idempotency_key, scope["method"], scope["path"])
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        try:
+            stored = await self.store.begin(cache_key, fingerprint, settings.idempotency_wait_timeout_seconds)
+        except IdempotencyConflict:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used with a different request"}, status_code=422
+            )
+            await response(scope, receive, send)
+            return
+        except asyncio.TimeoutError:
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        record_cache("idempotency", stored is not None)
+        if stored is not None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": stored.status,
+                    "headers": [*stored.headers, (REPLAYED_HEADER.encode(), b"true")],
+                }
+            )
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        captured: dict = {"status": 500, "headers": [], "body": bytearray()}
+
+        async def capture_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                captured["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture_send)
+        except BaseException:
+            self.store.abandon(cache_key)
+            raise
+
+        if captured["status"] >= 500 or captured["status"] in RETRYABLE_STATUSES:
+            self.store.abandon(cache_key)
+        else:
+            self.store.complete(
+                cache_key, StoredResponse(captured["status"], captured["headers"], bytes(captured["body"]))
+            )
+
+
+async def _buffer_body(receive: Receive) -> tuple[bytes, Receive]:
+    """Read the full request body and return a receive callable that replays it."""
+
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
@@ -0,0 +1,299 @@
+"""Structured, non-blocking logging.
+
+``configure_logging`` routes every record through a ``QueueHandler`` on the
+root logger: the calling thread (usually the event loop) only formats the
+message and puts it on a bounded queue. A ``QueueListener`` thread formats
+records as JSON lines (``LOG_JSON=false`` for plain text) and writes them to
+stderr, so slow log I/O never blocks a request. When the queue is full the
+record is dropped and counted rather than waiting; the next record that
+gets through reports how many were lost.
+
+``RequestContextMiddleware`` gives each request an id (the client's
+``X-Request-ID`` when it is sane, otherwise a new one), echoes it in the
+response and attaches it, with the method, path and milliseconds since the
+request started, to every record logged while handling it.
+
+Warnings and errors from the same call site are sampled: at most
+``LOG_SAMPLE_BURST`` records per ``LOG_SAMPLE_WINDOW_SECONDS``, after which
+they are suppressed until the window ends and the next one reports the
+count. Messages are cut to ``LOG_MAX_MESSAGE_CHARS`` and sensitive keys in
+``extra`` fields are redacted; use ``redact_text`` and ``truncate`` for raw
+request data.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+
+REQUEST_ID_HEADER = "x-request-id"
+REDACTED = "[redacted]"
+# Lower-cased key fragments whose values never reach the logs.
+SENSITIVE_KEYS = ("password", "token", "secret", "authorization", "cookie", "api_key")
+# Call sites tracked by the sampler; the least recently seen are forgotten.
+MAX_SAMPLED_SITES = 1000
+
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+_SENSITIVE_JSON_VALUE = re.compile(
+    r'("[^"]*(?:' + "|".join(SENSITIVE_KEYS) + r')[^"]*"\s*:\s*)("(?:[^"\\]|\\.)*"?|[^,}\s]+)', re.IGNORECASE
+)
+# Attributes every LogRecord has; anything else came in through ``extra``
+# (except uvicorn's ANSI-coloured copy of its message).
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName", "color_message"}
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    request_id: str
+    method: str
+    path: str
+    started: float
+
+
+_request_context: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def current_request_id() -> str | None:
+    context = _request_context.get()
+    return None if context is None else context.request_id
+
+
+def truncate(text: str, limit: int | None = None) -> str:
+    """Cut ``text`` to ``limit`` characters (``LOG_MAX_MESSAGE_CHARS`` by default), noting how much was cut."""
+
+    limit = limit or get_settings().log_max_message_chars
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+
+def _is_sensitive(key: Any) -> bool:
+    return isinstance(key, str) and any(fragment in key.lower() for fragment in SENSITIVE_KEYS)
+
+
+def redact(value: Any) -> Any:
+    """Return ``value`` with the values of sensitive keys replaced, recursively."""
+
+    if isinstance(value, dict):
+        return {key: REDACTED if _is_sensitive(key) else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def redact_text(text: str) -> str:
+    """Redact sensitive ``"key": value`` pairs in JSON text, even when it is cut off."""
+
+    return _SENSITIVE_JSON_VALUE.sub(lambda match: f'{match.group(1)}"{REDACTED}"', text)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request's id, method, path and elapsed time to records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        if context is not None:
+            record.request_id = context.request_id
+            record.method = context.method
+            record.path = context.path
+            record.elapsed_ms = round((time.perf_counter() - context.started) * 1000, 1)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Let through at most ``burst`` warnings or errors per call site and window."""
+
+    def __init__(self, burst: int, window: float) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # (logger, level, file, line) -> [window start, records in window, suppressed]
+        self._sites: OrderedDict[tuple[str, int, str, int], list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return True
+        site = (record.name, record.levelno, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                suppressed = int(state[2]) if state is not None else 0
+                self._sites[site] = [now, 1, 0]
+                self._sites.move_to_end(site)
+                if len(self._sites) > MAX_SAMPLED_SITES:
+                    self._sites.popitem(last=False)
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enqueue pre-rendered records; drop them instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render everything that may reference live objects now, in the caller's thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = truncate(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = truncate(logging.Formatter().formatException(record.exc_info), 8 * 1024)
+        record.exc_info = None
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                record.__dict__[key] = REDACTED if _is_sensitive(key) else redact(value)
+        if self.dropped:
+            record.dropped, self.dropped = self.dropped, 0
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Keep the count this record was carrying for the next one.
+            self.dropped += 1 + getattr(record, "dropped", 0)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields and any ``extra`` ones."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z"
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(request)s%(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, "request_id", None)
+        record.request = f"[{request_id}] " if request_id else ""
+        return super().format(record)
+
+
+_handler: NonBlockingQueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def _start_listener() -> None:
+    global _listener
+    settings = get_settings()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if settings.log_json else TextFormatter())
+    _handler.queue = queue.Queue(settings.log_queue_size)
+    _listener = QueueListener(_handler.queue, stream, respect_handler_level=False)
+    _listener.start()
+
+
+def _restart_after_fork() -> None:
+    # The listener thread does not survive a fork and the old queue's lock may
+    # have been held by it, so a forked worker starts over with fresh ones.
+    if _handler is not None:
+        _start_listener()
+
+
+def configure_logging() -> None:
+    """Install the queue-based pipeline on the root logger; safe to call more than once."""
+
+    global _handler
+    if _handler is not None:
+        return
+    # Read here rather than at import: app.server imports this module before
+    # it sets the pool size for its workers in the environment.
+    settings = get_settings()
+    _handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+    _handler.addFilter(SamplingFilter(settings.log_sample_burst, settings.log_sample_window_seconds))
+    _handler.addFilter(RequestContextFilter())
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(settings.log_level.upper())
+    _start_listener()
+    os.register_at_fork(after_in_child=_restart_after_fork)
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """Assign a request id and expose it to log records and the client."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None or not _VALID_REQUEST_ID.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = _request_context.set(RequestContext(request_id, scope["method"], scope["path"], time.perf_counter()))
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_context.reset(token)
@@ -0,0 +1,170 @@
+"""Memory diagnostics for a single worker.
+
+``tracemalloc`` is only started on request (``start_tracing``), so nothing is
+traced and nothing costs anything until an admin turns it on. While tracing,
+snapshots can be taken, reported as top allocation sites by ``file:line`` and
+compared with each other; the last ``MEMORY_MAX_SNAPSHOTS`` are kept.
+
+``object_counts`` walks the garbage collector's objects once and counts live
+ORM instances per mapped class, pydantic models per class and the entries
+held in session identity maps. It works without tracing but blocks the worker
+for the length of the walk, so it is meant for occasional manual use.
+
+Everything here describes the worker process that serves the request; with
+several workers, repeat the call until each has answered (see ``pid``).
+"""
+
+from __future__ import annotations
+
+import gc
+import itertools
+import os
+import tracemalloc
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import Base
+
+
+settings = get_settings()
+
+# Allocations made by tracemalloc itself or by the import machinery.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass
+class MemorySnapshot:
+    id: int
+    taken_at: datetime
+    traced_bytes: int
+    snapshot: tracemalloc.Snapshot
+
+
+@dataclass
+class AllocationStat:
+    location: str
+    size_bytes: int
+    count: int
+    size_diff_bytes: int = 0
+    count_diff: int = 0
+
+
+_snapshots: OrderedDict[int, MemorySnapshot] = OrderedDict()
+_snapshot_ids = itertools.count(1)
+
+
+def is_tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def start_tracing(frames: int = 1) -> None:
+    """Start tracing allocations, keeping ``frames`` frames per traceback."""
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    """Stop tracing and drop every snapshot, releasing the memory they hold."""
+
+    tracemalloc.stop()
+    _snapshots.clear()
+
+
+def traced_memory() -> tuple[int, int]:
+    """Return current and peak traced bytes (zero when not tracing)."""
+
+    return tracemalloc.get_traced_memory()
+
+
+def take_snapshot() -> MemorySnapshot:
+    """Snapshot the traced allocations; tracing must be running."""
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    entry = MemorySnapshot(
+        id=next(_snapshot_ids),
+        taken_at=datetime.now(timezone.utc),
+        traced_bytes=tracemalloc.get_traced_memory()[0],
+        snapshot=snapshot,
+    )
+    _snapshots[entry.id] = entry
+    while len(_snapshots) > settings.memory_max_snapshots:
+        _snapshots.popitem(last=False)
+    return entry
+
+
+def get_snapshot(snapshot_id: int) -> MemorySnapshot | None:
+    return _snapshots.get(snapshot_id)
+
+
+def list_snapshots() -> list[MemorySnapshot]:
+    return list(_snapshots.values())
+
+
+def _location(traceback: tracemalloc.Traceback) -> str:
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_allocations(entry: MemorySnapshot, limit: int) -> list[AllocationStat]:
+    """Largest allocation sites of a snapshot by ``file:line``."""
+
+    return [
+        AllocationStat(location=_location(stat.traceback), size_bytes=stat.size, count=stat.count)
+        for stat in entry.snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def compare_snapshots(older: MemorySnapshot, newer: MemorySnapshot, limit: int) -> list[AllocationStat]:
+    """Allocation sites that grew or shrank the most between two snapshots."""
+
+    return [
+        AllocationStat(
+            location=_location(stat.traceback),
+            size_bytes=stat.size,
+            count=stat.count,
+            size_diff_bytes=stat.size_diff,
+            count_diff=stat.count_diff,
+        )
+        for stat in newer.snapshot.compare_to(older.snapshot, "lineno")[:limit]
+    ]
+
+
+def object_counts() -> dict[str, object]:
+    """Count live ORM instances, pydantic models and identity map entries."""
+
+    orm: Counter[str] = Counter()
+    pydantic: Counter[str] = Counter()
+    sessions = identity_map_entries = 0
+    objects = gc.get_objects()
+    for obj in objects:
+        if isinstance(obj, Base):
+            orm[type(obj).__name__] += 1
+        elif isinstance(obj, BaseModel):
+            pydantic[type(obj).__name__] += 1
+        elif isinstance(obj, Session):
+            sessions += 1
+            identity_map_entries += len(obj.identity_map)
+    total = len(objects)
+    del objects
+
+    for mapper in Base.registry.mappers:
+        orm.setdefault(mapper.class_.__name__, 0)
+    return {
+        "pid": os.getpid(),
+        "gc_objects": total,
+        "sessions": sessions,
+        "identity_map_entries": identity_map_entries,
+        "orm": dict(sorted(orm.items())),
+        "pydantic": dict(pydantic.most_common()),
+    }
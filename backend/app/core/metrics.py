@@ -0,0 +1,166 @@
+"""Prometheus metrics for requests, the database pool, hashing and caches.
+
+``MetricsMiddleware`` records latency and status per route template (never
+the raw path, so ids do not explode label cardinality) and the number of
+requests in flight. Pool gauges are read from the engine only when
+``/metrics`` is scraped. Caches report hits and misses through
+``record_cache``; the worker-local caches also count the invalidations
+they apply. Admission control reports its limits, queues and rejections.
+
+With several worker processes each worker exposes its own series; set
+``PROMETHEUS_MULTIPROC_DIR`` to aggregate them (see the prometheus_client
+documentation on multiprocess mode).
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.session import engine
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS = Counter("http_requests", "HTTP responses by route template and status.", ["method", "route", "status"])
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being handled.", ["method"])
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent in bcrypt hashing and verification.",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+
+CACHE_REQUESTS = Counter("cache_requests", "Cache lookups by cache and result.", ["cache", "result"])
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations", "Invalidation keys applied and full resyncs of the worker-local caches.", ["kind"]
+)
+
+ADMISSION_LIMIT = Gauge("admission_limit", "Concurrent requests admitted per route class.", ["route_class"])
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Admitted requests running per route class.", ["route_class"])
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for admission per route class.", ["route_class"])
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests waited in the admission queue.",
+    ["route_class"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected", "Requests shed by admission control by route class and reason.", ["route_class", "reason"]
+)
+RATE_LIMITED = Counter("rate_limited", "Requests rejected by rate limiting by route and key kind.", ["route", "kind"])
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a lookup in ``cache``; the hit ratio is derived at query time."""
+
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class PoolCollector(Collector):
+    """Expose connection pool state of the application engine at scrape time."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        pool = engine.sync_engine.pool
+        for name, documentation, read in (
+            ("db_pool_size", "Configured pool size.", "size"),
+            ("db_pool_checked_out", "Connections currently checked out.", "checkedout"),
+            ("db_pool_checked_in", "Idle connections in the pool.", "checkedin"),
+            ("db_pool_overflow", "Overflow connections (negative while below the pool size).", "overflow"),
+        ):
+            reader = getattr(pool, read, None)
+            if reader is not None:
+                yield GaugeMetricFamily(name, documentation, value=reader())
+
+
+REGISTRY.register(PoolCollector())
+
+
+def metrics_response() -> Response:
+    """Render every registered metric in the Prometheus text format."""
+
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+# Labelled children looked up once; ``labels()`` takes a lock on every call.
+_children: dict[tuple, Any] = {}
+
+
+def _child(metric: Any, *labels: str) -> Any:
+    key = (id(metric), *labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+# Keyed by id(): routes are unhashable but live as long as the application.
+_route_templates: dict[int, str] = {}
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        # Mounted apps (static files) have an endpoint but no route.
+        return f"{scope.get('root_path', '')}/{{path}}" if "endpoint" in scope else UNMATCHED_ROUTE
+    template = _route_templates.get(id(route))
+    if template is None:
+        # Routes of included routers may carry only their own path; recover
+        # the include prefix as the part of the path in front of the match.
+        path = scope["path"]
+        prefix = next(
+            (path[:index] for index in range(len(path)) if path[index] == "/" and route.path_regex.match(path[index:])),
+            "",
+        )
+        template = _route_templates[id(route)] = prefix + route.path_format
+    return template
+
+
+class MetricsMiddleware:
+    """Record latency, status and in-flight count for every HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+        finished: float | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks still to run are not part of the latency.
+                finished = time.perf_counter()
+
+        in_progress = _child(REQUESTS_IN_PROGRESS, method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = _route_template(scope)
+            _child(REQUEST_DURATION, method, route).observe((finished or time.perf_counter()) - started)
+            _child(REQUESTS, method, route, str(status_code)).inc()
@@ -0,0 +1,247 @@
+"""On-demand request profiling.
+
+A request is profiled when an admin sends ``X-Debug-Profile: 1`` or when it
+falls into the ``PROFILING_SAMPLE_RATE`` fraction of traffic. The admin check
+runs before rate limiting and admission control, so it never touches the
+database: the role comes from the worker's principal cache, which holds
+everyone who made an authenticated request to this worker recently. An
+admin's first request to a worker, or any while cache invalidation is down,
+is therefore not profiled by header. While it runs,
+a sampler thread records the event loop thread's stack every
+``PROFILING_INTERVAL_SECONDS`` and SQLAlchemy events record each statement
+with its duration. Finished profiles go into a bounded in-memory ring and are
+served by ``/api/v1/debug/profiles``; the response carries ``X-Profile-Id``.
+
+Stacks are stored in the folded format (``root;child;leaf count``) that
+flamegraph.pl, speedscope and similar tools read directly. Samples cover the
+whole event loop thread, so work of other requests that ran concurrently on
+it shows up as well.
+
+Unprofiled requests only pay for a header lookup and, per statement, a
+context variable lookup in the SQL listeners.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import FrameType
+
+from sqlalchemy import event
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.security import decode_access_token
+from app.db.session import engine
+from app.models import UserRole
+from app.services.invalidation import principal_cache, user_key
+
+
+settings = get_settings()
+
+PROFILE_HEADER = "x-debug-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+MAX_STATEMENT_LENGTH = 2000
+
+
+@dataclass
+class ProfiledQuery:
+    statement: str
+    duration_ms: float
+
+
+@dataclass
+class RequestProfile:
+    """Samples and SQL captured for one request."""
+
+    id: str
+    method: str
+    path: str
+    trigger: str
+    started_at: datetime
+    status: int = 500
+    duration_ms: float = 0.0
+    samples: Counter[str] = field(default_factory=Counter)
+    queries: list[ProfiledQuery] = field(default_factory=list)
+
+    def collapsed(self) -> str:
+        """Folded stacks, one ``frame;frame;frame count`` line per distinct stack."""
+
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """Keep the most recent ``max_entries`` profiles."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        return self._profiles.get(profile_id)
+
+    def recent(self) -> list[RequestProfile]:
+        return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(settings.profiling_max_profiles)
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+_active_profiles = 0
+_active_lock = threading.Lock()
+
+
+# Longest first, so site-packages wins over the stdlib directory containing it.
+_PATH_PREFIXES = sorted(
+    {os.path.join(path, "") for path in (*map(sysconfig.get_path, ("purelib", "platlib", "stdlib")), os.getcwd())},
+    key=len,
+    reverse=True,
+)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """Sample one thread's stack at a fixed interval until stopped."""
+
+    def __init__(self, thread_id: int, interval: float, samples: Counter[str]) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = samples
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        """Ask the thread to finish; it exits within one sample, ``join`` to wait for it."""
+
+        self._stopped.set()
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_profile.get() is not None and context is not None:
+        context.profile_query_started = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current_profile.get()
+    started = getattr(context, "profile_query_started", None)
+    if profile is not None and started is not None:
+        duration_ms = (time.perf_counter() - started) * 1000
+        profile.queries.append(ProfiledQuery(statement[:MAX_STATEMENT_LENGTH], round(duration_ms, 3)))
+
+
+def _start_profile() -> None:
+    global _active_profiles
+    with _active_lock:
+        _active_profiles += 1
+
+
+def _finish_profile() -> None:
+    global _active_profiles
+    with _active_lock:
+        _active_profiles -= 1
+
+
+def _is_admin(headers: Headers) -> bool:
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = uuid.UUID(str(decode_access_token(token).get("sub")))
+    except ValueError:
+        return False
+    principal = principal_cache.peek(user_key(user_id), None)
+    return principal is not None and principal["role"] == UserRole.ADMIN
+
+
+class ProfilingMiddleware:
+    """Profile admin-requested and sampled requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None or _active_profiles >= settings.profiling_max_concurrent:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            id=uuid.uuid4().hex,
+            method=scope["method"],
+            path=scope["path"],
+            trigger=trigger,
+            started_at=datetime.now(timezone.utc),
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.encode(), profile.id.encode())]
+            await send(message)
+
+        sampler = _Sampler(threading.get_ident(), settings.profiling_interval_seconds, profile.samples)
+        token = _current_profile.set(profile)
+        _start_profile()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            profile.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            _finish_profile()
+            _current_profile.reset(token)
+            # The sampler may be taking a sample; wait for it off the event loop.
+            await asyncio.to_thread(sampler.join)
+            profile_store.add(profile)
+
+    @staticmethod
+    def _trigger(scope: Scope) -> str | None:
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) and _is_admin(headers):
+            return "header"
+        if settings.profiling_sample_rate and random.random() < settings.profiling_sample_rate:
+            return "sampled"
+        return None
@@ -0,0 +1,249 @@
+"""Token-bucket rate limiting by client IP, account email and user id.
+
+Limits are set per route, as ``"METHOD /path/{template}"`` or as a route
+class from ``app.core.admission``, and per key kind: ``ip`` (the client
+address; run uvicorn with ``--proxy-headers`` behind a proxy), ``email``
+(the account being logged into or registered) and ``user`` (the bearer
+token's subject). Each is a bucket holding up to ``burst`` requests that
+refills at a steady rate per minute. ``RATE_LIMITS`` overrides
+``DEFAULT_LIMITS``.
+
+``RateLimitMiddleware`` checks the ``ip`` and ``user`` keys before a
+request is admitted. The auth routes call ``limit_by_email`` before they
+touch the database or bcrypt. Either way, a request over its limit gets
+``429`` with ``Retry-After``, for the cost of a dictionary lookup.
+
+Buckets live in each worker's memory, so every worker allows the full
+rate. Set ``RATE_LIMIT_REDIS_URL`` to share the buckets between workers and
+hosts (this needs the ``redis`` package). If Redis cannot be reached, the
+worker falls back to its local buckets rather than failing requests.
+``MemoryBackend`` implements the same interface as ``RedisBackend`` and
+stands in for it in tests.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from fastapi import HTTPException, Request, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.admission import RouteClass, route_class, route_pattern
+from app.core.config import get_settings
+from app.core.metrics import RATE_LIMITED
+from app.core.security import decode_access_token
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+IP = "ip"
+EMAIL = "email"
+USER = "user"
+# Redis round trips slower than this fall back to the local buckets.
+REDIS_TIMEOUT_SECONDS = 0.1
+
+# route -> key kind -> (requests per minute, burst)
+DEFAULT_LIMITS: dict[str, dict[str, tuple[float, int]]] = {
+    # Every attempt costs a bcrypt verification.
+    "POST /auth/token": {IP: (30, 10), EMAIL: (10, 5)},
+    # Every registration costs a bcrypt hash.
+    "POST /auth/register": {IP: (10, 5), EMAIL: (5, 3)},
+    RouteClass.WRITE.value: {USER: (120, 60)},
+}
+
+
+def _merge_limits() -> dict[str, dict[str, tuple[float, int]]]:
+    limits = {route: dict(kinds) for route, kinds in DEFAULT_LIMITS.items()}
+    for route, kinds in settings.rate_limits.items():
+        limits.setdefault(route, {}).update({kind: (rate, burst) for kind, (rate, burst) in kinds.items()})
+    return limits
+
+
+_limits = _merge_limits()
+_route_limits: list[tuple[str, str, re.Pattern[str]]] = [
+    (method.upper(), route, route_pattern(template))
+    for route in _limits
+    for method, _, template in [route.partition(" ")]
+    if template
+]
+
+
+def route_limits(method: str, path: str) -> tuple[str, dict[str, tuple[float, int]]] | None:
+    """Return the route key and limits for an API request, or ``None`` if it is not limited."""
+
+    klass = route_class(method, path)
+    if klass is None:
+        return None
+    path = path[len(settings.api_v1_prefix):]
+    for route_method, route, pattern in _route_limits:
+        if route_method == method and pattern.fullmatch(path):
+            return route, _limits[route]
+    limits = _limits.get(klass.value)
+    return None if limits is None else (klass.value, limits)
+
+
+class RateLimitBackend(Protocol):
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from ``key``'s bucket; return 0 or the seconds until one is available."""
+
+
+class MemoryBackend:
+    """Buckets in this worker's memory; the least recently used keys are forgotten."""
+
+    def __init__(self, max_keys: int | None = None) -> None:
+        self.max_keys = max_keys or settings.rate_limit_max_keys
+        # key -> [tokens, monotonic time of last update]
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(burst), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+
+# Same algorithm as MemoryBackend.take, atomic in Redis and on the server's clock.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Buckets shared through Redis, falling back to local ones while it is unavailable."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed") from exc
+        self._errors = (OSError, TimeoutError, redis.RedisError)
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=REDIS_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._fallback = MemoryBackend()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            return float(await self._take(keys=[f"rate_limit:{key}"], args=[rate, burst]))
+        except self._errors as exc:
+            logger.warning(f"Rate limit backend unavailable ({exc!r}), using local buckets")
+            return await self._fallback.take(key, rate, burst)
+
+
+def _backend() -> RateLimitBackend:
+    if settings.rate_limit_redis_url:
+        return RedisBackend(settings.rate_limit_redis_url)
+    return MemoryBackend()
+
+
+backend: RateLimitBackend = _backend()
+
+
+async def check(route: str, limits: dict[str, tuple[float, int]], kind: str, value: str) -> float:
+    """Spend a token for ``value`` if ``route`` limits ``kind``; return 0 or the seconds to wait."""
+
+    if kind not in limits or not settings.rate_limit_enabled:
+        return 0.0
+    per_minute, burst = limits[kind]
+    wait = await backend.take(f"{route}|{kind}|{value}", per_minute / 60, burst)
+    if wait:
+        RATE_LIMITED.labels(route, kind).inc()
+    return wait
+
+
+def _retry_after(wait: float) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(wait)))}
+
+
+async def limit_by_email(request: Request, email: str) -> None:
+    """Raise ``429`` if the account ``email`` is over its limit on this route."""
+
+    matched = route_limits(request.method, request.url.path)
+    if matched is None:
+        return
+    wait = await check(*matched, EMAIL, email.strip().lower())
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please retry later",
+            headers=_retry_after(wait),
+        )
+
+
+def _token_subject(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                return decode_access_token(token).get("sub")
+            except ValueError:
+                return None
+    return None
+
+
+class RateLimitMiddleware:
+    """Answer 429 for API requests over their ``ip`` or ``user`` limit."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        matched = route_limits(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if matched is None or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        route, limits = matched
+        wait = 0.0
+        if IP in limits and scope.get("client"):
+            wait = await check(route, limits, IP, scope["client"][0])
+        if not wait and USER in limits:
+            # Unauthenticated requests are rejected by the route itself.
+            subject = _token_subject(scope)
+            if subject is not None:
+                wait = await check(route, limits, USER, subject)
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many requests, please retry later"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers=_retry_after(wait),
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -7,6 +7,7 @@ from typing import Any, Optional
 from jose import JWTError, jwt
 
 from app.core.config import get_settings
+from app.core.metrics import PASSWORD_HASH_DURATION
 
 
 settings = get_settings()
@@ -18,7 +19,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         # bcrypt expects bytes
         password_bytes = plain_password.encode('utf-8')
         hash_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        with PASSWORD_HASH_DURATION.labels("verify").time():
+            return bcrypt.checkpw(password_bytes, hash_bytes)
     except Exception:
         return False
 
@@ -27,7 +29,8 @@ def get_password_hash(password: str) -> str:
     """Hash a password for storing."""
     password_bytes = password.encode('utf-8')
     salt = bcrypt.gensalt()
-    hashed_bytes = bcrypt.hashpw(password_bytes, salt)
+    with PASSWORD_HASH_DURATION.labels("hash").time():
+        hashed_bytes = bcrypt.hashpw(password_bytes, salt)
     return hashed_bytes.decode('utf-8')
 
 
@@ -0,0 +1,58 @@
+"""Fast JSON serialization for API responses.
+
+FastAPI validates a handler's return value against ``response_model`` and
+serializes it again before rendering, so models the handler already built
+are processed twice. Handlers on hot paths can instead return
+``FastJSONResponse`` with pre-validated models or plain row mappings; those
+are written straight to bytes (pydantic-core for models, orjson otherwise)
+while ``response_model`` still documents the shape in OpenAPI.
+"""
+
+import uuid
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """Return a cached ``TypeAdapter``; building one compiles a serializer."""
+
+    return TypeAdapter(tp)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Mapping):
+        return dict(value)
+    # asyncpg returns its own UUID subclass, which orjson does not recognise.
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize models, lists of models, row mappings or plain data to JSON bytes."""
+
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if isinstance(content, Sequence) and not isinstance(content, str) and content:
+        first = content[0]
+        if isinstance(first, BaseModel):
+            return type_adapter(list[type(first)]).dump_json(content)
+    # OPT_UTC_Z renders UTC datetimes with "Z", matching pydantic's output.
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered without a second validation pass."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,5 +1,6 @@
 """Database engine and session management."""
 
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -13,7 +14,13 @@ class Base(DeclarativeBase):
     """Declarative base for ORM models."""
 
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+)
 
 AsyncSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -23,3 +30,22 @@ async def get_session() -> AsyncSession:
 
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def asyncpg_dsn(database: str | None = None) -> str:
+    """Return ``DATABASE_URL`` as a plain DSN for connections opened with asyncpg directly."""
+
+    url = make_url(settings.database_url).set(drivername="postgresql")
+    if database is not None:
+        url = url.set(database=database)
+    return url.render_as_string(hide_password=False)
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """FastAPI dependency for work that must own its sessions.
+
+    Computations shared between requests (see ``SingleFlight``) outlive any
+    single request's session, so they open their own.
+    """
+
+    return AsyncSessionLocal
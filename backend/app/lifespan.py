@@ -0,0 +1,154 @@
+"""Application lifespan: warm up before taking traffic, release resources on shutdown.
+
+A fresh worker pays for opening database connections, asyncpg type
+introspection, SQLAlchemy statement compilation and building serializers
+and the OpenAPI schema on its first requests. The warm-up runs those once
+in the background right after startup:
+
+1. open ``WARMUP_CONNECTIONS`` pool connections at the same time (at most the
+   pool size, so they stay pooled);
+2. run the catalog, course, lesson and stats reads once, which compiles their
+   statements and fills the stats cache;
+3. build the ``TypeAdapter`` for every route's response model and the
+   OpenAPI schema.
+
+``/readyz`` answers 503 until the warm-up has finished, while ``/healthz``
+reports liveness from the start. A failed warm-up (usually the database not
+being reachable yet) is retried every ``WARMUP_RETRY_SECONDS``.
+
+Alongside the warm-up, the worker starts listening for cache invalidations
+(see ``app.services.invalidation``) unless ``INVALIDATION_ENABLED`` is off,
+and schedules the sweep of deleted courses (``app.services.course_purge``).
+
+On shutdown the worker reports not ready, stops a pending warm-up, the
+invalidation listener and the sweep, shuts down the bcrypt process pool if
+it was started and closes the pool's connections. The server stops
+accepting and finishes in-flight requests before the lifespan exits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from starlette.routing import BaseRoute
+
+from app.api.routes import stats
+from app.core.config import get_settings
+from app.core.serialization import dumps, type_adapter
+from app.db.session import AsyncSessionLocal, engine
+from app.services import read_models
+from app.services.bulk_import import get_hashing_pool
+from app.services.course_purge import sweep_periodically
+from app.services.invalidation import listener
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def preconnect(count: int) -> int:
+    """Open ``count`` pooled connections concurrently and return them to the pool."""
+
+    count = min(count, engine.sync_engine.pool.size())
+    if count < 1:
+        return 0
+    # Hold every connection until all are open so each checkout opens a new one.
+    barrier = asyncio.Barrier(count)
+
+    async def hold() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await barrier.wait()
+
+    await asyncio.gather(*(hold() for _ in range(count)))
+    return count
+
+
+async def run_hot_queries() -> None:
+    """Run the public read paths once and serialize their results."""
+
+    async with AsyncSessionLocal() as session:
+        await read_models.catalog_version(session)
+        cards = await read_models.catalog_cards(session)
+        dumps(cards)
+        if cards:
+            course_id = cards[0]["id"]
+            await read_models.course_version(session, course_id)
+            for outline in (False, True):
+                dumps(await read_models.course_detail(session, course_id, outline=outline))
+            lessons = await read_models.course_lessons(session, course_id, outline=True)
+            if lessons:
+                dumps(await read_models.lesson(session, lessons[0]["id"]))
+        await stats.cached_platform_stats(session)
+
+
+def _api_routes(routes: Iterable[BaseRoute]) -> Iterator[APIRoute]:
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        nested = getattr(route, "original_router", None)
+        if nested is not None:
+            yield from _api_routes(nested.routes)
+
+
+def build_serializers(app: FastAPI) -> None:
+    """Build response model serializers and the OpenAPI schema."""
+
+    for route in _api_routes(app.routes):
+        if route.response_model is not None:
+            type_adapter(route.response_model)
+    app.openapi()
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Warm the worker up, retrying until it succeeds, then mark it ready."""
+
+    while True:
+        started = time.perf_counter()
+        try:
+            connections = await preconnect(settings.warmup_connections)
+            await run_hot_queries()
+            build_serializers(app)
+        except Exception:  # noqa: BLE001 - retried until the database is reachable
+            logger.exception(f"Warm-up failed, retrying in {settings.warmup_retry_seconds:g}s")
+            await asyncio.sleep(settings.warmup_retry_seconds)
+            continue
+        app.state.ready = True
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s ({connections} connections)")
+        return
+
+
+async def shutdown() -> None:
+    """Release the worker's process pool and database connections."""
+
+    if get_hashing_pool.cache_info().currsize:
+        get_hashing_pool().shutdown(wait=True, cancel_futures=True)
+        get_hashing_pool.cache_clear()
+    await engine.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = not settings.warmup_enabled
+    tasks = []
+    if settings.invalidation_enabled:
+        tasks.append(asyncio.create_task(listener.run()))
+    if settings.warmup_enabled:
+        tasks.append(asyncio.create_task(warm_up(app)))
+    if settings.course_purge_interval_seconds > 0:
+        tasks.append(asyncio.create_task(sweep_periodically()))
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await shutdown()
@@ -1,36 +1,89 @@
 """FastAPI application entrypoint for Edu Learn Pro."""
 
 import logging
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.exc import DBAPIError
 
 from app.api.routes import api_router
+from app.core.admission import AdmissionMiddleware
 from app.core.config import get_settings
+from app.core.deadlines import DeadlineMiddleware, deadline_exceeded_response, is_query_canceled
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.logs import RequestContextMiddleware, configure_logging, redact_text
+from app.core.metrics import MetricsMiddleware, metrics_response
+from app.core.profiling import ProfilingMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.serialization import FastJSONResponse
+from app.lifespan import lifespan
 
 
 settings = get_settings()
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title=settings.project_name)
+app = FastAPI(title=settings.project_name, default_response_class=FastJSONResponse, lifespan=lifespan)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    """Log validation errors for debugging."""
-    logger.error(f"Validation error: {exc.errors()}")
-    try:
+    """Log validation errors for debugging.
+
+    Only the start of JSON bodies is logged, with credentials redacted;
+    uploads and other bodies are described by type and size.
+    """
+    errors = [{key: value for key, value in error.items() if key != "input"} for error in exc.errors()]
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
         body = await request.body()
-        logger.error(f"Request body: {body.decode() if body else 'empty'}")
-    except Exception as e:
-        logger.error(f"Could not read request body: {e}")
+        preview = redact_text(body[: settings.log_max_body_bytes].decode("utf-8", errors="replace"))
+        if len(body) > settings.log_max_body_bytes:
+            preview += f"... [{len(body) - settings.log_max_body_bytes} more bytes]"
+    else:
+        preview = f"<{content_type or 'no content type'}, {request.headers.get('content-length', '?')} bytes>"
+    logger.warning("Validation error", extra={"errors": errors, "body": preview})
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": exc.errors()},
+        content={"detail": jsonable_encoder(exc.errors())},
     )
 
+@app.exception_handler(TimeoutError)
+async def timeout_exception_handler(request: Request, exc: TimeoutError):
+    """Answer reads that ran past their deadline with a retryable 503."""
+    logger.warning(f"Timed out: {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Request timed out, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(DBAPIError)
+async def database_exception_handler(request: Request, exc: DBAPIError):
+    """Answer queries cancelled by the request's statement timeout with a retryable 503."""
+    if not is_query_canceled(exc):
+        raise exc
+    logger.warning(f"Statement timeout: {request.method} {request.url.path}")
+    return deadline_exceeded_response()
+
+# Replays responses for retried requests carrying an Idempotency-Key; added
+# before CORS so replayed responses still get CORS headers.
+app.add_middleware(IdempotencyMiddleware)
+
+# Sheds API requests beyond the per-class limits with 503 before they queue on
+# the database pool; inside CORS so rejections still carry CORS headers.
+app.add_middleware(AdmissionMiddleware)
+
+# Gives API requests a deadline that also bounds their database statements;
+# outside admission control so time spent queued counts against it.
+app.add_middleware(DeadlineMiddleware)
+
+# Rejects clients and users over their rate limits with 429 before they are
+# admitted or get a deadline.
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware - must be added before routes
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +102,17 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Profiles admin-requested (X-Debug-Profile) and sampled requests; a no-op
+# for everything else.
+app.add_middleware(ProfilingMiddleware)
+
+# Wraps the others, so latency includes every other middleware.
+app.add_middleware(MetricsMiddleware)
+
+# Outermost, so every record logged while handling a request carries its id
+# (also returned in X-Request-ID).
+app.add_middleware(RequestContextMiddleware)
+
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 app.mount("/media", StaticFiles(directory="media"), name="media")
 
@@ -58,3 +122,19 @@ async def health_check() -> dict[str, str]:
     """Simple health check endpoint."""
 
     return {"status": "ok", "service": settings.project_name}
+
+
+@app.get("/readyz", tags=["health"])
+async def readiness_check() -> JSONResponse:
+    """Readiness check; 503 until the warm-up has finished and again while shutting down."""
+
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "warming up"})
+    return JSONResponse(content={"status": "ready", "service": settings.project_name})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus scrape endpoint."""
+
+    return metrics_response()
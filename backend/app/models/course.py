@@ -7,7 +7,7 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum as SQLEnum, ForeignKey, String, Text, TypeDecorator, func
+from sqlalchemy import DateTime, Enum as SQLEnum, ForeignKey, Index, String, Text, TypeDecorator, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -85,6 +85,9 @@ class Course(Base):
     """Persisted course record."""
 
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title: Mapped[str] = mapped_column(String(length=200), index=True)
@@ -107,13 +110,19 @@ class Course(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # Set when the course is deleted; the rows are purged later in batches.
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     instructor: Mapped["User"] = relationship(back_populates="owned_courses", lazy="joined")
     lessons: Mapped[list["Lesson"]] = relationship(
-        back_populates="course", cascade="all, delete-orphan", order_by="Lesson.position", lazy="selectin"
+        back_populates="course",
+        cascade="all, delete-orphan",
+        order_by="Lesson.position",
+        lazy="selectin",
+        passive_deletes=True,
     )
     enrollments: Mapped[list["Enrollment"]] = relationship(
-        back_populates="course", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="course", cascade="all, delete-orphan", lazy="selectin", passive_deletes=True
     )
 
     def __repr__(self) -> str:  # pragma: no cover
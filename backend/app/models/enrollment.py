@@ -104,7 +104,7 @@ class Enrollment(Base):
     student: Mapped["User"] = relationship(back_populates="enrollments", lazy="joined")
     course: Mapped["Course"] = relationship(back_populates="enrollments", lazy="joined")
     lesson_progress: Mapped[list["LessonProgress"]] = relationship(
-        back_populates="enrollment", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="enrollment", cascade="all, delete-orphan", lazy="selectin", passive_deletes=True
     )
 
 
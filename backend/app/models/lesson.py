@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -21,11 +21,16 @@ class Lesson(Base):
     """Persisted lesson record."""
 
     __tablename__ = "lessons"
+    __table_args__ = (
+        # Serves per-course lesson listings and their ETag version lookups.
+        Index("ix_lessons_course_id_updated_at", "course_id", "updated_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"))
     title: Mapped[str] = mapped_column(String(length=200))
-    content: Mapped[str] = mapped_column(Text)
+    # Lesson bodies can be large; load them only when explicitly requested.
+    content: Mapped[str] = mapped_column(Text, deferred=True)
     video_url: Mapped[str | None] = mapped_column(String(length=500), nullable=True)
     thumbnail_url: Mapped[str | None] = mapped_column(String(length=500), nullable=True)
     position: Mapped[int] = mapped_column(Integer, default=0)
@@ -37,7 +42,7 @@ class Lesson(Base):
 
     course: Mapped["Course"] = relationship(back_populates="lessons", lazy="joined")
     progresses: Mapped[list["LessonProgress"]] = relationship(
-        back_populates="lesson", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="lesson", cascade="all, delete-orphan", lazy="selectin", passive_deletes=True
     )
 
     def __repr__(self) -> str:  # pragma: no cover
@@ -107,7 +107,7 @@ class User(Base):
     )
 
     owned_courses: Mapped[list["Course"]] = relationship(
-        back_populates="instructor", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="instructor", cascade="all, delete-orphan", lazy="selectin", passive_deletes=True
     )
     enrollments: Mapped[list["Enrollment"]] = relationship(back_populates="student", lazy="selectin")
 
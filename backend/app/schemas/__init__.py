@@ -1,9 +1,48 @@
 """Pydantic schemas for Edu Learn Pro."""
 
-from .course import CourseBase, CourseCreate, CourseDetail, CourseRead, CourseSummary, CourseUpdate
+from .course import (
+    CourseBase,
+    CourseCreate,
+    CourseDetail,
+    CourseOutline,
+    CourseRead,
+    CourseSummary,
+    CourseUpdate,
+    CourseView,
+)
 from .dashboard import CourseAnalytics, InstructorDashboard, ProgressOverview, StudentDashboard
-from .enrollment import CertificateRead, EnrollmentCreate, EnrollmentDetail, EnrollmentRead, LessonProgressRead, ProgressUpdate
-from .lesson import LessonBase, LessonCreate, LessonRead, LessonUpdate
+from .diagnostics import (
+    AllocationDiffRead,
+    AllocationStatRead,
+    MemorySnapshotComparison,
+    MemorySnapshotRead,
+    MemorySnapshotReport,
+    MemoryStatus,
+    ObjectCounts,
+    ProfileDetail,
+    ProfiledQueryRead,
+    ProfileSummary,
+)
+from .enrollment import (
+    BulkEnrollmentCreate,
+    BulkEnrollmentResult,
+    CertificateRead,
+    EnrollmentCreate,
+    EnrollmentDetail,
+    EnrollmentRead,
+    ExportFormat,
+    LessonProgressRead,
+    ProgressUpdate,
+)
+from .imports import (
+    CourseImport,
+    EnrollmentImport,
+    ImportEntity,
+    ImportFormat,
+    ImportReport,
+    ImportRowError,
+)
+from .lesson import LessonBase, LessonCreate, LessonOutline, LessonRead, LessonUpdate
 from .stats import PlatformStats
 from .user import AuthResponse, ProfileRead, ProfileUpdate, Token, TokenData, UserBase, UserCreate, UserRead, UserUpdate
 
@@ -11,21 +50,43 @@ __all__ = [
     "CourseBase",
     "CourseCreate",
     "CourseDetail",
+    "CourseOutline",
     "CourseRead",
     "CourseSummary",
     "CourseUpdate",
+    "CourseView",
     "CourseAnalytics",
     "InstructorDashboard",
     "ProgressOverview",
     "StudentDashboard",
+    "AllocationDiffRead",
+    "AllocationStatRead",
+    "MemorySnapshotComparison",
+    "MemorySnapshotRead",
+    "MemorySnapshotReport",
+    "MemoryStatus",
+    "ObjectCounts",
+    "ProfileDetail",
+    "ProfiledQueryRead",
+    "ProfileSummary",
+    "BulkEnrollmentCreate",
+    "BulkEnrollmentResult",
     "CertificateRead",
     "EnrollmentCreate",
     "EnrollmentDetail",
     "EnrollmentRead",
+    "ExportFormat",
     "LessonProgressRead",
     "ProgressUpdate",
+    "CourseImport",
+    "EnrollmentImport",
+    "ImportEntity",
+    "ImportFormat",
+    "ImportReport",
+    "ImportRowError",
     "LessonBase",
     "LessonCreate",
+    "LessonOutline",
     "LessonRead",
     "LessonUpdate",
     "PlatformStats",
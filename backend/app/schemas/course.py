@@ -1,11 +1,12 @@
 """Course schemas."""
 
+from enum import Enum
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
 from app.models import CourseLevel, CourseStatus
-from app.schemas.lesson import LessonRead
+from app.schemas.lesson import LessonOutline, LessonRead
 from app.schemas.base import ORMModel
 
 
@@ -36,10 +37,19 @@ class CourseRead(CourseBase, ORMModel):
     instructor_id: UUID
 
 
+class CourseView(str, Enum):  # type: ignore[misc]
+    FULL = "full"
+    OUTLINE = "outline"
+
+
 class CourseDetail(CourseRead):
     lessons: list[LessonRead] = Field(default_factory=list)
 
 
+class CourseOutline(CourseRead):
+    lessons: list[LessonOutline] = Field(default_factory=list)
+
+
 class CourseSummary(BaseModel):
     id: UUID
     title: str
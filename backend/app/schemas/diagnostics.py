@@ -0,0 +1,75 @@
+"""Admin diagnostics schemas."""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.base import ORMModel
+
+
+class ProfiledQueryRead(ORMModel):
+    statement: str
+    duration_ms: float
+
+
+class ProfileSummary(ORMModel):
+    id: str
+    method: str
+    path: str
+    trigger: str
+    started_at: datetime
+    status: int
+    duration_ms: float
+
+
+class ProfileDetail(ProfileSummary):
+    """A request profile; ``samples`` maps folded stacks to sample counts."""
+
+    samples: dict[str, int]
+    queries: list[ProfiledQueryRead]
+
+
+class MemorySnapshotRead(ORMModel):
+    id: int
+    taken_at: datetime
+    traced_bytes: int
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool
+    current_bytes: int
+    peak_bytes: int
+    snapshots: list[MemorySnapshotRead]
+
+
+class AllocationStatRead(ORMModel):
+    location: str
+    size_bytes: int
+    count: int
+
+
+class AllocationDiffRead(AllocationStatRead):
+    size_diff_bytes: int
+    count_diff: int
+
+
+class MemorySnapshotReport(BaseModel):
+    snapshot: MemorySnapshotRead
+    top: list[AllocationStatRead]
+
+
+class MemorySnapshotComparison(BaseModel):
+    older: MemorySnapshotRead
+    newer: MemorySnapshotRead
+    changes: list[AllocationDiffRead]
+
+
+class ObjectCounts(BaseModel):
+    """Live objects in the worker identified by ``pid``."""
+
+    pid: int
+    gc_objects: int
+    sessions: int
+    identity_map_entries: int
+    orm: dict[str, int]
+    pydantic: dict[str, int]
@@ -1,9 +1,10 @@
 """Enrollment and progress schemas."""
 
 from datetime import datetime
+from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 from app.models import EnrollmentStatus
 from app.schemas.lesson import LessonRead
@@ -18,6 +19,27 @@ class EnrollmentCreate(EnrollmentBase):
     pass
 
 
+class BulkEnrollmentCreate(BaseModel):
+    student_ids: list[UUID] = Field(default_factory=list, max_length=10_000)
+    student_emails: list[EmailStr] = Field(default_factory=list, max_length=10_000)
+
+    @model_validator(mode="after")
+    def check_students(self) -> "BulkEnrollmentCreate":
+        if not self.student_ids and not self.student_emails:
+            raise ValueError("Provide student_ids or student_emails")
+        return self
+
+
+class BulkEnrollmentResult(BaseModel):
+    course_id: UUID
+    requested: int
+    created: int
+    skipped: int
+    not_found: list[str] = Field(default_factory=list)
+    # Instructors and admins named in the request; counted as skipped.
+    not_students: list[str] = Field(default_factory=list)
+
+
 class EnrollmentRead(ORMModel):
     id: UUID
     student_id: UUID
@@ -51,3 +73,8 @@ class CertificateRead(BaseModel):
     student_name: str
     issued_at: datetime
     progress_percent: float
+
+
+class ExportFormat(str, Enum):  # type: ignore[misc]
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -0,0 +1,56 @@
+"""Bulk import schemas."""
+
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel, EmailStr, Field, model_validator
+
+from app.schemas.course import CourseCreate
+from app.schemas.enrollment import EnrollmentCreate
+
+
+class ImportEntity(str, Enum):  # type: ignore[misc]
+    USERS = "users"
+    COURSES = "courses"
+    LESSONS = "lessons"
+    ENROLLMENTS = "enrollments"
+
+
+class ImportFormat(str, Enum):  # type: ignore[misc]
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+class CourseImport(CourseCreate):
+    instructor_id: UUID | None = None
+    instructor_email: EmailStr | None = None
+
+    @model_validator(mode="after")
+    def check_instructor(self) -> "CourseImport":
+        if self.instructor_id is None and self.instructor_email is None:
+            raise ValueError("instructor_id or instructor_email is required")
+        return self
+
+
+class EnrollmentImport(EnrollmentCreate):
+    student_id: UUID | None = None
+    student_email: EmailStr | None = None
+
+    @model_validator(mode="after")
+    def check_student(self) -> "EnrollmentImport":
+        if self.student_id is None and self.student_email is None:
+            raise ValueError("student_id or student_email is required")
+        return self
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    entity: ImportEntity
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = Field(default_factory=list)
@@ -30,3 +30,11 @@ class LessonUpdate(BaseModel):
 class LessonRead(LessonBase, ORMModel):
     id: UUID
     course_id: UUID
+
+
+class LessonOutline(ORMModel):
+    id: UUID
+    course_id: UUID
+    title: str
+    thumbnail_url: str | None = None
+    position: int
@@ -0,0 +1,223 @@
+"""Production server: preload the app, fork workers, supervise and recycle them.
+
+The master process imports the application once with the garbage collector
+disabled, moves every object it created into the permanent generation with
+``gc.freeze()`` and binds the listening socket. Workers are then forked from
+it, so the imported code and data stay shared copy-on-write instead of being
+imported N times; collections in the workers do not touch the frozen
+objects, which would otherwise copy their pages.
+
+Each worker runs uvicorn on the shared socket with uvloop and httptools when
+they are installed (``--loop``/``--http`` override that). With
+``--max-requests`` a worker exits gracefully after that many requests (plus
+up to ``--max-requests-jitter``, so workers do not restart together) and the
+master forks a fresh one, which bounds slow memory growth. Workers that
+die are replaced as well. A worker that fails before it starts serving
+(import or lifespan errors) exits with ``STARTUP_FAILED``; those are
+replaced with exponential backoff up to ``MAX_RESPAWN_DELAY`` seconds, so a
+broken deployment does not fork in a tight loop.
+
+``--db-connections`` is the database connection budget for the whole server;
+each worker's pool gets an equal share and no overflow, so the server never
+opens more than that. Without it, ``DB_POOL_SIZE`` and ``DB_MAX_OVERFLOW``
+apply per worker.
+
+``SIGTERM`` or ``SIGINT`` stop the workers gracefully (in-flight requests
+finish) and then the master. Run from the ``backend`` directory::
+
+    python -m app.server --workers 4 --db-connections 40 --max-requests 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from types import FrameType
+from typing import Any
+
+import uvicorn
+
+from app.core.config import get_settings
+from app.core.logs import configure_logging, stop_logging
+
+logger = logging.getLogger("app.server")
+
+# Exit code of a worker that never started serving (uvicorn uses the same).
+STARTUP_FAILED = 3
+MAX_RESPAWN_DELAY = 30.0
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def configure_pool(connections: int | None, workers: int) -> None:
+    """Split the server's connection budget between workers via settings."""
+
+    if connections is None:
+        return
+    os.environ["DB_POOL_SIZE"] = str(max(1, connections // workers))
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    get_settings.cache_clear()
+
+
+def load_app() -> Any:
+    from app.main import app
+
+    return app
+
+
+class Master:
+    """Fork workers from the preloaded app and keep ``workers`` of them running."""
+
+    def __init__(self, app: Any, sock: socket.socket, args: argparse.Namespace) -> None:
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.startup_failures = 0  # in a row
+        self.server: uvicorn.Server | None = None
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return
+        # Worker process.
+        status = STARTUP_FAILED
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            gc.enable()
+            random.seed()  # do not share the master's random state
+            self.serve()
+            if self.server.started:
+                status = 0
+        except Exception:
+            logger.exception("Worker failed")
+            if self.server is not None and self.server.started:
+                status = 1
+        finally:
+            stop_logging()  # os._exit skips atexit handlers
+            os._exit(status)
+
+    def serve(self) -> None:
+        args = self.args
+        config = uvicorn.Config(
+            self.app or load_app(),
+            loop=args.loop,
+            http=args.http,
+            lifespan="on",
+            limit_max_requests=args.max_requests,
+            limit_max_requests_jitter=args.max_requests_jitter,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            access_log=args.access_log,
+            log_config=None,  # keep the app's structured logging for uvicorn's records
+        )
+        self.server = uvicorn.Server(config)
+        self.server.run(sockets=[self.sock])
+
+    def stop(self, signum: int, frame: FrameType | None) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Stopping {len(self.workers)} workers")
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == STARTUP_FAILED:
+                self.startup_failures += 1
+                delay = min(2.0 ** (self.startup_failures - 1), MAX_RESPAWN_DELAY)
+                logger.error(f"Worker {pid} failed to start, replacing it in {delay:g}s")
+                time.sleep(delay)
+                if self.stopping:
+                    continue
+            else:
+                self.startup_failures = 0
+                if code == 0:
+                    logger.info(f"Worker {pid} recycled after {time.monotonic() - started:.0f}s")
+                else:
+                    logger.warning(f"Worker {pid} exited with {code}, replacing it")
+            self.spawn()
+        logger.info("All workers stopped")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--db-connections", type=int, help="connection budget shared by all workers")
+    parser.add_argument("--max-requests", type=int, help="recycle a worker after this many requests")
+    parser.add_argument("--max-requests-jitter", type=int, help="default: a tenth of --max-requests")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="seconds to finish in-flight requests")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument(
+        "--loop", choices=["uvloop", "asyncio"], default="uvloop" if _installed("uvloop") else "asyncio"
+    )
+    parser.add_argument(
+        "--http", choices=["httptools", "h11"], default="httptools" if _installed("httptools") else "h11"
+    )
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="import the app in each worker")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args(argv)
+    if args.max_requests_jitter is None:
+        args.max_requests_jitter = (args.max_requests or 0) // 10
+
+    configure_pool(args.db_connections, args.workers)
+    configure_logging()
+    sock = bind_socket(args.host, args.port, args.backlog)
+
+    app = None
+    if args.preload:
+        started = time.perf_counter()
+        gc.disable()
+        app = load_app()
+        gc.freeze()
+        logger.info(f"Preloaded app in {time.perf_counter() - started:.2f}s ({gc.get_freeze_count()} objects frozen)")
+
+    logger.info(
+        f"Starting {args.workers} workers on {args.host}:{args.port} ({args.loop}, {args.http}"
+        + (f", {os.environ['DB_POOL_SIZE']} connections each)" if args.db_connections else ")")
+    )
+    Master(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""Bulk import of users, courses, lessons and enrollments from CSV or JSONL.
+
+Rows are validated in batches with the same schemas the single-record
+endpoints use and loaded with one multi-row ``INSERT`` per batch. Invalid or
+conflicting rows are reported individually; they never abort the file. A file
+that cannot be decoded or parsed past some point is reported as one error at
+the row where reading stopped, after the batches before it were loaded.
+Rows are read in a worker thread, so a large upload never blocks the event
+loop.
+
+Run from the ``backend`` directory::
+
+    python -m app.services.bulk_import users path/to/users.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import uuid
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Awaitable, Callable, TextIO
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.security import get_password_hash
+from app.models import Course, Enrollment, EnrollmentStatus, Lesson, User, UserRole
+from app.schemas import (
+    CourseImport,
+    EnrollmentImport,
+    ImportEntity,
+    ImportFormat,
+    ImportReport,
+    ImportRowError,
+    LessonCreate,
+    UserCreate,
+)
+from app.services.invalidation import CATALOG, course_key, publish
+
+
+settings = get_settings()
+
+# (row number, parsed payload, parse error)
+RawRow = tuple[int, dict[str, Any] | None, str | None]
+ValidRows = list[tuple[int, BaseModel]]
+Loader = Callable[[AsyncSession, ValidRows, Executor | None], Awaitable[list[ImportRowError]]]
+
+IMPORT_SCHEMAS: dict[ImportEntity, type[BaseModel]] = {
+    ImportEntity.USERS: UserCreate,
+    ImportEntity.COURSES: CourseImport,
+    ImportEntity.LESSONS: LessonCreate,
+    ImportEntity.ENROLLMENTS: EnrollmentImport,
+}
+
+
+@lru_cache
+def get_hashing_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool used for bcrypt hashing."""
+
+    return ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+
+
+def detect_format(filename: str | None) -> ImportFormat:
+    """Infer the import format from a file name, defaulting to CSV."""
+
+    suffix = Path(filename or "").suffix.lower()
+    if suffix in {".jsonl", ".ndjson", ".json"}:
+        return ImportFormat.JSONL
+    return ImportFormat.CSV
+
+
+def iter_rows(stream: TextIO, file_format: ImportFormat) -> Iterator[RawRow]:
+    """Parse a CSV (with header) or JSONL stream into row dictionaries.
+
+    Reading stops at the first undecodable byte or malformed CSV, which is
+    reported as an error on the row that could not be read.
+    """
+
+    row_number = 0
+    rows = _iter_jsonl(stream) if file_format == ImportFormat.JSONL else _iter_csv(stream)
+    try:
+        for row in rows:
+            row_number = row[0]
+            yield row
+    except UnicodeDecodeError as exc:
+        yield row_number + 1, None, f"File is not valid UTF-8 ({exc.reason}); rest of file skipped"
+    except csv.Error as exc:
+        yield row_number + 1, None, f"Invalid CSV: {exc}; rest of file skipped"
+
+
+def _iter_jsonl(stream: TextIO) -> Iterator[RawRow]:
+    row_number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield row_number, None, f"Invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(payload, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, payload, None
+
+
+def _iter_csv(stream: TextIO) -> Iterator[RawRow]:
+    for row_number, record in enumerate(csv.DictReader(stream), start=1):
+        # Empty CSV cells mean "not provided" so schema defaults still apply.
+        yield row_number, {key: value for key, value in record.items() if key and value not in ("", None)}, None
+
+
+async def import_rows(
+    session: AsyncSession,
+    entity: ImportEntity,
+    rows: Iterable[RawRow],
+    *,
+    batch_size: int | None = None,
+    executor: Executor | None = None,
+) -> ImportReport:
+    """Validate and load rows batch by batch, committing after each batch."""
+
+    schema = IMPORT_SCHEMAS[entity]
+    loader = _LOADERS[entity]
+    report = ImportReport(entity=entity)
+    row_iter = iter(rows)
+    batch_size = batch_size or settings.bulk_import_batch_size
+
+    while batch := await asyncio.to_thread(_take, row_iter, batch_size):
+        valid: ValidRows = []
+        for row_number, payload, error in batch:
+            report.total_rows += 1
+            if error is not None:
+                report.errors.append(ImportRowError(row=row_number, error=error))
+                continue
+            try:
+                valid.append((row_number, schema.model_validate(payload)))
+            except ValidationError as exc:
+                report.errors.append(ImportRowError(row=row_number, error=_format_validation_error(exc)))
+
+        if not valid:
+            continue
+
+        try:
+            row_errors = await loader(session, valid, executor)
+            await session.commit()
+        except SQLAlchemyError as exc:
+            await session.rollback()
+            message = f"Batch failed: {exc.__class__.__name__}"
+            row_errors = [ImportRowError(row=row_number, error=message) for row_number, _ in valid]
+
+        report.errors.extend(row_errors)
+        report.imported += len(valid) - len(row_errors)
+
+    report.failed = len(report.errors)
+    report.errors.sort(key=lambda item: item.row)
+    return report
+
+
+def _take(rows: Iterator[RawRow], count: int) -> list[RawRow]:
+    return list(islice(rows, count))
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    parts = []
+    for error in exc.errors():
+        location = ".".join(str(item) for item in error["loc"])
+        parts.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(parts)
+
+
+def _parse_date_of_birth(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            return datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            return None
+
+
+async def _resolve_users(
+    session: AsyncSession, ids: set[uuid.UUID], emails: set[str]
+) -> tuple[dict[uuid.UUID, UserRole], dict[str, tuple[uuid.UUID, UserRole]]]:
+    """Look up referenced users by id and by lower-cased email in at most two queries."""
+
+    by_id: dict[uuid.UUID, UserRole] = {}
+    by_email: dict[str, tuple[uuid.UUID, UserRole]] = {}
+    if ids:
+        result = await session.execute(select(User.id, User.role).where(User.id.in_(ids)))
+        by_id = {user_id: role for user_id, role in result.all()}
+    if emails:
+        lowered = func.lower(User.email)
+        result = await session.execute(
+            select(User.id, lowered, User.role).where(lowered.in_({email.lower() for email in emails}))
+        )
+        by_email = {email: (user_id, role) for user_id, email, role in result.all()}
+    return by_id, by_email
+
+
+async def _existing_course_ids(session: AsyncSession, course_ids: set[uuid.UUID]) -> set[uuid.UUID]:
+    if not course_ids:
+        return set()
+    result = await session.execute(select(Course.id).where(Course.id.in_(course_ids), Course.deleted_at.is_(None)))
+    return set(result.scalars().all())
+
+
+async def _load_users(session: AsyncSession, rows: ValidRows, executor: Executor | None) -> list[ImportRowError]:
+    loop = asyncio.get_running_loop()
+    hashes = await asyncio.gather(
+        *(loop.run_in_executor(executor, get_password_hash, payload.password) for _, payload in rows)
+    )
+
+    records = []
+    for (_, payload), hashed_password in zip(rows, hashes):
+        records.append(
+            {
+                "id": uuid.uuid4(),
+                "full_name": payload.full_name,
+                "email": payload.email,
+                "hashed_password": hashed_password,
+                "role": payload.role,
+                "bio": payload.bio,
+                "phone_number": payload.phone_number,
+                "date_of_birth": _parse_date_of_birth(payload.date_of_birth),
+            }
+        )
+
+    statement = insert(User.__table__).on_conflict_do_nothing(index_elements=["email"]).returning(User.__table__.c.id)
+    inserted = set((await session.execute(statement, records)).scalars().all())
+    return [
+        ImportRowError(row=row_number, error="Email already registered")
+        for (row_number, _), record in zip(rows, records)
+        if record["id"] not in inserted
+    ]
+
+
+async def _load_courses(session: AsyncSession, rows: ValidRows, executor: Executor | None) -> list[ImportRowError]:
+    by_id, by_email = await _resolve_users(
+        session,
+        {payload.instructor_id for _, payload in rows if payload.instructor_id},
+        {payload.instructor_email for _, payload in rows if payload.instructor_email and not payload.instructor_id},
+    )
+
+    errors: list[ImportRowError] = []
+    records = []
+    for row_number, payload in rows:
+        if payload.instructor_id:
+            instructor_id, role = payload.instructor_id, by_id.get(payload.instructor_id)
+        else:
+            instructor_id, role = by_email.get(payload.instructor_email.lower(), (None, None))
+        if role is None:
+            errors.append(ImportRowError(row=row_number, error="Instructor not found"))
+            continue
+        if role not in (UserRole.INSTRUCTOR, UserRole.ADMIN):
+            errors.append(ImportRowError(row=row_number, error="Referenced user is not an instructor"))
+            continue
+        records.append(
+            {
+                "id": uuid.uuid4(),
+                "title": payload.title,
+                "description": payload.description,
+                "category": payload.category,
+                "level": payload.level,
+                "status": payload.status,
+                "thumbnail_url": payload.thumbnail_url,
+                "instructor_id": instructor_id,
+            }
+        )
+
+    if records:
+        await session.execute(insert(Course.__table__), records)
+        await publish(session, CATALOG)
+    return errors
+
+
+async def _load_lessons(session: AsyncSession, rows: ValidRows, executor: Executor | None) -> list[ImportRowError]:
+    known_courses = await _existing_course_ids(session, {payload.course_id for _, payload in rows})
+
+    errors: list[ImportRowError] = []
+    records = []
+    for row_number, payload in rows:
+        if payload.course_id not in known_courses:
+            errors.append(ImportRowError(row=row_number, error="Course not found"))
+            continue
+        records.append(
+            {
+                "id": uuid.uuid4(),
+                "course_id": payload.course_id,
+                "title": payload.title,
+                "content": payload.content,
+                "video_url": payload.video_url,
+                "thumbnail_url": payload.thumbnail_url,
+                "position": payload.position,
+            }
+        )
+
+    if records:
+        await session.execute(insert(Lesson.__table__), records)
+        await publish(session, *{course_key(record["course_id"]) for record in records})
+    return errors
+
+
+async def _load_enrollments(
+    session: AsyncSession, rows: ValidRows, executor: Executor | None
+) -> list[ImportRowError]:
+    known_courses = await _existing_course_ids(session, {payload.course_id for _, payload in rows})
+    by_id, by_email = await _resolve_users(
+        session,
+        {payload.student_id for _, payload in rows if payload.student_id},
+        {payload.student_email for _, payload in rows if payload.student_email and not payload.student_id},
+    )
+
+    errors: list[ImportRowError] = []
+    pending: list[tuple[int, dict[str, Any]]] = []
+    for row_number, payload in rows:
+        if payload.course_id not in known_courses:
+            errors.append(ImportRowError(row=row_number, error="Course not found"))
+            continue
+        if payload.student_id:
+            student_id = payload.student_id if payload.student_id in by_id else None
+        else:
+            student_id = by_email.get(payload.student_email.lower(), (None, None))[0]
+        if student_id is None:
+            errors.append(ImportRowError(row=row_number, error="Student not found"))
+            continue
+        pending.append(
+            (
+                row_number,
+                {
+                    "id": uuid.uuid4(),
+                    "student_id": student_id,
+                    "course_id": payload.course_id,
+                    "status": EnrollmentStatus.ACTIVE,
+                    "progress_percent": 0.0,
+                },
+            )
+        )
+
+    if pending:
+        table = Enrollment.__table__
+        statement = (
+            insert(table)
+            .on_conflict_do_nothing(constraint="uq_enrollment_student_course")
+            .returning(table.c.id)
+        )
+        inserted = set((await session.execute(statement, [record for _, record in pending])).scalars().all())
+        errors.extend(
+            ImportRowError(row=row_number, error="Student already enrolled in this course")
+            for row_number, record in pending
+            if record["id"] not in inserted
+        )
+        if inserted:
+            await publish(session, CATALOG)
+    return errors
+
+
+_LOADERS: dict[ImportEntity, Loader] = {
+    ImportEntity.USERS: _load_users,
+    ImportEntity.COURSES: _load_courses,
+    ImportEntity.LESSONS: _load_lessons,
+    ImportEntity.ENROLLMENTS: _load_enrollments,
+}
+
+
+async def _run_cli(args: argparse.Namespace) -> ImportReport:
+    from app.db.session import AsyncSessionLocal
+
+    file_format = ImportFormat(args.format) if args.format else detect_format(args.path)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        with open(args.path, encoding="utf-8", newline="") as stream:
+            async with AsyncSessionLocal() as session:
+                return await import_rows(
+                    session,
+                    ImportEntity(args.entity),
+                    iter_rows(stream, file_format),
+                    batch_size=args.batch_size,
+                    executor=executor,
+                )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point; prints the JSON report and fails on row errors."""
+
+    parser = argparse.ArgumentParser(description="Bulk import Edu Learn Pro data from CSV or JSONL.")
+    parser.add_argument("entity", choices=[entity.value for entity in ImportEntity])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[item.value for item in ImportFormat], default=None)
+    parser.add_argument("--batch-size", type=int, default=settings.bulk_import_batch_size)
+    parser.add_argument("--workers", type=int, default=settings.password_hash_workers)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_run_cli(args))
+    print(report.model_dump_json(indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
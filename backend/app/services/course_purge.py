@@ -0,0 +1,128 @@
+"""Background purge of soft-deleted courses.
+
+Deleting a course only stamps ``courses.deleted_at`` so the request returns
+immediately. This job then removes lesson progress, enrollments, lessons and
+finally the course row itself in bounded batches, committing between
+batches so no single transaction holds locks on a huge course for long.
+
+A purge that failed or was cut short by a restart is picked up by the
+sweep every worker schedules from the application lifespan every
+``COURSE_PURGE_INTERVAL_SECONDS`` (``0`` turns it off). A Postgres advisory
+lock lets only one worker sweep at a time. To sweep right away, run from
+``backend``::
+
+    python -m app.services.course_purge
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.logs import configure_logging
+from app.db.session import AsyncSessionLocal, engine
+from app.models import Course, Enrollment, Lesson, LessonProgress
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Key of the advisory lock held while a worker sweeps.
+SWEEP_LOCK_KEY = 7_310_424_201
+
+
+def _batch_statements(course_id: uuid.UUID, batch_size: int):
+    """Return DELETE statements that each remove at most ``batch_size`` rows, children first."""
+
+    progress_ids = (
+        select(LessonProgress.id)
+        .join(Enrollment, Enrollment.id == LessonProgress.enrollment_id)
+        .where(Enrollment.course_id == course_id)
+        .limit(batch_size)
+    )
+    enrollment_ids = select(Enrollment.id).where(Enrollment.course_id == course_id).limit(batch_size)
+    lesson_ids = select(Lesson.id).where(Lesson.course_id == course_id).limit(batch_size)
+    return (
+        delete(LessonProgress).where(LessonProgress.id.in_(progress_ids)),
+        delete(Enrollment).where(Enrollment.id.in_(enrollment_ids)),
+        delete(Lesson).where(Lesson.id.in_(lesson_ids)),
+    )
+
+
+async def purge_course(session: AsyncSession, course_id: uuid.UUID, batch_size: int | None = None) -> int:
+    """Remove a soft-deleted course and everything under it; return the number of rows deleted."""
+
+    batch_size = batch_size or settings.course_purge_batch_size
+    total = 0
+    for statement in _batch_statements(course_id, batch_size):
+        statement = statement.execution_options(synchronize_session=False)
+        while True:
+            deleted = (await session.execute(statement)).rowcount
+            await session.commit()
+            total += deleted
+            if deleted < batch_size:
+                break
+
+    result = await session.execute(
+        delete(Course)
+        .where(Course.id == course_id, Course.deleted_at.is_not(None))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return total + result.rowcount
+
+
+async def purge_deleted_course(course_id: uuid.UUID) -> None:
+    """Background task entry point used right after a course is deleted."""
+
+    async with AsyncSessionLocal() as session:
+        try:
+            deleted = await purge_course(session, course_id)
+        except Exception:  # pragma: no cover - retried by the next sweep
+            logger.exception(f"Purging course {course_id} failed")
+            return
+    logger.info(f"Purged course {course_id} ({deleted} rows)")
+
+
+async def purge_deleted_courses(batch_size: int | None = None) -> int:
+    """Purge every course still marked as deleted; return how many were purged."""
+
+    async with AsyncSessionLocal() as session:
+        course_ids = (
+            await session.execute(select(Course.id).where(Course.deleted_at.is_not(None)))
+        ).scalars().all()
+        for course_id in course_ids:
+            deleted = await purge_course(session, course_id, batch_size)
+            logger.info(f"Purged course {course_id} ({deleted} rows)")
+    return len(course_ids)
+
+
+async def sweep_periodically() -> None:
+    """Run ``purge_deleted_courses`` every ``COURSE_PURGE_INTERVAL_SECONDS`` until cancelled."""
+
+    while True:
+        await asyncio.sleep(settings.course_purge_interval_seconds)
+        try:
+            async with engine.connect() as connection:
+                if not await connection.scalar(select(func.pg_try_advisory_lock(SWEEP_LOCK_KEY))):
+                    continue  # another worker is sweeping
+                try:
+                    purged = await purge_deleted_courses()
+                finally:
+                    await connection.scalar(select(func.pg_advisory_unlock(SWEEP_LOCK_KEY)))
+        except Exception:  # noqa: BLE001 - the next sweep tries again
+            logger.exception("Sweeping deleted courses failed")
+            continue
+        if purged:
+            logger.info(f"Swept {purged} deleted course(s)")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    purged = asyncio.run(purge_deleted_courses())
+    print(f"Purged {purged} deleted course(s)")
@@ -0,0 +1,250 @@
+"""Worker-local caches kept coherent across workers with Postgres LISTEN/NOTIFY.
+
+Every worker process caches catalog versions and pages, course versions and
+pages and the principals behind bearer tokens (their id and role) in memory. Entries are filed
+under an invalidation key (``catalog``, ``course:<id>``, ``user:<id>``).
+
+Write paths call ``publish(session, *keys)`` before committing. It runs
+``pg_notify`` in the write's own transaction, so Postgres delivers the
+message to every listening worker when the transaction commits and drops it
+when it rolls back: nobody evicts before the write is visible, and failed
+writes evict nothing. The writing worker also evicts the keys itself as soon
+as the commit returns, so its next read never sees the old value while its
+own message is still on the way. Every ORM update or delete of a ``User``
+publishes its ``user:<id>`` key by itself, so no role, password or other
+account change can leave a stale principal behind; bulk ``update(User)``
+statements still have to call ``publish``.
+
+Each worker runs ``listener`` on a dedicated asyncpg connection (outside the
+pool) from the application lifespan. It waits ``INVALIDATION_BATCH_SECONDS``
+after a message so a burst of writes is applied as one eviction pass. The
+caches are only used while the listener is connected: messages sent while
+it is down are lost, so after a disconnect it reconnects with backoff and
+then clears every cache before serving from them again. Loads that started
+before an eviction are not stored, which keeps a slow read from putting a
+stale value back.
+
+Anything that changes the cached tables without publishing (``psql``,
+``benchmarks.seed``) needs the workers restarted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection, Hashable, Iterator
+from typing import Generic, TypeVar
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, object_session
+
+from app.core.config import get_settings
+from app.core.metrics import CACHE_INVALIDATIONS, record_cache
+from app.db.session import asyncpg_dsn
+from app.models import User
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CATALOG = "catalog"
+# NOTIFY payloads must stay below 8000 bytes.
+MAX_PAYLOAD_BYTES = 7900
+MAX_RECONNECT_SECONDS = 30.0
+# Session.info key holding the keys published in the current transaction.
+PUBLISHED_KEYS = "invalidation_published_keys"
+
+
+def course_key(course_id: uuid.UUID) -> str:
+    return f"course:{course_id}"
+
+
+def user_key(user_id: uuid.UUID) -> str:
+    return f"user:{user_id}"
+
+
+def _payloads(keys: Collection[str]) -> Iterator[str]:
+    """Join keys with commas into payloads that fit a NOTIFY."""
+
+    payload = ""
+    for key in sorted(set(keys)):
+        if payload and len(payload) + 1 + len(key) > MAX_PAYLOAD_BYTES:
+            yield payload
+            payload = ""
+        payload = f"{payload},{key}" if payload else key
+    if payload:
+        yield payload
+
+
+async def publish(session: AsyncSession, *keys: str) -> None:
+    """Evict ``keys`` in every worker once the session's transaction commits."""
+
+    if not settings.invalidation_enabled:
+        return
+    for payload in _payloads(keys):
+        await session.execute(select(func.pg_notify(settings.invalidation_channel, payload)))
+    session.info.setdefault(PUBLISHED_KEYS, set()).update(keys)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _publish_user_change(mapper: Mapper, connection: Connection, user: User) -> None:
+    if not settings.invalidation_enabled:
+        return
+    key = user_key(user.id)
+    connection.execute(select(func.pg_notify(settings.invalidation_channel, key)))
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault(PUBLISHED_KEYS, set()).add(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_published(session: Session) -> None:
+    keys = session.info.pop(PUBLISHED_KEYS, None)
+    if keys:
+        listener.evict(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_published(session: Session) -> None:
+    session.info.pop(PUBLISHED_KEYS, None)
+
+
+class LocalCache(Generic[T]):
+    """Bounded per-worker LRU cache evicted by invalidation messages.
+
+    Values are stored under an invalidation key and a variant; a message for
+    the key drops all of its variants. ``None`` is never stored, so lookups
+    that found nothing are retried.
+    """
+
+    def __init__(self, name: str, maxsize: int | None = None) -> None:
+        self.name = name
+        self.maxsize = maxsize or settings.local_cache_max_entries
+        self._entries: OrderedDict[tuple[str, Hashable], T] = OrderedDict()
+        _caches.append(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str, variant: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value, or ``await load()`` and cache it if nothing was evicted meanwhile."""
+
+        entry = (key, variant)
+        if listener.connected and entry in self._entries:
+            self._entries.move_to_end(entry)
+            record_cache(self.name, True)
+            return self._entries[entry]
+
+        record_cache(self.name, False)
+        generation = listener.generation
+        value = await load()
+        if value is not None and listener.connected and listener.generation == generation:
+            self._entries[entry] = value
+            self._entries.move_to_end(entry)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def peek(self, key: str, variant: Hashable) -> T | None:
+        """Return the cached value if there is one, without loading it."""
+
+        if listener.connected:
+            return self._entries.get((key, variant))
+        return None
+
+    def evict(self, keys: Collection[str] | None) -> None:
+        """Drop the entries of ``keys``, or everything for ``None``."""
+
+        if keys is None:
+            self._entries.clear()
+            return
+        for entry in [entry for entry in self._entries if entry[0] in keys]:
+            del self._entries[entry]
+
+
+_caches: list[LocalCache] = []
+
+
+class InvalidationListener:
+    """Apply invalidation messages from the database to this worker's caches."""
+
+    def __init__(self) -> None:
+        self.connected = False
+        # Bumped on every eviction so in-flight loads know their value may be stale.
+        self.generation = 0
+
+    def evict(self, keys: Collection[str] | None) -> None:
+        self.generation += 1
+        for cache in _caches:
+            cache.evict(keys)
+        if keys is None:
+            CACHE_INVALIDATIONS.labels("resync").inc()
+        else:
+            CACHE_INVALIDATIONS.labels("key").inc(len(keys))
+
+    async def run(self) -> None:
+        """Listen until cancelled, reconnecting with backoff whenever the connection is lost."""
+
+        delay = settings.invalidation_reconnect_seconds
+        while True:
+            try:
+                connection = await asyncpg.connect(asyncpg_dsn())
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning(f"Invalidation listener cannot connect ({exc!r}), retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_SECONDS)
+                continue
+            delay = settings.invalidation_reconnect_seconds
+            try:
+                await self._listen(connection)
+                logger.warning("Invalidation listener connection closed, reconnecting")
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning(f"Invalidation listener lost its connection ({exc!r}), reconnecting")
+            finally:
+                self.connected = False
+                self.evict(None)
+                connection.terminate()
+
+    async def _listen(self, connection: asyncpg.Connection) -> None:
+        # None in the queue means the connection was closed.
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        connection.add_termination_listener(lambda _: queue.put_nowait(None))
+        await connection.add_listener(
+            settings.invalidation_channel, lambda _connection, _pid, _channel, payload: queue.put_nowait(payload)
+        )
+        # Anything published while we were not listening is unknown.
+        self.evict(None)
+        self.connected = True
+        logger.info(f"Listening for cache invalidations on {settings.invalidation_channel!r}")
+
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), settings.invalidation_ping_seconds)
+            except asyncio.TimeoutError:
+                # A silently dropped connection only shows up when we use it.
+                await asyncio.wait_for(connection.fetchval("SELECT 1"), settings.invalidation_ping_seconds)
+                continue
+            if payload is None:
+                return
+            await asyncio.sleep(settings.invalidation_batch_seconds)
+            payloads = [payload]
+            while not queue.empty():
+                payloads.append(queue.get_nowait())
+            self.evict({key for payload in payloads if payload for key in payload.split(",")})
+            if None in payloads:
+                return
+
+
+listener = InvalidationListener()
+
+catalog_cache: LocalCache[object] = LocalCache("catalog")
+course_cache: LocalCache[object] = LocalCache("courses")
+principal_cache: LocalCache[object] = LocalCache("principals")
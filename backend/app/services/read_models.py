@@ -0,0 +1,225 @@
+"""Column-projected read models.
+
+Read paths select only the columns their response schema needs and get
+plain dictionaries back: no ORM entities, identity-map bookkeeping or eager
+relationship loads. The dictionaries serialize directly through
+``FastJSONResponse`` or validate into schemas. Write paths keep using the
+ORM models.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from sqlalchemy import Result, Row as SQLRow, String, cast, column, func, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Course, CourseStatus, Enrollment, Lesson, LessonProgress
+
+
+Row = dict[str, Any]
+
+# CourseRead
+COURSE_COLUMNS = (
+    Course.id,
+    Course.title,
+    Course.description,
+    Course.category,
+    Course.level,
+    Course.status,
+    Course.thumbnail_url,
+    Course.instructor_id,
+)
+
+# LessonRead
+LESSON_COLUMNS = (
+    Lesson.id,
+    Lesson.course_id,
+    Lesson.title,
+    Lesson.content,
+    Lesson.video_url,
+    Lesson.thumbnail_url,
+    Lesson.position,
+)
+
+# LessonOutline: everything but the (deferred) content and video.
+LESSON_OUTLINE_COLUMNS = (
+    Lesson.id,
+    Lesson.course_id,
+    Lesson.title,
+    Lesson.thumbnail_url,
+    Lesson.position,
+)
+
+# EnrollmentRead
+ENROLLMENT_COLUMNS = (
+    Enrollment.id,
+    Enrollment.student_id,
+    Enrollment.course_id,
+    Enrollment.status,
+    Enrollment.progress_percent,
+    Enrollment.created_at,
+    Enrollment.updated_at,
+)
+
+# LessonProgressRead
+PROGRESS_COLUMNS = (
+    LessonProgress.lesson_id,
+    LessonProgress.is_completed,
+    LessonProgress.completed_at,
+)
+
+LIVE_COURSE = Course.deleted_at.is_(None)
+
+# Maintained by database triggers, not mapped, so benchmarks.seed leaves it alone.
+_catalog_versions = table("catalog_versions", column("version"))
+
+
+def _rows(result: Result) -> list[Row]:
+    return [dict(row) for row in result.mappings()]
+
+
+async def course_instructor_id(session: AsyncSession, course_id: uuid.UUID) -> uuid.UUID | None:
+    """Return the owner of a live course for permission checks, or ``None`` if there is none."""
+
+    return await session.scalar(select(Course.instructor_id).where(Course.id == course_id, LIVE_COURSE))
+
+
+async def catalog_version(session: AsyncSession) -> SQLRow:
+    """Return a value that changes whenever any catalog card changes.
+
+    Triggers on ``courses`` and ``enrollments`` bump a counter on every
+    statement that writes them (migration ``0004_catalog_version``), so this
+    reads a handful of rows however large the tables get.
+    """
+
+    return (await session.execute(select(func.coalesce(func.sum(_catalog_versions.c.version), 0)))).one()
+
+
+async def course_version(session: AsyncSession, course_id: uuid.UUID) -> SQLRow | None:
+    """Return values that change whenever a live course or its lessons change, or ``None``.
+
+    Lesson edits bump ``lessons.updated_at``, additions and deletions change
+    the lesson count.
+    """
+
+    query = (
+        select(Course.updated_at, func.max(Lesson.updated_at), func.count(Lesson.id))
+        .outerjoin(Lesson, Lesson.course_id == Course.id)
+        .where(Course.id == course_id, LIVE_COURSE)
+        .group_by(Course.id)
+    )
+    return (await session.execute(query)).first()
+
+
+async def catalog_cards(
+    session: AsyncSession,
+    *,
+    search: str | None = None,
+    category: str | None = None,
+    level: str | None = None,
+    status: CourseStatus | None = None,
+) -> list[Row]:
+    """Return CourseSummary rows for the public catalog, newest first."""
+
+    enrollment_counts = (
+        select(Enrollment.course_id, func.count(Enrollment.id).label("enrollment_count"))
+        .group_by(Enrollment.course_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Course.id,
+            Course.title,
+            Course.description,
+            Course.category,
+            Course.level,
+            Course.status,
+            Course.thumbnail_url,
+            func.coalesce(enrollment_counts.c.enrollment_count, 0).label("enrollment_count"),
+        )
+        .outerjoin(enrollment_counts, enrollment_counts.c.course_id == Course.id)
+        .where(LIVE_COURSE)
+        .order_by(Course.created_at.desc())
+    )
+
+    if search:
+        query = query.where(func.lower(Course.title).like(f"%{search.lower()}%"))
+    if category:
+        query = query.where(func.lower(Course.category) == category.lower())
+    if level:
+        # lower() has no enum overload; compare the label as text.
+        query = query.where(func.lower(cast(Course.level, String)) == level.lower())
+    if status:
+        query = query.where(Course.status == status)
+
+    return _rows(await session.execute(query))
+
+
+async def instructor_courses(session: AsyncSession, instructor_id: uuid.UUID) -> list[Row]:
+    """Return CourseRead rows for courses owned by an instructor."""
+
+    query = select(*COURSE_COLUMNS).where(Course.instructor_id == instructor_id, LIVE_COURSE)
+    return _rows(await session.execute(query))
+
+
+async def course_lessons(
+    session: AsyncSession, course_id: uuid.UUID, *, outline: bool = False
+) -> list[Row]:
+    """Return LessonRead (or LessonOutline) rows for a live course ordered by position."""
+
+    query = (
+        select(*(LESSON_OUTLINE_COLUMNS if outline else LESSON_COLUMNS))
+        .join(Course, Course.id == Lesson.course_id)
+        .where(Lesson.course_id == course_id, LIVE_COURSE)
+        .order_by(Lesson.position)
+    )
+    return _rows(await session.execute(query))
+
+
+async def course_detail(session: AsyncSession, course_id: uuid.UUID, *, outline: bool = False) -> Row | None:
+    """Return a CourseDetail (or CourseOutline) row with ordered lessons, or ``None``."""
+
+    course = (
+        await session.execute(select(*COURSE_COLUMNS).where(Course.id == course_id, LIVE_COURSE))
+    ).mappings().first()
+    if course is None:
+        return None
+    return {**course, "lessons": await course_lessons(session, course_id, outline=outline)}
+
+
+async def lesson(session: AsyncSession, lesson_id: uuid.UUID) -> Row | None:
+    """Return a LessonRead row, content included, for a lesson of a live course."""
+
+    query = (
+        select(*LESSON_COLUMNS)
+        .join(Course, Course.id == Lesson.course_id)
+        .where(Lesson.id == lesson_id, LIVE_COURSE)
+    )
+    return (await session.execute(query)).mappings().first()
+
+
+async def student_enrollments(session: AsyncSession, student_id: uuid.UUID) -> list[Row]:
+    """Return EnrollmentRead rows for a student's live courses."""
+
+    query = (
+        select(*ENROLLMENT_COLUMNS)
+        .join(Course, Course.id == Enrollment.course_id)
+        .where(Enrollment.student_id == student_id, LIVE_COURSE)
+    )
+    return _rows(await session.execute(query))
+
+
+async def course_enrollment_rows(session: AsyncSession, course_id: uuid.UUID) -> list[Row]:
+    """Return EnrollmentRead rows for one course."""
+
+    query = select(*ENROLLMENT_COLUMNS).where(Enrollment.course_id == course_id)
+    return _rows(await session.execute(query))
+
+
+async def enrollment_progress(session: AsyncSession, enrollment_id: uuid.UUID) -> list[Row]:
+    """Return LessonProgressRead rows for one enrollment."""
+
+    query = select(*PROGRESS_COLUMNS).where(LessonProgress.enrollment_id == enrollment_id)
+    return _rows(await session.execute(query))
@@ -0,0 +1,91 @@
+"""Single-flight coalescing of identical concurrent reads.
+
+When many requests ask for the same thing at once (a course page right after
+it is announced), only the first one runs the computation; the others wait
+for its result instead of each opening a session and repeating the queries.
+
+The shared computation runs in its own task, so a waiter that is cancelled
+(client disconnect, request timeout) never cancels it for the others. The
+computation is cancelled only once nobody is waiting for it any more, or when
+its per-key timeout expires, in which case every waiter gets ``TimeoutError``
+and the next caller starts a fresh attempt. Results are not cached: a key is
+forgotten as soon as its computation finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from app.core.metrics import record_cache
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight computation between concurrent callers with the same key."""
+
+    def __init__(self, name: str, timeout: float | None = None) -> None:
+        self.name = name
+        self.timeout = timeout
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[T]],
+        *,
+        timeout: float | None = None,
+    ) -> T:
+        """Return ``await compute()``, shared with concurrent callers using ``key``.
+
+        ``timeout`` (default: the instance's) bounds the shared computation,
+        not the individual wait.
+        """
+
+        flight = self._flights.get(key)
+        # A "hit" is a caller that joined a computation already in flight.
+        record_cache(self.name, flight is not None)
+        if flight is None:
+            limit = self.timeout if timeout is None else timeout
+            flight = _Flight(asyncio.create_task(self._run(compute, limit)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task, key=key, flight=flight: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last waiter left early: nobody needs the result. Forget the
+                # key now so a caller arriving before the task settles starts
+                # a new computation rather than joining a cancelled one.
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    @staticmethod
+    async def _run(compute: Callable[[], Awaitable[T]], timeout: float | None) -> T:
+        if timeout is None:
+            return await compute()
+        return await asyncio.wait_for(compute(), timeout)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.done() and not flight.task.cancelled():
+            # Mark the exception retrieved when every waiter has already gone.
+            flight.task.exception()
+
@@ -0,0 +1,23 @@
+"""HTTP error helpers shared by route modules."""
+
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def missing_or_forbidden(
+    session: AsyncSession, model, object_id: uuid.UUID, forbidden_detail: str, *criteria
+) -> HTTPException:
+    """Explain why an ownership-scoped write matched no rows.
+
+    Only runs on the failure path: a cheap primary-key lookup tells a missing
+    record (404) from one owned by somebody else (403). Extra ``criteria``
+    narrow what counts as existing, e.g. excluding soft-deleted rows.
+    """
+
+    exists = await session.scalar(select(model.id).where(model.id == object_id, *criteria))
+    if exists is None:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{model.__name__} not found")
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=forbidden_detail)
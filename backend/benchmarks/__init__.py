@@ -0,0 +1 @@
+"""Load tests and benchmarks for the Edu Learn Pro backend."""
@@ -0,0 +1,122 @@
+"""Burst of identical ``GET /courses/{id}`` requests with and without coalescing.
+
+Runs in-process with no database: the session factory is replaced by a fake
+whose queries take ``--query-ms`` each, and the number of sessions opened is
+counted. "uncoalesced" swaps the route's ``SingleFlight`` for one that runs
+every computation, which is how the route behaved before.
+
+    python -m benchmarks.course_burst --requests 500 --query-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+
+from app.api.routes import courses
+from app.db.session import get_session_factory
+from app.main import app
+from app.models import CourseLevel, CourseStatus
+
+
+class FakeResult:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def mappings(self) -> "FakeResult":
+        return self
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class FakeSessions:
+    """Session factory whose sessions answer course, lesson and version queries."""
+
+    def __init__(self, course: dict, query_ms: float) -> None:
+        self.course = course
+        self.delay = query_ms / 1000
+        self.opened = 0
+
+    def __call__(self) -> "FakeSessions":
+        self.opened += 1
+        return self
+
+    async def __aenter__(self) -> "FakeSessions":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def execute(self, query, *args, **kwargs) -> FakeResult:
+        await asyncio.sleep(self.delay)
+        keys = [column.key for column in query.selected_columns]
+        if keys[0] == "updated_at":
+            return FakeResult([(None, None, 0)])
+        if "position" in keys:
+            return FakeResult([])
+        return FakeResult([self.course])
+
+
+class Uncoalesced:
+    async def do(self, key, compute, *, timeout=None):
+        return await compute()
+
+
+async def burst(sessions: FakeSessions, requests: int) -> float:
+    app.dependency_overrides[get_session_factory] = lambda: sessions
+    path = f"/api/v1/courses/{sessions.course['id']}"
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.get(path) for _ in range(requests)))
+            elapsed = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.pop(get_session_factory, None)
+    assert all(response.status_code == 200 for response in responses)
+    return elapsed
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    course = {
+        "id": uuid.uuid4(),
+        "title": "Launch day course",
+        "description": "A newly announced course everybody opens at once.",
+        "category": "benchmarks",
+        "level": CourseLevel.BEGINNER,
+        "status": CourseStatus.PUBLISHED,
+        "thumbnail_url": None,
+        "instructor_id": uuid.uuid4(),
+    }
+
+    print(f"{args.requests} concurrent GET /courses/{{id}}, {args.query_ms:.0f} ms per query")
+    coalesced = courses.course_reads
+    for label, flights in (("uncoalesced", Uncoalesced()), ("coalesced", coalesced)):
+        courses.course_reads = flights
+        sessions = FakeSessions(course, args.query_ms)
+        try:
+            elapsed = await burst(sessions, args.requests)
+        finally:
+            courses.course_reads = coalesced
+        print(f"  {label:12} sessions opened {sessions.opened:6}   wall {elapsed * 1000:8.1f} ms")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--query-ms", type=float, default=20)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
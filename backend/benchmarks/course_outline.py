@@ -0,0 +1,129 @@
+"""Compare ``GET /courses/{id}`` payloads in full and outline view.
+
+Runs in-process with no database: the session dependency is replaced by a
+fake that answers each query with synthetic rows holding only the columns
+the query selects, so "column bytes" approximates what the database has to
+read and send for the course page. Lessons get ``--content-kb`` of text each.
+
+    python -m benchmarks.course_outline --lessons 40 --content-kb 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import uuid
+
+import httpx
+
+from app.db.session import get_session_factory
+from app.main import app
+from app.models import CourseLevel, CourseStatus
+
+
+class FakeResult:
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = rows
+
+    def mappings(self) -> "FakeResult":
+        return self
+
+    def first(self) -> dict | None:
+        return self._rows[0] if self._rows else None
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class FakeSession:
+    """Returns course or lesson rows projected onto the selected columns.
+
+    Also serves as its own session factory's context manager.
+    """
+
+    def __init__(self, course: dict, lessons: list[dict]) -> None:
+        self.course = course
+        self.lessons = lessons
+        self.bytes_read = 0
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def execute(self, query, *args, **kwargs) -> FakeResult:
+        keys = [column.key for column in query.selected_columns]
+        if keys[0] == "updated_at":  # ETag version lookup
+            return FakeResult([(None, None, len(self.lessons))])
+        source = self.lessons if "position" in keys else [self.course]
+        rows = [{key: row[key] for key in keys} for row in source]
+        self.bytes_read += sum(len(str(value).encode()) for row in rows for value in row.values())
+        return FakeResult(rows)
+
+
+def make_course(lessons: int, content_kb: int) -> tuple[dict, list[dict]]:
+    course_id = uuid.uuid4()
+    course = {
+        "id": course_id,
+        "title": "Benchmark course",
+        "description": "A long course used to measure course page payloads.",
+        "category": "benchmarks",
+        "level": CourseLevel.BEGINNER,
+        "status": CourseStatus.PUBLISHED,
+        "thumbnail_url": None,
+        "instructor_id": uuid.uuid4(),
+    }
+    body = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20)[:1024] * content_kb
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "course_id": course_id,
+            "title": f"Lesson {position}",
+            "content": body,
+            "video_url": f"https://videos.example.com/{position}",
+            "thumbnail_url": f"/media/lesson-thumbnails/{position}.png",
+            "position": position,
+        }
+        for position in range(1, lessons + 1)
+    ]
+    return course, rows
+
+
+async def measure(course: dict, lessons: list[dict], view: str) -> tuple[int, int]:
+    session = FakeSession(course, lessons)
+
+    app.dependency_overrides[get_session_factory] = lambda: lambda: session
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get(f"/api/v1/courses/{course['id']}", params={"view": view})
+            response.raise_for_status()
+    finally:
+        app.dependency_overrides.pop(get_session_factory, None)
+    return len(response.content), session.bytes_read
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    course, lessons = make_course(args.lessons, args.content_kb)
+    full_payload, full_read = await measure(course, lessons, "full")
+    outline_payload, outline_read = await measure(course, lessons, "outline")
+    single_payload = len(lessons[0]["content"])
+
+    print(f"GET /courses/{{id}} with {args.lessons} lessons of {args.content_kb} KiB")
+    print(f"  full:     payload {full_payload / 1024:10.1f} KiB   column bytes {full_read / 1024:10.1f} KiB")
+    print(f"  outline:  payload {outline_payload / 1024:10.1f} KiB   column bytes {outline_read / 1024:10.1f} KiB")
+    print(f"  opening one lesson adds ~{single_payload / 1024:.1f} KiB via GET /lessons/{{id}}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=40)
+    parser.add_argument("--content-kb", type=int, default=50)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
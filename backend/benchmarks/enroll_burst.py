@@ -0,0 +1,141 @@
+"""Launch-burst load test for ``POST /enrollments``.
+
+Registers a published course and a pool of students, then fires every
+student's enroll request ``--clicks`` times concurrently (simulating
+double-clicks) so ``--students * --clicks`` requests hit the endpoint at
+once. It checks that each student ends up with exactly one enrollment, that
+no request failed, and reports throughput and latency percentiles.
+
+Run against a local server from the ``backend`` directory::
+
+    uvicorn app.main:app &
+    python -m benchmarks.enroll_burst --base-url http://127.0.0.1:8000 --students 500 --clicks 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+API_PREFIX = "/api/v1"
+
+
+async def _register(client: httpx.AsyncClient, role: str) -> str:
+    email = f"burst-{role}-{uuid.uuid4().hex[:12]}@example.com"
+    response = await client.post(
+        f"{API_PREFIX}/auth/register",
+        json={"full_name": f"Burst {role}", "email": email, "password": "burst-password", "role": role},
+    )
+    response.raise_for_status()
+    return response.json()["token"]["access_token"]
+
+
+async def _setup(client: httpx.AsyncClient, students: int, concurrency: int) -> tuple[str, str, list[str]]:
+    instructor_token = await _register(client, "instructor")
+    response = await client.post(
+        f"{API_PREFIX}/courses",
+        json={
+            "title": f"Launch burst {uuid.uuid4().hex[:8]}",
+            "description": "Course used by the enrollment burst load test.",
+            "category": "benchmark",
+            "status": "published",
+        },
+        headers={"Authorization": f"Bearer {instructor_token}"},
+    )
+    response.raise_for_status()
+    course_id = response.json()["id"]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register_student() -> str:
+        async with semaphore:
+            return await _register(client, "student")
+
+    student_tokens = await asyncio.gather(*(register_student() for _ in range(students)))
+    return instructor_token, course_id, list(student_tokens)
+
+
+async def _enroll(client: httpx.AsyncClient, course_id: str, token: str, key: str) -> tuple[int, float]:
+    started = time.perf_counter()
+    response = await client.post(
+        f"{API_PREFIX}/enrollments",
+        json={"course_id": course_id},
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": key},
+    )
+    return response.status_code, time.perf_counter() - started
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> bool:
+    limits = httpx.Limits(max_connections=args.students * args.clicks)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        instructor_token, course_id, tokens = await _setup(client, args.students, args.setup_concurrency)
+
+        requests = [
+            _enroll(client, course_id, token, key)
+            for token in tokens
+            for key in [uuid.uuid4().hex]
+            for _ in range(args.clicks)
+        ]
+        started = time.perf_counter()
+        results = await asyncio.gather(*requests)
+        elapsed = time.perf_counter() - started
+
+        response = await client.get(
+            f"{API_PREFIX}/enrollments/course/{course_id}",
+            headers={"Authorization": f"Bearer {instructor_token}"},
+        )
+        response.raise_for_status()
+        enrollments = response.json()
+
+    statuses = Counter(code for code, _ in results)
+    latencies = [latency * 1000 for _, latency in results]
+    per_student = Counter(enrollment["student_id"] for enrollment in enrollments)
+
+    print(f"requests:          {len(results)} ({args.students} students x {args.clicks} clicks)")
+    print(f"status codes:      {dict(sorted(statuses.items()))}")
+    print(f"throughput:        {len(results) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(
+        "latency ms:        "
+        f"p50={statistics.median(latencies):.1f} "
+        f"p95={_percentile(latencies, 95):.1f} "
+        f"p99={_percentile(latencies, 99):.1f}"
+    )
+    print(f"enrollments:       {len(enrollments)} rows for {len(per_student)} students")
+
+    correct = (
+        set(statuses) <= {200, 201}
+        and statuses[201] == args.students
+        and len(enrollments) == args.students
+        and all(count == 1 for count in per_student.values())
+    )
+    print("result:            " + ("OK" if correct else "FAILED"))
+    return correct
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--clicks", type=int, default=2, help="concurrent enroll requests per student")
+    parser.add_argument("--setup-concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+    return 0 if asyncio.run(run(args)) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""Seeded load test with realistic traffic mixes and baseline comparison.
+
+Sets up an instructor, ``--courses`` published courses of ``--lessons``
+lessons and ``--students`` students enrolled in one to three courses each
+(popular courses are picked more often), then runs ``--users`` virtual users
+for ``--duration`` seconds. Each virtual user repeatedly picks a scenario
+from the chosen mix:
+
+- ``catalog``: list courses (sometimes filtered), open a course outline and
+  one of its lessons.
+- ``learning``: complete the student's next lesson in order, then read the
+  enrollment's progress.
+- ``dashboards``: the student (or, sometimes, instructor) dashboard and the
+  public stats.
+- ``login``: ``POST /auth/token`` with a student's credentials (bcrypt).
+
+``--scenario mixed`` weights them 50/30/15/5; any single name runs only that
+scenario. Which courses, enrollments and requests are chosen follows from
+``--seed``, so two runs with the same arguments send the same traffic.
+
+Latency percentiles and throughput are reported per operation. ``--save-baseline``
+stores the results as JSON; ``--baseline`` compares against a stored file and
+exits with status 1 when an operation's p95 grows or its throughput drops by
+more than ``--tolerance``, or it starts failing. Baselines only compare
+meaningfully on the same machine and database, so CI should record its own.
+
+Runs in-process against ``app.main:app`` by default (the database from
+``DATABASE_URL`` must be reachable) or against a server with ``--base-url``::
+
+    python -m benchmarks.load --scenario mixed --duration 30 --users 50
+    uvicorn app.main:app &
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --save-baseline baseline.json
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --baseline baseline.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+
+API_PREFIX = "/api/v1"
+PASSWORD = "load-test-password"
+
+MIXES: dict[str, dict[str, int]] = {
+    "mixed": {"catalog": 50, "learning": 30, "dashboards": 15, "login": 5},
+    "catalog": {"catalog": 1},
+    "learning": {"learning": 1},
+    "dashboards": {"dashboards": 1},
+    "login": {"login": 1},
+}
+
+
+@dataclass
+class Enrollment:
+    id: str
+    lesson_ids: list[str]
+    completed: int = 0
+
+
+@dataclass
+class Student:
+    email: str
+    token: str
+    enrollments: list[Enrollment] = field(default_factory=list)
+
+
+@dataclass
+class Fixture:
+    instructor_token: str
+    courses: dict[str, list[str]]
+    categories: list[str]
+    students: list[Student]
+
+
+class Recorder:
+    """Collect latencies and failures per operation."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    async def request(
+        self, client: httpx.AsyncClient, operation: str, method: str, url: str, **kwargs
+    ) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, API_PREFIX + url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[operation] += 1
+            return None
+        self.latencies[operation].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[operation] += 1
+            return None
+        return response
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _register(client: httpx.AsyncClient, email: str, role: str) -> str:
+    response = await client.post(
+        f"{API_PREFIX}/auth/register",
+        json={"full_name": email.split("@")[0], "email": email, "password": PASSWORD, "role": role},
+    )
+    response.raise_for_status()
+    return response.json()["token"]["access_token"]
+
+
+async def setup(client: httpx.AsyncClient, args: argparse.Namespace) -> Fixture:
+    rng = random.Random(args.seed)
+    tag = args.run_tag
+    categories = [f"category-{index}" for index in range(min(args.courses, 8))]
+    instructor_token = await _register(client, f"load-{tag}-instructor@example.com", "instructor")
+
+    courses: dict[str, list[str]] = {}
+    for index in range(args.courses):
+        response = await client.post(
+            f"{API_PREFIX}/courses",
+            json={
+                "title": f"Load course {tag} {index}",
+                "description": "Course created by the load test fixture.",
+                "category": categories[index % len(categories)],
+                "status": "published",
+            },
+            headers=_auth(instructor_token),
+        )
+        response.raise_for_status()
+        course_id = response.json()["id"]
+        lesson_ids = []
+        for position in range(1, args.lessons + 1):
+            response = await client.post(
+                f"{API_PREFIX}/lessons",
+                json={
+                    "course_id": course_id,
+                    "title": f"Lesson {position}",
+                    "content": "Lorem ipsum dolor sit amet. " * 40,
+                    "position": position,
+                },
+                headers=_auth(instructor_token),
+            )
+            response.raise_for_status()
+            lesson_ids.append(response.json()["id"])
+        courses[course_id] = lesson_ids
+
+    # Course popularity falls off with rank, as in a real catalog.
+    course_ids = list(courses)
+    weights = [1 / rank for rank in range(1, len(course_ids) + 1)]
+    picks = [
+        {rng.choices(course_ids, weights)[0] for _ in range(rng.randint(1, 3))} for _ in range(args.students)
+    ]
+    semaphore = asyncio.Semaphore(args.setup_concurrency)
+
+    async def add_student(index: int) -> Student:
+        async with semaphore:
+            email = f"load-{tag}-student-{index}@example.com"
+            student = Student(email=email, token=await _register(client, email, "student"))
+            for course_id in sorted(picks[index]):
+                response = await client.post(
+                    f"{API_PREFIX}/enrollments", json={"course_id": course_id}, headers=_auth(student.token)
+                )
+                response.raise_for_status()
+                student.enrollments.append(Enrollment(response.json()["id"], courses[course_id]))
+            return student
+
+    students = await asyncio.gather(*(add_student(index) for index in range(args.students)))
+    return Fixture(instructor_token, courses, categories, list(students))
+
+
+async def catalog(
+    client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, fixture: Fixture, student: Student
+) -> None:
+    params = {"category": rng.choice(fixture.categories)} if rng.random() < 0.3 else None
+    await recorder.request(client, "GET /courses", "GET", "/courses", params=params)
+    course_id = rng.choice(list(fixture.courses))
+    await recorder.request(
+        client, "GET /courses/{id}", "GET", f"/courses/{course_id}", params={"view": "outline"}
+    )
+    if fixture.courses[course_id]:
+        lesson_id = rng.choice(fixture.courses[course_id])
+        await recorder.request(client, "GET /lessons/{id}", "GET", f"/lessons/{lesson_id}")
+
+
+async def learning(
+    client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, fixture: Fixture, student: Student
+) -> None:
+    enrollment = rng.choice(student.enrollments)
+    if not enrollment.lesson_ids:
+        return
+    # Lessons must be completed in order; once all are done, re-post the last one.
+    index = min(enrollment.completed, len(enrollment.lesson_ids) - 1)
+    response = await recorder.request(
+        client,
+        "POST /enrollments/{id}/progress",
+        "POST",
+        f"/enrollments/{enrollment.id}/progress",
+        json={"lesson_id": enrollment.lesson_ids[index], "is_completed": True},
+        headers=_auth(student.token),
+    )
+    if response is not None:
+        enrollment.completed = index + 1
+    await recorder.request(
+        client,
+        "GET /enrollments/{id}/progress",
+        "GET",
+        f"/enrollments/{enrollment.id}/progress",
+        headers=_auth(student.token),
+    )
+
+
+async def dashboards(
+    client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, fixture: Fixture, student: Student
+) -> None:
+    if rng.random() < 0.2:
+        operation, token = "GET /users/me/dashboard (instructor)", fixture.instructor_token
+    else:
+        operation, token = "GET /users/me/dashboard", student.token
+    await recorder.request(client, operation, "GET", "/users/me/dashboard", headers=_auth(token))
+    await recorder.request(client, "GET /stats", "GET", "/stats")
+
+
+async def login(
+    client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, fixture: Fixture, student: Student
+) -> None:
+    await recorder.request(
+        client, "POST /auth/token", "POST", "/auth/token", data={"username": student.email, "password": PASSWORD}
+    )
+
+
+Scenario = Callable[[httpx.AsyncClient, Recorder, random.Random, Fixture, Student], Awaitable[None]]
+SCENARIOS: dict[str, Scenario] = {"catalog": catalog, "learning": learning, "dashboards": dashboards, "login": login}
+
+
+async def virtual_user(
+    index: int,
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    fixture: Fixture,
+    args: argparse.Namespace,
+    deadline: float,
+) -> None:
+    rng = random.Random(f"{args.seed}:{index}")
+    mix = MIXES[args.scenario]
+    names, weights = list(mix), list(mix.values())
+    # One student per virtual user keeps in-order lesson completion race-free.
+    student = fixture.students[index]
+    while time.perf_counter() < deadline:
+        await SCENARIOS[rng.choices(names, weights)[0]](client, recorder, rng, fixture, student)
+        if args.think_ms:
+            await asyncio.sleep(args.think_ms / 1000)
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50), 2) if latencies else 0.0,
+        "p95_ms": round(_percentile(latencies, 95), 2) if latencies else 0.0,
+        "p99_ms": round(_percentile(latencies, 99), 2) if latencies else 0.0,
+    }
+
+
+def summarize(recorder: Recorder, elapsed: float, args: argparse.Namespace) -> dict:
+    operations = {
+        operation: _summary(recorder.latencies[operation], recorder.errors[operation], elapsed)
+        for operation in sorted(set(recorder.latencies) | set(recorder.errors))
+    }
+    every = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        "scenario": args.scenario,
+        "seed": args.seed,
+        "users": args.users,
+        "duration_s": round(elapsed, 2),
+        "total": _summary(every, sum(recorder.errors.values()), elapsed),
+        "operations": operations,
+    }
+
+
+def print_report(results: dict) -> None:
+    print(
+        f"scenario {results['scenario']}, {results['users']} users, "
+        f"{results['duration_s']} s, seed {results['seed']}"
+    )
+    print(f"  {'operation':40} {'count':>7} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for operation, stats in [*results["operations"].items(), ("total", results["total"])]:
+        print(
+            f"  {operation:40} {stats['count']:7} {stats['errors']:7} {stats['rps']:8.1f} "
+            f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}"
+        )
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a line for each operation that regressed against ``baseline``."""
+
+    regressions = []
+    for operation, base in baseline["operations"].items():
+        current = results["operations"].get(operation)
+        if current is None:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{operation}: p95 {base['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if base["rps"] and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{operation}: rps {base['rps']:.1f} -> {current['rps']:.1f}")
+        if current["errors"] and not base["errors"]:
+            regressions.append(f"{operation}: {current['errors']} errors (baseline had none)")
+    return regressions
+
+
+@contextlib.asynccontextmanager
+async def make_client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=args.users + args.setup_concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            yield client
+        return
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=args.timeout) as client:
+            yield client
+
+
+async def run(args: argparse.Namespace) -> int:
+    async with make_client(args) as client:
+        fixture = await setup(client, args)
+        recorder = Recorder()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(virtual_user(index, client, recorder, fixture, args, deadline) for index in range(args.users))
+        )
+        elapsed = time.perf_counter() - started
+
+    results = summarize(recorder, elapsed, args)
+    print_report(results)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {args.save_baseline}")
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print("result: " + ("FAILED" if regressions else "OK"))
+        return 1 if regressions else 0
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--base-url", help="run against a server instead of in-process")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load after setup")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--students", type=int, help="students to create (default: --users)")
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--lessons", type=int, default=8, help="lessons per course")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between scenario iterations")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--run-tag", default=uuid.uuid4().hex[:8], help="suffix keeping fixture emails unique")
+    parser.add_argument("--setup-concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95/rps change")
+    args = parser.parse_args(argv)
+    args.students = args.students or args.users
+    if args.students < args.users:
+        parser.error("--students must be at least --users")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
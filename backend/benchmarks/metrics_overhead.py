@@ -0,0 +1,89 @@
+"""Measure the per-request cost of ``MetricsMiddleware``.
+
+Calls a minimal FastAPI app directly through ASGI (no network, no
+database), once bare and once wrapped in the metrics middleware, and
+reports the median time per request for each.
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from fastapi import FastAPI
+
+from app.core.metrics import MetricsMiddleware
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/api/v1/courses/{course_id}")
+    async def get_course(course_id: uuid.UUID) -> dict[str, str]:
+        return {"id": str(course_id)}
+
+    if instrumented:
+        bench.add_middleware(MetricsMiddleware)
+    return bench
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        return None
+
+    await app(scope, receive, send)
+
+
+async def per_request_us(app: FastAPI, requests: int, rounds: int) -> float:
+    paths = [f"/api/v1/courses/{uuid.uuid4()}" for _ in range(100)]
+    for path in paths:  # warm-up
+        await call(app, path)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for index in range(requests):
+            await call(app, paths[index % len(paths)])
+        samples.append((time.perf_counter() - started) / requests * 1e6)
+    return statistics.median(samples)
+
+
+async def run(args: argparse.Namespace) -> None:
+    bare = await per_request_us(make_app(False), args.requests, args.rounds)
+    instrumented = await per_request_us(make_app(True), args.requests, args.rounds)
+    print(f"{args.requests} requests x {args.rounds} rounds, median per request")
+    print(f"  bare:          {bare:7.1f} us")
+    print(f"  instrumented:  {instrumented:7.1f} us  (+{instrumented - bare:.1f} us, {instrumented / bare - 1:.1%})")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Query-plan regression check for the hot routes.
+
+Calls each route in ``ROUTES`` once, in-process, against the database in
+``DATABASE_URL`` and records every statement it sends. Each statement is
+then run through ``EXPLAIN (FORMAT JSON)`` with the parameters the route
+used, and its plan is reduced to a shape (node types, join types, relations
+and indexes used) and an estimated total cost.
+
+With ``--update`` the results are written to the snapshot file, which is
+committed alongside the code. Without it, they are compared with the
+snapshot: a changed shape, a cost more than ``--cost-tolerance`` above the
+snapshot, or a statement the snapshot does not know (or no longer sees)
+fails the run with a diff such as::
+
+    update_progress: SELECT lesson_progress.id, ... WHERE lesson_progress.enrollment_id = $1 ...
+      - Index Scan using uq_progress_enrollment_lesson on lesson_progress
+      + Seq Scan on lesson_progress
+      cost 8.3 -> 1843.0
+
+Plans depend on table statistics, so snapshots are only comparable against
+the same seeded dataset, e.g. ``python -m benchmarks.seed generate --yes``
+with default arguments followed by ``python -m benchmarks.seed snapshot``.
+``update_progress`` writes to the database; restore the snapshot before
+benchmarking on the same data::
+
+    python -m benchmarks.query_plans --update
+    python -m benchmarks.query_plans --cost-tolerance 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import difflib
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+import httpx
+from sqlalchemy import event, func, select
+
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.db.session import AsyncSessionLocal, asyncpg_dsn, engine
+from app.main import app
+from app.models import Course, CourseStatus, Enrollment, Lesson
+
+
+DEFAULT_SNAPSHOTS = Path(__file__).with_name("query_plans.json")
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+_IN_LIST = re.compile(r"IN \((\$\d+(?:::\w+)?(?:, )?)+\)")
+
+
+@dataclass
+class Fixture:
+    course_id: str
+    lesson_id: str
+    enrollment_id: str
+    student_token: str
+    instructor_token: str
+
+
+# name -> (method, path, who calls it, JSON body)
+ROUTES: dict[str, tuple[str, str, str | None, dict[str, Any] | None]] = {
+    "list_courses": ("GET", "/courses", None, None),
+    "list_courses_filtered": ("GET", "/courses?search=python&category=python&level=beginner", None, None),
+    "get_course": ("GET", "/courses/{course_id}", None, None),
+    "list_lessons": ("GET", "/lessons/course/{course_id}", "student", None),
+    "get_lesson": ("GET", "/lessons/{lesson_id}", None, None),
+    "student_dashboard": ("GET", "/users/me/dashboard", "student", None),
+    "instructor_dashboard": ("GET", "/users/me/dashboard", "instructor", None),
+    "my_enrollments": ("GET", "/enrollments/me", "student", None),
+    "update_progress": (
+        "POST",
+        "/enrollments/{enrollment_id}/progress",
+        "student",
+        {"lesson_id": "{lesson_id}", "is_completed": True},
+    ),
+    "enrollment_progress": ("GET", "/enrollments/{enrollment_id}/progress", "student", None),
+    "platform_stats": ("GET", "/stats", None, None),
+}
+
+
+async def load_fixture() -> Fixture:
+    """Pick the most enrolled live course, one of its students and its first lesson."""
+
+    async with AsyncSessionLocal() as session:
+        course_id, instructor_id = (
+            await session.execute(
+                select(Course.id, Course.instructor_id)
+                .join(Enrollment, Enrollment.course_id == Course.id)
+                .join(Lesson, Lesson.course_id == Course.id)
+                .where(Course.status == CourseStatus.PUBLISHED, Course.deleted_at.is_(None))
+                .group_by(Course.id)
+                .order_by(func.count(Enrollment.id.distinct()).desc())
+                .limit(1)
+            )
+        ).one()
+        enrollment_id, student_id = (
+            await session.execute(
+                select(Enrollment.id, Enrollment.student_id).where(Enrollment.course_id == course_id).limit(1)
+            )
+        ).one()
+        lesson_id = await session.scalar(
+            select(Lesson.id).where(Lesson.course_id == course_id).order_by(Lesson.position).limit(1)
+        )
+    return Fixture(
+        course_id=str(course_id),
+        lesson_id=str(lesson_id),
+        enrollment_id=str(enrollment_id),
+        student_token=create_access_token(str(student_id)),
+        instructor_token=create_access_token(str(instructor_id)),
+    )
+
+
+async def capture(fixture: Fixture, names: list[str]) -> dict[str, list[tuple[str, tuple]]]:
+    """Call each route and collect the statements (with parameters) it executed."""
+
+    captured: dict[str, list[tuple[str, tuple]]] = {}
+    current: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().lower().startswith(EXPLAINABLE) and not executemany:
+            current.append((statement, tuple(parameters or ())))
+
+    values = {
+        "course_id": fixture.course_id,
+        "lesson_id": fixture.lesson_id,
+        "enrollment_id": fixture.enrollment_id,
+    }
+    tokens = {"student": fixture.student_token, "instructor": fixture.instructor_token}
+    settings = get_settings()
+    # Without the listener the worker-local caches are bypassed, so every
+    # route runs all of its statements regardless of the routes before it.
+    settings.invalidation_enabled = False
+    # The warm-up would run its reads in the background, in between the
+    # routes' statements; deadlines would cut the slower routes short.
+    settings.warmup_enabled = False
+    settings.request_deadlines_enabled = False
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://plans") as client:
+                for name in names:
+                    method, path, caller, body = ROUTES[name]
+                    if body is not None:
+                        body = {
+                            key: value.format(**values) if isinstance(value, str) else value
+                            for key, value in body.items()
+                        }
+                    current.clear()
+                    response = await client.request(
+                        method,
+                        "/api/v1" + path.format(**values),
+                        json=body,
+                        headers={"Authorization": f"Bearer {tokens[caller]}"} if caller else None,
+                    )
+                    if response.status_code >= 400:
+                        raise SystemExit(f"{name}: {method} {path} returned {response.status_code}: {response.text}")
+                    captured[name] = list(current)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return captured
+
+
+def normalize(statement: str) -> str:
+    """Collapse whitespace and variable-length ``IN`` lists so statements match across runs."""
+
+    return _IN_LIST.sub("IN (...)", " ".join(statement.split()))
+
+
+def shape(node: dict[str, Any], depth: int = 0) -> list[str]:
+    label = node["Node Type"]
+    if "Join Type" in node:
+        label += f" ({node['Join Type']})"
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        label += f" on {node['Relation Name']}"
+    lines = ["  " * depth + label]
+    for child in node.get("Plans", []):
+        lines += shape(child, depth + 1)
+    return lines
+
+
+async def explain(captured: dict[str, list[tuple[str, tuple]]]) -> dict[str, dict[str, dict[str, Any]]]:
+    connection = await asyncpg.connect(asyncpg_dsn())
+    try:
+        plans: dict[str, dict[str, dict[str, Any]]] = {}
+        for name, statements in captured.items():
+            plans[name] = {}
+            for statement, parameters in statements:
+                key = normalize(statement)
+                if key in plans[name]:
+                    continue
+                output = await connection.fetchval(f"EXPLAIN (FORMAT JSON) {statement}", *parameters)
+                plan = json.loads(output)[0]["Plan"]
+                plans[name][key] = {"shape": shape(plan), "cost": plan["Total Cost"]}
+    finally:
+        await connection.close()
+    return plans
+
+
+def compare(current: dict, snapshot: dict, tolerance: float) -> list[str]:
+    """Return a readable report of every plan that changed for the worse."""
+
+    report = []
+    for name, queries in current.items():
+        known = snapshot.get(name, {})
+        for statement, plan in queries.items():
+            before = known.get(statement)
+            if before is None:
+                report.append(f"{name}: new statement without a snapshot\n  {statement}")
+                continue
+            problems = [
+                f"  {line}"
+                for line in difflib.unified_diff(before["shape"], plan["shape"], lineterm="", n=1)
+                if not line.startswith(("---", "+++", "@@"))
+            ]
+            if plan["cost"] > before["cost"] * (1 + tolerance):
+                problems.append(f"  cost {before['cost']:.1f} -> {plan['cost']:.1f}")
+            if problems:
+                report.append(f"{name}: {statement}\n" + "\n".join(problems))
+        for statement in known.keys() - queries.keys():
+            report.append(f"{name}: statement no longer executed\n  {statement}")
+    return report
+
+
+async def run(args: argparse.Namespace) -> int:
+    names = args.routes or list(ROUTES)
+    fixture = await load_fixture()
+    plans = await explain(await capture(fixture, names))
+    statements = sum(len(queries) for queries in plans.values())
+
+    if args.update:
+        snapshot = json.loads(args.snapshots.read_text()) if args.snapshots.exists() else {}
+        snapshot.update(plans)
+        args.snapshots.write_text(json.dumps(snapshot, indent=2, sort_keys=True) + "\n")
+        print(f"wrote {statements} plans for {len(plans)} routes to {args.snapshots}")
+        return 0
+
+    if not args.snapshots.exists():
+        print(f"no snapshot at {args.snapshots}; run with --update first")
+        return 1
+    report = compare(plans, json.loads(args.snapshots.read_text()), args.cost_tolerance)
+    for entry in report:
+        print(entry)
+    print(f"checked {statements} plans for {len(plans)} routes: " + ("FAILED" if report else "OK"))
+    return 1 if report else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "routes", nargs="*", metavar="route", help=f"routes to check (default: all of {', '.join(ROUTES)})"
+    )
+    parser.add_argument("--snapshots", type=Path, default=DEFAULT_SNAPSHOTS)
+    parser.add_argument("--update", action="store_true", help="write current plans to the snapshot file")
+    parser.add_argument("--cost-tolerance", type=float, default=0.5, help="allowed relative cost increase")
+    args = parser.parse_args(argv)
+    unknown = set(args.routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
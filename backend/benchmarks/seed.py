@@ -0,0 +1,430 @@
+"""Generate large, realistic datasets and snapshot or restore them.
+
+``generate`` truncates the application tables and fills them with synthetic
+users, courses, lessons, enrollments and lesson progress. Rows are produced
+from the tables in ``app.models`` (columns, enum conversion and load order
+all come from the metadata) and streamed with ``COPY``: every table is split
+into ``--workers`` chunks, each generated and copied by its own process, and
+tables that do not depend on each other load at the same time.
+
+The data is a pure function of ``--seed``: ids, names, which courses a
+student takes and how far they got are derived from the seed and the row's
+index, never from timing or the order chunks finish in. Course popularity
+follows a Zipf distribution (``--zipf``), so a few courses hold most
+enrollments, as in production. Every user gets the same password
+(``--password``), hashed once with bcrypt before loading.
+
+``snapshot`` copies the database to a template database and ``restore``
+recreates it from that template, which takes seconds instead of a reload.
+Both need a role that may create databases and terminate the other
+connections to the databases involved.
+
+Run from the ``backend`` directory against the database in ``DATABASE_URL``::
+
+    python -m benchmarks.seed generate --yes --users 1000000 --courses 50000 \\
+        --enrollments 5000000 --lessons 20-60 --workers 8
+    python -m benchmarks.seed snapshot
+    python -m benchmarks.seed restore
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import random
+import sys
+import time
+import uuid
+from array import array
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import asyncpg
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import get_settings
+from app.core.security import get_password_hash
+from app.db.session import Base, asyncpg_dsn
+from app.models import (
+    Course,
+    CourseLevel,
+    CourseStatus,
+    Enrollment,
+    EnrollmentStatus,
+    Lesson,
+    LessonProgress,
+    User,
+    UserRole,
+)
+
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+MAX_ENROLLMENTS_PER_STUDENT = 1 << 10
+MAX_LESSONS_PER_COURSE = 1 << 10
+# Odd multipliers: index -> id is a bijection, and ids look as scattered as uuid4.
+_UUID_MIX = 0x9E3779B97F4A7C15F39CC0605CEDC835
+_UUID_SALT = 0xD1B54A32D192ED03C13E3A5F45A3A9B1
+_UUID_MASK = (1 << 128) - 1
+
+WORDS = (
+    "python data design web machine learning cloud security mobile intro advanced practical modern "
+    "systems algorithms analytics marketing finance writing photography music history physics"
+).split()
+FIRST_NAMES = "Ada Alan Grace Linus Barbara Ken Margaret Dennis Frances Edsger Radia Guido Hedy Tim".split()
+LAST_NAMES = "Lovelace Turing Hopper Torvalds Liskov Thompson Hamilton Ritchie Allen Dijkstra Perlman Rossum".split()
+
+_dialect = postgresql.asyncpg.dialect()
+
+
+@dataclass
+class SeedPlan:
+    """Everything a worker process needs to regenerate any chunk of any table."""
+
+    seed: int
+    users: int
+    instructors: int
+    courses: int
+    enrollments: int
+    zipf: float
+    published_ratio: float
+    content_bytes: int
+    password_hash: str
+    lesson_counts: array = field(repr=False)
+
+    @property
+    def students(self) -> int:
+        return self.users - self.instructors
+
+    def uuid(self, kind: int, index: int) -> uuid.UUID:
+        salt = ((self.seed << 8) | kind) * _UUID_SALT
+        return uuid.UUID(int=((index + 1) * _UUID_MIX ^ salt) & _UUID_MASK)
+
+    def timestamp(self, kind: int, index: int) -> datetime:
+        # Spread over a year, scattered rather than in insertion order.
+        return EPOCH + timedelta(seconds=(index * 7_919 + kind * 104_729) % (365 * 24 * 3600))
+
+    def is_published(self, course: int) -> bool:
+        return (course * 2_654_435_761 + self.seed) % 1000 < self.published_ratio * 1000
+
+
+class CourseSampler:
+    """Pick published courses with Zipf-distributed popularity."""
+
+    def __init__(self, plan: SeedPlan) -> None:
+        published = [course for course in range(plan.courses) if plan.is_published(course)]
+        random.Random(plan.seed).shuffle(published)  # popularity rank -> course
+        self.ranked = published
+        self.cumulative = list(itertools.accumulate(1 / rank**plan.zipf for rank in range(1, len(published) + 1)))
+
+    def sample(self, rng: random.Random) -> int:
+        return self.ranked[bisect.bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+def _student_courses(plan: SeedPlan, sampler: CourseSampler, student: int) -> list[tuple[int, int]]:
+    """Return ``(course, lessons completed)`` for each enrollment of ``student``."""
+
+    rng = random.Random(plan.seed * 1_000_003 + student)
+    base, extra = divmod(plan.enrollments, max(plan.students, 1))
+    count = min(base + (student < extra), len(sampler.ranked), MAX_ENROLLMENTS_PER_STUDENT)
+    chosen: set[int] = set()
+    while len(chosen) < count:
+        chosen.add(sampler.sample(rng))
+    return [(course, rng.randint(0, plan.lesson_counts[course])) for course in sorted(chosen)]
+
+
+def users_rows(plan: SeedPlan, start: int, stop: int) -> Iterator[dict[str, Any]]:
+    for index in range(start, stop):
+        first, last = FIRST_NAMES[index % len(FIRST_NAMES)], LAST_NAMES[index * 7 % len(LAST_NAMES)]
+        created = plan.timestamp(0, index)
+        yield {
+            "id": plan.uuid(0, index),
+            "full_name": f"{first} {last}",
+            "email": f"seed-{index}@example.com",
+            "hashed_password": plan.password_hash,
+            "role": UserRole.INSTRUCTOR if index < plan.instructors else UserRole.STUDENT,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def courses_rows(plan: SeedPlan, start: int, stop: int) -> Iterator[dict[str, Any]]:
+    levels = list(CourseLevel)
+    for index in range(start, stop):
+        words = [WORDS[(index + 1) * prime % len(WORDS)] for prime in (3, 7, 13)]
+        created = plan.timestamp(1, index)
+        yield {
+            "id": plan.uuid(1, index),
+            "title": f"{' '.join(words).title()} {index}",
+            "description": f"A course about {' and '.join(words)}. " * 4,
+            "category": WORDS[(index * 11) % 8],
+            "level": levels[index % len(levels)],
+            "status": CourseStatus.PUBLISHED if plan.is_published(index) else CourseStatus.DRAFT,
+            "instructor_id": plan.uuid(0, index % plan.instructors),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def lessons_rows(plan: SeedPlan, start: int, stop: int) -> Iterator[dict[str, Any]]:
+    content = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (plan.content_bytes // 57 + 1))[
+        : plan.content_bytes
+    ]
+    for course in range(start, stop):
+        course_id = plan.uuid(1, course)
+        for position in range(plan.lesson_counts[course]):
+            index = course * MAX_LESSONS_PER_COURSE + position
+            created = plan.timestamp(2, index)
+            yield {
+                "id": plan.uuid(2, index),
+                "course_id": course_id,
+                "title": f"Lesson {position + 1}",
+                "content": content,
+                "position": position + 1,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+
+def enrollments_rows(plan: SeedPlan, start: int, stop: int) -> Iterator[dict[str, Any]]:
+    sampler = CourseSampler(plan)
+    for student in range(start, stop):
+        for number, (course, completed) in enumerate(_student_courses(plan, sampler, student)):
+            index = student * MAX_ENROLLMENTS_PER_STUDENT + number
+            lessons = plan.lesson_counts[course]
+            done = lessons > 0 and completed == lessons
+            created = plan.timestamp(3, index)
+            yield {
+                "id": plan.uuid(3, index),
+                "student_id": plan.uuid(0, plan.instructors + student),
+                "course_id": plan.uuid(1, course),
+                "status": EnrollmentStatus.COMPLETED if done else EnrollmentStatus.ACTIVE,
+                "progress_percent": round(completed / lessons * 100, 2) if lessons else 0.0,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+
+def lesson_progress_rows(plan: SeedPlan, start: int, stop: int) -> Iterator[dict[str, Any]]:
+    sampler = CourseSampler(plan)
+    for student in range(start, stop):
+        for number, (course, completed) in enumerate(_student_courses(plan, sampler, student)):
+            enrollment = student * MAX_ENROLLMENTS_PER_STUDENT + number
+            for position in range(completed):
+                index = enrollment * MAX_LESSONS_PER_COURSE + position
+                yield {
+                    "id": plan.uuid(4, index),
+                    "enrollment_id": plan.uuid(3, enrollment),
+                    "lesson_id": plan.uuid(2, course * MAX_LESSONS_PER_COURSE + position),
+                    "is_completed": True,
+                    "completed_at": plan.timestamp(4, index),
+                }
+
+
+RowFactory = Callable[[SeedPlan, int, int], Iterator[dict[str, Any]]]
+
+# Each table is generated in chunks of "units": users and courses per row,
+# lessons per course, enrollments and progress per student.
+GENERATORS: dict[str, tuple[RowFactory, Callable[[SeedPlan], int]]] = {
+    User.__tablename__: (users_rows, lambda plan: plan.users),
+    Course.__tablename__: (courses_rows, lambda plan: plan.courses),
+    Lesson.__tablename__: (lessons_rows, lambda plan: plan.courses),
+    Enrollment.__tablename__: (enrollments_rows, lambda plan: plan.students),
+    LessonProgress.__tablename__: (lesson_progress_rows, lambda plan: plan.students),
+}
+
+
+def _records(table: Table, columns: list[str], rows: Iterator[dict[str, Any]]) -> Iterator[tuple]:
+    """Convert rows to tuples with each column type's own bind conversion."""
+
+    converters = []
+    for name in columns:
+        column_type = table.columns[name].type
+        if isinstance(column_type, TypeDecorator):
+            converters.append(lambda value, column_type=column_type: column_type.process_bind_param(value, _dialect))
+        else:
+            converters.append(None)
+    for row in rows:
+        yield tuple(
+            convert(row[name]) if convert else row[name] for name, convert in zip(columns, converters, strict=True)
+        )
+
+
+async def _copy_chunk(plan: SeedPlan, table_name: str, start: int, stop: int) -> int:
+    table = Base.metadata.tables[table_name]
+    factory, _ = GENERATORS[table_name]
+    rows = factory(plan, start, stop)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    columns = list(first)
+    connection = await asyncpg.connect(asyncpg_dsn())
+    try:
+        result = await connection.copy_records_to_table(
+            table_name, records=_records(table, columns, itertools.chain([first], rows)), columns=columns
+        )
+    finally:
+        await connection.close()
+    return int(result.split()[-1])
+
+
+def load_chunk(plan: SeedPlan, table_name: str, start: int, stop: int) -> int:
+    """Generate and copy units ``start:stop`` of a table; runs in a worker process."""
+
+    return asyncio.run(_copy_chunk(plan, table_name, start, stop))
+
+
+def load_levels() -> list[list[Table]]:
+    """Group tables so that each group only references tables of earlier groups."""
+
+    depth: dict[str, int] = {}
+    for table in Base.metadata.sorted_tables:
+        parents = {key.column.table.name for key in table.foreign_keys} - {table.name}
+        depth[table.name] = max((depth[parent] + 1 for parent in parents), default=0)
+    levels: list[list[Table]] = [[] for _ in range(max(depth.values()) + 1)]
+    for table in Base.metadata.sorted_tables:
+        levels[depth[table.name]].append(table)
+    return levels
+
+
+def make_plan(args: argparse.Namespace) -> SeedPlan:
+    low, _, high = args.lessons.partition("-")
+    low, high = int(low), int(high or low)
+    if not 0 <= low <= high <= MAX_LESSONS_PER_COURSE:
+        raise SystemExit(f"--lessons must be within 0-{MAX_LESSONS_PER_COURSE}")
+    rng = random.Random(args.seed)
+    instructors = args.instructors or max(1, args.courses // 10)
+    if instructors >= args.users:
+        raise SystemExit("--users must exceed the number of instructors")
+    return SeedPlan(
+        seed=args.seed,
+        users=args.users,
+        instructors=instructors,
+        courses=args.courses,
+        enrollments=args.enrollments,
+        zipf=args.zipf,
+        published_ratio=args.published,
+        content_bytes=args.content_bytes,
+        password_hash=get_password_hash(args.password),
+        lesson_counts=array("H", (rng.randint(low, high) for _ in range(args.courses))),
+    )
+
+
+async def generate(args: argparse.Namespace) -> None:
+    plan = make_plan(args)
+    tables = Base.metadata.sorted_tables
+    connection = await asyncpg.connect(asyncpg_dsn())
+    try:
+        await connection.execute(f"TRUNCATE {', '.join(table.name for table in tables)} CASCADE")
+    finally:
+        await connection.close()
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for level in load_levels():
+            level_started = time.perf_counter()
+            futures: dict[str, list[asyncio.Future[int]]] = {}
+            for table in level:
+                if table.name not in GENERATORS:
+                    continue
+                units = GENERATORS[table.name][1](plan)
+                step = -(-units // args.workers) or 1
+                futures[table.name] = [
+                    loop.run_in_executor(pool, load_chunk, plan, table.name, start, min(start + step, units))
+                    for start in range(0, units, step)
+                ]
+            for table_name, chunks in futures.items():
+                rows = sum(await asyncio.gather(*chunks))
+                elapsed = time.perf_counter() - level_started
+                print(f"  {table_name:16} {rows:12,} rows  {elapsed:8.1f} s  {rows / max(elapsed, 1e-9):12,.0f} rows/s")
+
+    connection = await asyncpg.connect(asyncpg_dsn())
+    try:
+        await connection.execute("ANALYZE")
+    finally:
+        await connection.close()
+    print(f"generated in {time.perf_counter() - started:.1f} s (seed {plan.seed}, password {args.password!r})")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+async def _terminate(connection: asyncpg.Connection, database: str) -> None:
+    await connection.execute(
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = $1 AND pid <> pg_backend_pid()",
+        database,
+    )
+
+
+async def clone(source: str, target: str, maintenance_db: str) -> None:
+    """Replace database ``target`` with a copy of ``source``."""
+
+    connection = await asyncpg.connect(asyncpg_dsn(maintenance_db))
+    try:
+        await _terminate(connection, source)
+        await _terminate(connection, target)
+        await connection.execute(f"DROP DATABASE IF EXISTS {_quote(target)}")
+        await connection.execute(f"CREATE DATABASE {_quote(target)} TEMPLATE {_quote(source)}")
+    finally:
+        await connection.close()
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = make_url(get_settings().database_url).database
+    started = time.perf_counter()
+    if args.command == "generate":
+        print(f"seeding {database}")
+        await generate(args)
+        return
+    snapshot = args.name or f"{database}_seed_snapshot"
+    if args.command == "snapshot":
+        await clone(database, snapshot, args.maintenance_db)
+        print(f"snapshot {snapshot} taken from {database} in {time.perf_counter() - started:.1f} s")
+    else:
+        await clone(snapshot, database, args.maintenance_db)
+        print(f"{database} restored from {snapshot} in {time.perf_counter() - started:.1f} s")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="truncate the application tables and fill them")
+    generate_parser.add_argument("--yes", action="store_true", help="confirm that existing data may be deleted")
+    generate_parser.add_argument("--seed", type=int, default=1)
+    generate_parser.add_argument("--users", type=int, default=10_000)
+    generate_parser.add_argument("--instructors", type=int, help="default: one per ten courses")
+    generate_parser.add_argument("--courses", type=int, default=500)
+    generate_parser.add_argument("--enrollments", type=int, default=50_000)
+    generate_parser.add_argument("--lessons", default="5-40", help="lessons per course, N or MIN-MAX")
+    generate_parser.add_argument("--zipf", type=float, default=1.1, help="course popularity exponent")
+    generate_parser.add_argument("--published", type=float, default=0.9, help="fraction of published courses")
+    generate_parser.add_argument("--content-bytes", type=int, default=2000, help="lesson content size")
+    generate_parser.add_argument("--password", default="seed-password")
+    generate_parser.add_argument("--workers", type=int, default=4, help="processes (and connections) per table")
+
+    for name, help_text in (("snapshot", "copy the database to a template"), ("restore", "recreate it from one")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--name", help="snapshot database (default: <database>_seed_snapshot)")
+
+    for command in commands.choices.values():
+        command.add_argument("--maintenance-db", default="postgres", help="database to connect to for DDL")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate" and not args.yes:
+        parser.error("generate deletes every row in the application tables; pass --yes to continue")
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Benchmark JSON serialization of ``GET /courses`` with a large catalog.
+
+Runs in-process with no database: the session dependency is replaced by a
+fake that returns ``--rows`` synthetic catalog rows. The "before" app is the
+previous implementation (handler builds ``CourseSummary`` models and FastAPI
+re-validates and re-serializes them through ``response_model``); "after" is
+the real application route using the fast serialization path.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.db.session import get_session
+from app.main import app
+from app.models import CourseLevel, CourseStatus
+from app.schemas import CourseSummary
+
+
+class FakeResult:
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = rows
+
+    def mappings(self) -> "FakeResult":
+        return self
+
+    def all(self) -> list[dict]:
+        return self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def one(self) -> tuple:
+        # Catalog ETag version lookup.
+        return (None, len(self._rows), 0)
+
+
+class FakeSession:
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = rows
+
+    async def execute(self, *args, **kwargs) -> FakeResult:
+        return FakeResult(self._rows)
+
+
+def make_rows(count: int) -> list[dict]:
+    """Catalog rows shaped like the projected ``list_courses`` query."""
+
+    levels = list(CourseLevel)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "title": f"Course {index}",
+            "description": "An introduction to the topic with worked examples and exercises. " * 3,
+            "category": f"category-{index % 12}",
+            "level": levels[index % len(levels)],
+            "status": CourseStatus.PUBLISHED,
+            "thumbnail_url": f"/media/thumbnails/{index}.png" if index % 3 else None,
+            "enrollment_count": index % 250,
+        }
+        for index in range(count)
+    ]
+
+
+def legacy_app() -> FastAPI:
+    """The catalog route as it was before the fast path."""
+
+    legacy = FastAPI()
+
+    @legacy.get("/api/v1/courses", response_model=list[CourseSummary])
+    async def list_courses(session=Depends(get_session)) -> list[CourseSummary]:
+        result = await session.execute(None)
+        return [
+            CourseSummary(
+                id=row["id"],
+                title=row["title"],
+                description=row["description"],
+                category=row["category"],
+                level=row["level"],
+                status=row["status"],
+                thumbnail_url=row["thumbnail_url"],
+                enrollment_count=int(row["enrollment_count"]) if row["enrollment_count"] else 0,
+            )
+            for row in result.all()
+        ]
+
+    return legacy
+
+
+async def measure(target: FastAPI, repeat: int) -> tuple[list[float], bytes]:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        body = (await client.get("/api/v1/courses")).content  # warm-up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = await client.get("/api/v1/courses")
+            timings.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    return timings, body
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    session = FakeSession(make_rows(args.rows))
+
+    async def fake_session():
+        yield session
+
+    before_app = legacy_app()
+    before_app.dependency_overrides[get_session] = fake_session
+    app.dependency_overrides[get_session] = fake_session
+    try:
+        before, before_body = await measure(before_app, args.repeat)
+        after, after_body = await measure(app, args.repeat)
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert json.loads(before_body) == json.loads(after_body), "payloads differ"
+    before_ms, after_ms = statistics.median(before), statistics.median(after)
+    print(f"GET /courses with {args.rows} rows, median of {args.repeat} runs")
+    print(f"  before: {before_ms:8.1f} ms")
+    print(f"  after:  {after_ms:8.1f} ms  ({before_ms / after_ms:.2f}x faster)")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
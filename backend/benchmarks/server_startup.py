@@ -0,0 +1,97 @@
+"""Startup time and memory of ``app.server`` with and without preloading.
+
+Starts the launcher with ``--workers`` workers, once preloading the app in
+the master (the default) and once with ``--no-preload`` (every worker imports
+it, as ``uvicorn --workers`` does), and reports:
+
+- startup: seconds until every worker logged "Application startup complete";
+- PSS: proportional set size of master and workers together, which splits
+  shared pages between the processes sharing them;
+- private: memory only a worker holds, averaged over the workers.
+
+The warm-up is disabled so no database is needed. Linux only (reads
+``/proc``)::
+
+    python -m benchmarks.server_startup --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+def _memory(pid: int) -> dict[str, int]:
+    """Return ``/proc/<pid>/smaps_rollup`` fields in KiB."""
+
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])
+    return fields
+
+
+def _children(pid: int) -> list[int]:
+    return [int(child) for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+
+
+def measure(workers: int, port: int, preload: bool, timeout: float) -> tuple[float, int, int]:
+    command = [sys.executable, "-m", "app.server", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"]
+    if not preload:
+        command.append("--no-preload")
+    env = {**os.environ, "WARMUP_ENABLED": "false"}
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stderr=subprocess.PIPE, text=True)
+    ready = threading.Event()
+    startup = 0.0
+
+    def watch() -> None:
+        nonlocal startup
+        complete = 0
+        for line in process.stderr:
+            if "Application startup complete" in line:
+                complete += 1
+                if complete == workers:
+                    startup = time.perf_counter() - started
+                    ready.set()
+
+    threading.Thread(target=watch, daemon=True).start()
+    try:
+        if not ready.wait(timeout):
+            raise SystemExit(f"workers did not start within {timeout:.0f}s")
+        time.sleep(1)  # let the workers settle
+        worker_pids = _children(process.pid)
+        pss = sum(_memory(pid)["Pss"] for pid in [process.pid, *worker_pids])
+        private = sum(
+            _memory(pid)["Private_Clean"] + _memory(pid)["Private_Dirty"] for pid in worker_pids
+        ) // len(worker_pids)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout)
+    return startup, pss, private
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    print(f"app.server with {args.workers} workers")
+    for label, preload in (("no preload", False), ("preload", True)):
+        startup, pss, private = measure(args.workers, args.port, preload, args.timeout)
+        print(
+            f"  {label:11} startup {startup:6.2f} s   PSS total {pss / 1024:7.1f} MiB   "
+            f"private per worker {private / 1024:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
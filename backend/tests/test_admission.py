@@ -0,0 +1,160 @@
+"""Priorities, shedding and slot release in admission control."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.background import BackgroundTask
+from starlette.responses import PlainTextResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    ClassLimits,
+    Rejected,
+    RouteClass,
+    route_class,
+)
+from app.core.config import get_settings
+
+
+pytestmark = pytest.mark.anyio
+
+API = get_settings().api_v1_prefix
+
+
+def controller(max_concurrent: int = 1, queue: int = 4, max_wait: float = 1.0) -> AdmissionController:
+    limits = {
+        klass: ClassLimits(max_concurrent, queue, max_wait, priority) for priority, klass in enumerate(RouteClass)
+    }
+    return AdmissionController(limits, max_concurrent)
+
+
+def test_route_classes() -> None:
+    assert route_class("GET", f"{API}/courses/abc") == RouteClass.LEARNING
+    assert route_class("GET", f"{API}/courses/mine") == RouteClass.READ
+    assert route_class("POST", f"{API}/auth/token") == RouteClass.AUTH
+    assert route_class("GET", f"{API}/users/me/dashboard") == RouteClass.ANALYTICS
+    assert route_class("DELETE", f"{API}/courses/abc") == RouteClass.WRITE
+    assert route_class("OPTIONS", f"{API}/courses") is None
+    assert route_class("GET", "/healthz") is None
+    assert route_class("GET", f"{API}/debug/profiles") is None
+
+
+async def test_freed_slots_go_to_the_highest_priority_waiter() -> None:
+    admission = controller()
+    await admission.acquire(RouteClass.READ)
+
+    # Analytics arrives first but learning traffic is admitted ahead of it.
+    waiters = {
+        klass: asyncio.create_task(admission.acquire(klass)) for klass in (RouteClass.ANALYTICS, RouteClass.LEARNING)
+    }
+    await asyncio.sleep(0)
+    assert admission.queued[RouteClass.ANALYTICS] == admission.queued[RouteClass.LEARNING] == 1
+
+    admission.release(RouteClass.READ)
+    assert admission.running[RouteClass.LEARNING] == 1
+    assert admission.queued[RouteClass.ANALYTICS] == 1
+    await waiters[RouteClass.LEARNING]
+
+    admission.release(RouteClass.LEARNING)
+    await waiters[RouteClass.ANALYTICS]
+    assert admission.running[RouteClass.ANALYTICS] == admission.total_running == 1
+
+
+async def test_full_queue_is_shed_immediately() -> None:
+    admission = controller(queue=1)
+    await admission.acquire(RouteClass.READ)
+    waiter = asyncio.create_task(admission.acquire(RouteClass.READ))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Rejected) as rejected:
+        await admission.acquire(RouteClass.READ)
+    assert rejected.value.reason == "queue_full"
+
+    admission.release(RouteClass.READ)
+    await waiter
+
+
+async def test_waiting_past_the_class_limit_is_rejected() -> None:
+    admission = controller(max_wait=0.01)
+    await admission.acquire(RouteClass.READ)
+
+    with pytest.raises(Rejected) as rejected:
+        await admission.acquire(RouteClass.READ)
+    assert rejected.value.reason == "timeout"
+    assert admission.queued[RouteClass.READ] == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    admission = controller()
+    await admission.acquire(RouteClass.READ)
+    waiter = asyncio.create_task(admission.acquire(RouteClass.READ))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    admission.release(RouteClass.READ)
+
+    assert admission.queued[RouteClass.READ] == 0
+    assert admission.total_running == 0
+
+
+class SlowApp:
+    """Answer after ``release`` is set; the response's background task records the running count."""
+
+    def __init__(self, admission: AdmissionController) -> None:
+        self.admission = admission
+        self.release = asyncio.Event()
+        self.running_in_background: int | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.release.wait()
+        response = PlainTextResponse("ok", background=BackgroundTask(self.record))
+        await response(scope, receive, send)
+
+    async def record(self) -> None:
+        self.running_in_background = self.admission.total_running
+
+
+@pytest.fixture
+def admission() -> AdmissionController:
+    return controller(queue=0)
+
+
+@pytest.fixture
+async def slow_app(admission: AdmissionController, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(get_settings(), "admission_enabled", True)
+    inner = SlowApp(admission)
+    middleware = AdmissionMiddleware(inner)
+    middleware.controller = admission
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test") as client:
+        yield client, inner
+
+
+async def test_middleware_sheds_with_503_and_retry_after(slow_app, admission: AdmissionController) -> None:
+    client, inner = slow_app
+    running = asyncio.create_task(client.get(f"{API}/courses"))
+    while admission.total_running == 0:
+        await asyncio.sleep(0)
+
+    shed = await client.get(f"{API}/courses")
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == str(get_settings().admission_retry_after_seconds)
+
+    inner.release.set()
+    assert (await running).status_code == 200
+
+
+async def test_slot_is_released_before_background_tasks(slow_app, admission: AdmissionController) -> None:
+    client, inner = slow_app
+    inner.release.set()
+
+    response = await client.get(f"{API}/courses")
+
+    assert response.status_code == 200
+    assert inner.running_in_background == 0
+    assert admission.total_running == 0
@@ -0,0 +1,127 @@
+"""Parsing uploads and loading them batch by batch in ``app.services.bulk_import``."""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from app.models import Course, UserRole
+from app.schemas import ImportEntity, ImportFormat, ImportRowError
+from app.services import bulk_import
+from app.services.bulk_import import import_rows, iter_rows
+
+
+pytestmark = pytest.mark.anyio
+
+
+def text(data: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline="")
+
+
+def test_csv_rows_leave_empty_cells_out() -> None:
+    rows = list(iter_rows(text(b"title,category\nIntro,\nAdvanced,math\n"), ImportFormat.CSV))
+
+    assert rows == [(1, {"title": "Intro"}, None), (2, {"title": "Advanced", "category": "math"}, None)]
+
+
+def test_jsonl_rows_report_bad_lines_and_skip_blank_ones() -> None:
+    rows = list(iter_rows(text(b'{"title": "Intro"}\n\n[1]\n{oops\n'), ImportFormat.JSONL))
+
+    assert rows[0] == (1, {"title": "Intro"}, None)
+    assert rows[1] == (2, None, "Each line must be a JSON object")
+    assert rows[2][0] == 3 and rows[2][2].startswith("Invalid JSON")
+
+
+def undecodable_after(lines: list[str]):
+    """A stream whose bytes stop decoding after ``lines``, as a ``TextIOWrapper`` raises it."""
+
+    yield from lines
+    raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+
+@pytest.mark.parametrize("file_format", list(ImportFormat))
+def test_undecodable_bytes_end_the_file_with_a_row_error(file_format: ImportFormat) -> None:
+    lines = ['{"title": "Intro"}\n'] * 2 if file_format == ImportFormat.JSONL else ["title\n", "Intro\n", "Intro\n"]
+
+    rows = list(iter_rows(undecodable_after(lines), file_format))
+
+    assert rows[:2] == [(1, {"title": "Intro"}, None), (2, {"title": "Intro"}, None)]
+    assert rows[2] == (3, None, "File is not valid UTF-8 (invalid start byte); rest of file skipped")
+
+
+def test_undecodable_upload_is_read_up_to_the_bad_chunk() -> None:
+    data = b"title\n" + b"Intro\n" * 2000 + b"\xff\n" + b"Intro\n"
+
+    rows = list(iter_rows(text(data), ImportFormat.CSV))
+
+    assert 0 < len(rows) - 1 < 2000
+    assert all(error is None for _, _, error in rows[:-1])
+    assert rows[-1][0] == len(rows)
+    assert rows[-1][2].startswith("File is not valid UTF-8")
+
+
+def test_malformed_csv_ends_the_file_with_a_row_error() -> None:
+    rows = list(iter_rows(text(b'title\nIntro\n"' + b"x" * 200_000 + b'"\n'), ImportFormat.CSV))
+
+    assert rows[0] == (1, {"title": "Intro"}, None)
+    assert rows[1][0] == 2 and rows[1][2].startswith("Invalid CSV")
+
+
+class Session:
+    """Counts the commits and rollbacks ``import_rows`` makes."""
+
+    def __init__(self) -> None:
+        self.commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+async def test_unreadable_rest_of_file_keeps_the_committed_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    loaded: list[int] = []
+
+    async def load(session, rows, executor) -> list[ImportRowError]:
+        loaded.extend(row_number for row_number, _ in rows)
+        return []
+
+    monkeypatch.setitem(bulk_import._LOADERS, ImportEntity.LESSONS, load)
+    lesson = '{"course_id": "00000000-0000-0000-0000-000000000000", "title": "Lesson", "content": "Text"}\n'
+    session = Session()
+
+    report = await import_rows(
+        session, ImportEntity.LESSONS, iter_rows(undecodable_after([lesson] * 3), ImportFormat.JSONL), batch_size=2
+    )
+
+    assert loaded == [1, 2, 3]
+    assert session.commits == 2
+    assert (report.total_rows, report.imported, report.failed) == (4, 3, 1)
+    assert report.errors[0].row == 4
+
+
+@pytest.mark.database
+async def test_instructor_emails_match_regardless_of_case(make_user) -> None:
+    from sqlalchemy import delete
+
+    from app.db.session import AsyncSessionLocal
+
+    instructor, _ = await make_user(UserRole.INSTRUCTOR)
+    shouted = instructor.email.upper()
+    instructor_email = f"Mixed.{instructor.email}"
+    mixed, _ = await make_user(UserRole.INSTRUCTOR, email=instructor_email)
+    course = {"description": "Found by email.", "category": "testing"}
+    rows = [
+        (1, {**course, "title": "Shouted", "instructor_email": shouted}, None),
+        (2, {**course, "title": "Lowered", "instructor_email": instructor_email.lower()}, None),
+    ]
+
+    async with AsyncSessionLocal() as session:
+        report = await import_rows(session, ImportEntity.COURSES, rows)
+        await session.execute(delete(Course).where(Course.instructor_id.in_([instructor.id, mixed.id])))
+        await session.commit()
+
+    assert report.errors == []
+    assert report.imported == 2
@@ -0,0 +1,42 @@
+"""The course outline view: lessons without their content, which is fetched per lesson."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from app.models import UserRole
+from app.schemas import CourseRead, LessonOutline, LessonRead
+from app.services import read_models
+
+
+pytestmark = pytest.mark.anyio
+
+
+def test_projected_columns_are_exactly_the_schema_fields() -> None:
+    assert {column.key for column in read_models.COURSE_COLUMNS} == set(CourseRead.model_fields)
+    assert {column.key for column in read_models.LESSON_COLUMNS} == set(LessonRead.model_fields)
+    assert {column.key for column in read_models.LESSON_OUTLINE_COLUMNS} == set(LessonOutline.model_fields)
+    assert {"content", "video_url"}.isdisjoint(LessonOutline.model_fields)
+
+
+@pytest.mark.database
+async def test_outline_leaves_lesson_bodies_to_the_lesson_route(api: httpx.AsyncClient, make_user) -> None:
+    _, instructor = await make_user(UserRole.INSTRUCTOR)
+    course = {"title": "Outlined course", "description": "A course with an outline.", "category": "testing"}
+    course_id = (await api.post("/courses", json={**course, "status": "published"}, headers=instructor)).json()["id"]
+    for position in (2, 1):
+        lesson = {"course_id": course_id, "title": f"Lesson {position}", "content": f"Body {position}"}
+        lesson.update(video_url="https://example.com/video", position=position)
+        assert (await api.post("/lessons", json=lesson, headers=instructor)).status_code == 201
+
+    full = await api.get(f"/courses/{course_id}")
+    outline = await api.get(f"/courses/{course_id}", params={"view": "outline"})
+
+    assert [lesson["content"] for lesson in full.json()["lessons"]] == ["Body 1", "Body 2"]
+    lessons = outline.json()["lessons"]
+    assert [lesson["title"] for lesson in lessons] == ["Lesson 1", "Lesson 2"]
+    assert all(set(lesson) == set(LessonOutline.model_fields) for lesson in lessons)
+    assert outline.headers["ETag"] != full.headers["ETag"]
+    body = await api.get(f"/lessons/{lessons[0]['id']}")
+    assert (body.json()["content"], body.json()["video_url"]) == ("Body 1", "https://example.com/video")
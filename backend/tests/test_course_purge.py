@@ -0,0 +1,109 @@
+"""Soft-deleted courses: hidden from the API at once, purged in batches afterwards."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models import Course, Enrollment, Lesson, LessonProgress, UserRole
+from app.services import course_purge
+from app.services.course_purge import SWEEP_LOCK_KEY, purge_course, sweep_periodically
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.database]
+
+COURSE = {"title": "Course to delete", "description": "Deleted by the tests.", "category": "testing"}
+
+
+@pytest.fixture
+async def course(api: httpx.AsyncClient, make_user) -> dict[str, str]:
+    """A published course with two lessons and a student who completed the first."""
+
+    _, instructor = await make_user(UserRole.INSTRUCTOR)
+    _, student = await make_user()
+    course_id = (await api.post("/courses", json={**COURSE, "status": "published"}, headers=instructor)).json()["id"]
+    lesson_ids = []
+    for position, title in enumerate(["First lesson", "Second lesson"]):
+        lesson = {"course_id": course_id, "title": title, "content": "Text", "position": position}
+        lesson_ids.append((await api.post("/lessons", json=lesson, headers=instructor)).json()["id"])
+    enrollment_id = (await api.post("/enrollments", json={"course_id": course_id}, headers=student)).json()["id"]
+    progress = {"lesson_id": lesson_ids[0], "is_completed": True}
+    assert (await api.post(f"/enrollments/{enrollment_id}/progress", json=progress, headers=student)).status_code == 200
+    return {"id": course_id, "lesson_id": lesson_ids[1], "enrollment_id": enrollment_id, "student": student}
+
+
+async def soft_delete(course_id: str) -> None:
+    """Mark the course deleted without purging it, as after a purge that did not run."""
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Course).where(Course.id == course_id).values(deleted_at=func.now()))
+        await session.commit()
+
+
+async def remaining_rows(course_id: str) -> dict[str, int]:
+    async with AsyncSessionLocal() as session:
+        count = lambda statement: session.scalar(select(func.count()).select_from(statement.subquery()))  # noqa: E731
+        return {
+            "courses": await count(select(Course.id).where(Course.id == course_id)),
+            "lessons": await count(select(Lesson.id).where(Lesson.course_id == course_id)),
+            "enrollments": await count(select(Enrollment.id).where(Enrollment.course_id == course_id)),
+            "progress": await count(
+                select(LessonProgress.id).join(Enrollment).where(Enrollment.course_id == course_id)
+            ),
+        }
+
+
+async def test_deleted_course_disappears_before_it_is_purged(api: httpx.AsyncClient, course: dict) -> None:
+    await soft_delete(course["id"])
+
+    assert (await api.get(f"/courses/{course['id']}")).status_code == 404
+    assert (await api.get(f"/lessons/course/{course['id']}")).json() == []
+    assert (await api.get(f"/lessons/{course['lesson_id']}")).status_code == 404
+    progress = {"lesson_id": course["lesson_id"], "is_completed": True}
+    url = f"/enrollments/{course['enrollment_id']}/progress"
+    response = await api.post(url, json=progress, headers=course["student"])
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Course not found"
+
+
+async def test_purge_removes_the_course_in_small_batches(course: dict) -> None:
+    await soft_delete(course["id"])
+
+    async with AsyncSessionLocal() as session:
+        deleted = await purge_course(session, course["id"], batch_size=1)
+
+    assert deleted == 5  # progress, enrollment, two lessons, course
+    assert set((await remaining_rows(course["id"])).values()) == {0}
+
+
+async def test_purge_leaves_live_courses_alone(course: dict) -> None:
+    async with AsyncSessionLocal() as session:
+        await purge_course(session, course["id"])
+
+    assert await remaining_rows(course["id"]) == {"courses": 1, "lessons": 0, "enrollments": 0, "progress": 0}
+
+
+async def test_sweep_waits_for_the_worker_holding_the_lock(course: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(course_purge.settings, "course_purge_interval_seconds", 0.01)
+    await soft_delete(course["id"])
+
+    async with engine.connect() as other_worker:
+        assert await other_worker.scalar(select(func.pg_try_advisory_lock(SWEEP_LOCK_KEY)))
+        sweep = asyncio.create_task(sweep_periodically())
+        try:
+            await asyncio.sleep(0.2)
+            assert (await remaining_rows(course["id"]))["courses"] == 1
+
+            await other_worker.scalar(select(func.pg_advisory_unlock(SWEEP_LOCK_KEY)))
+            for _ in range(100):
+                if (await remaining_rows(course["id"]))["courses"] == 0:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            sweep.cancel()
+
+    assert set((await remaining_rows(course["id"])).values()) == {0}
@@ -0,0 +1,134 @@
+"""Request deadlines in ``DeadlineMiddleware`` and the statement timeouts they set."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core import deadlines
+from app.core.admission import RouteClass
+from app.core.config import get_settings
+from app.core.deadlines import DeadlineMiddleware, remaining, route_timeout
+
+
+pytestmark = pytest.mark.anyio
+
+API = get_settings().api_v1_prefix
+
+
+def test_route_timeouts_prefer_the_route_template_over_the_class() -> None:
+    export = f"{API}/enrollments/course/0b6f6c1e-56d8-4b8e-9d3e-2a1f0f8b6f11/export"
+
+    assert route_timeout("GET", export, RouteClass.ANALYTICS) == 600.0
+    assert route_timeout("GET", f"{API}/courses", RouteClass.READ) == deadlines.DEFAULT_TIMEOUTS["read"]
+    assert route_timeout("POST", f"{API}/courses", RouteClass.WRITE) == deadlines.DEFAULT_TIMEOUTS["write"]
+
+
+async def report_remaining(request: Request) -> JSONResponse:
+    """Report the time left; ``?sleep=`` makes the request overrun."""
+
+    await asyncio.sleep(float(request.query_params.get("sleep", 0)))
+    return JSONResponse({"remaining": remaining()})
+
+
+@pytest.fixture
+async def client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(deadlines.settings, "request_deadline_grace_seconds", 0.05)
+    app = Starlette(routes=[Route(f"{API}/courses", report_remaining), Route("/healthz", report_remaining)])
+    transport = httpx.ASGITransport(app=DeadlineMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_requests_know_their_remaining_time(client: httpx.AsyncClient) -> None:
+    left = (await client.get(f"{API}/courses")).json()["remaining"]
+
+    assert deadlines.DEFAULT_TIMEOUTS["read"] - 1 < left <= deadlines.DEFAULT_TIMEOUTS["read"]
+    assert (await client.get("/healthz")).json()["remaining"] is None
+
+
+async def test_clients_can_shorten_the_deadline_but_not_extend_it(client: httpx.AsyncClient) -> None:
+    shorter = (await client.get(f"{API}/courses", headers={"X-Request-Timeout": "0.5"})).json()["remaining"]
+    longer = (await client.get(f"{API}/courses", headers={"X-Request-Timeout": "3600"})).json()["remaining"]
+    invalid = (await client.get(f"{API}/courses", headers={"X-Request-Timeout": "soon"})).json()["remaining"]
+
+    assert 0 < shorter <= 0.5
+    assert longer <= deadlines.DEFAULT_TIMEOUTS["read"]
+    assert invalid > 0.5
+
+
+async def test_expired_deadline_answers_503_with_retry_after(client: httpx.AsyncClient) -> None:
+    started = time.perf_counter()
+    response = await client.get(f"{API}/courses?sleep=5", headers={"X-Request-Timeout": "0.1"})
+
+    assert time.perf_counter() - started < 1
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Request deadline exceeded, please retry"}
+    assert response.headers["Retry-After"] == str(get_settings().admission_retry_after_seconds)
+
+
+async def test_deadlines_can_be_disabled(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(deadlines.settings, "request_deadlines_enabled", False)
+
+    response = await client.get(f"{API}/courses?sleep=0.2", headers={"X-Request-Timeout": "0.1"})
+
+    assert response.json() == {"remaining": None}
+
+
+@pytest.fixture
+async def db_client(monkeypatch: pytest.MonkeyPatch):
+    from app.db.session import engine, get_session
+    from app.main import database_exception_handler
+
+    monkeypatch.setattr(deadlines.settings, "request_deadline_grace_seconds", 5.0)
+    app = FastAPI()
+    app.add_exception_handler(DBAPIError, database_exception_handler)
+
+    @app.get(f"{API}/courses/timeouts")
+    async def timeouts(session: AsyncSession = Depends(get_session)) -> list[int]:
+        """``statement_timeout`` in milliseconds in two transactions, one after the other."""
+
+        shown = []
+        for _ in range(2):
+            shown.append(int((await session.execute(text("SHOW statement_timeout"))).scalar().removesuffix("ms")))
+            await session.commit()
+            await asyncio.sleep(0.05)
+        return shown
+
+    @app.get(f"{API}/courses/slow")
+    async def slow(session: AsyncSession = Depends(get_session)) -> None:
+        await session.execute(text("SELECT pg_sleep(5)"))
+
+    transport = httpx.ASGITransport(app=DeadlineMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await engine.dispose()
+
+
+@pytest.mark.database
+async def test_each_transaction_gets_the_time_left_as_statement_timeout(db_client: httpx.AsyncClient) -> None:
+    first, second = (await db_client.get(f"{API}/courses/timeouts", headers={"X-Request-Timeout": "2"})).json()
+
+    assert 1500 < first <= 2000
+    assert 0 < second <= first - 50
+
+
+@pytest.mark.database
+async def test_statement_past_the_deadline_is_cancelled_with_503(db_client: httpx.AsyncClient) -> None:
+    started = time.perf_counter()
+    response = await db_client.get(f"{API}/courses/slow", headers={"X-Request-Timeout": "0.2"})
+
+    assert time.perf_counter() - started < 2
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Request deadline exceeded, please retry"}
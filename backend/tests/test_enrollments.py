@@ -0,0 +1,92 @@
+"""Enrolling in a course: idempotent repeats, closed courses and cohorts."""
+
+from __future__ import annotations
+
+import uuid
+
+import httpx
+import pytest
+
+from app.models import UserRole
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.database]
+
+COURSE = {"title": "Enrollment course", "description": "A course to enroll in.", "category": "testing"}
+
+
+@pytest.fixture
+async def course(api: httpx.AsyncClient, make_user) -> tuple[str, dict[str, str]]:
+    _, instructor = await make_user(UserRole.INSTRUCTOR)
+    response = await api.post("/courses", json={**COURSE, "status": "published"}, headers=instructor)
+    assert response.status_code == 201
+    return response.json()["id"], instructor
+
+
+async def test_repeated_enrollment_returns_the_existing_one(api: httpx.AsyncClient, make_user, course) -> None:
+    course_id, _ = course
+    _, student = await make_user()
+
+    first = await api.post("/enrollments", json={"course_id": course_id}, headers=student)
+    again = await api.post("/enrollments", json={"course_id": course_id}, headers=student)
+
+    assert first.status_code == 201
+    assert again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+
+
+async def test_enrolled_student_can_repeat_after_the_course_is_unpublished(
+    api: httpx.AsyncClient, make_user, course
+) -> None:
+    course_id, instructor = course
+    _, student = await make_user()
+    _, newcomer = await make_user()
+    enrolled = await api.post("/enrollments", json={"course_id": course_id}, headers=student)
+
+    unpublished = await api.put(f"/courses/{course_id}", json={"status": "draft"}, headers=instructor)
+    assert unpublished.status_code == 200
+
+    again = await api.post("/enrollments", json={"course_id": course_id}, headers=student)
+    assert again.status_code == 200
+    assert again.json()["id"] == enrolled.json()["id"]
+    assert (await api.post("/enrollments", json={"course_id": course_id}, headers=newcomer)).status_code == 400
+
+
+
+async def test_cohort_enrollment_creates_each_enrollment_once(api: httpx.AsyncClient, make_user, course) -> None:
+    course_id, instructor = course
+    first, _ = await make_user()
+    second, _ = await make_user()
+    colleague, _ = await make_user(UserRole.INSTRUCTOR)
+    missing_id, missing_email = uuid.uuid4(), "nobody-here@example.com"
+    cohort = {
+        "student_ids": [str(first.id), str(missing_id)],
+        "student_emails": [second.email.upper(), colleague.email, missing_email],
+    }
+
+    result = await api.post(f"/enrollments/course/{course_id}/bulk", json=cohort, headers=instructor)
+    again = await api.post(f"/enrollments/course/{course_id}/bulk", json=cohort, headers=instructor)
+
+    assert result.status_code == 200
+    body = result.json()
+    assert (body["requested"], body["created"], body["skipped"]) == (5, 2, 1)
+    assert sorted(body["not_found"]) == sorted([str(missing_id), missing_email])
+    assert body["not_students"] == [colleague.email]
+    assert (again.json()["created"], again.json()["skipped"]) == (0, 3)
+    roster = await api.get(f"/enrollments/course/{course_id}", headers=instructor)
+    assert {row["student_id"] for row in roster.json()} == {str(first.id), str(second.id)}
+
+
+async def test_cohort_enrollment_is_limited_to_the_course_owner(api: httpx.AsyncClient, make_user, course) -> None:
+    course_id, _ = course
+    _, other_instructor = await make_user(UserRole.INSTRUCTOR)
+    student, _ = await make_user()
+    cohort = {"student_ids": [str(student.id)]}
+
+    async def bulk(course_id, payload) -> int:
+        response = await api.post(f"/enrollments/course/{course_id}/bulk", json=payload, headers=other_instructor)
+        return response.status_code
+
+    assert await bulk(course_id, cohort) == 403
+    assert await bulk(uuid.uuid4(), cohort) == 404
+    assert await bulk(course_id, {}) == 422
@@ -0,0 +1,115 @@
+"""The streamed course roster export, rendered from fake rows and end to end."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.api.routes import enrollments
+from app.models import EnrollmentStatus, UserRole
+
+
+pytestmark = pytest.mark.anyio
+
+LESSONS = [SimpleNamespace(id=uuid.uuid4(), title=f"Lesson {position}", position=position) for position in (1, 2)]
+
+
+def roster_row(number: int, completed: list[uuid.UUID] | None) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        student_id=uuid.uuid4(),
+        full_name=f"Student {number}",
+        email=f"student{number}@example.com",
+        status=EnrollmentStatus.ACTIVE,
+        progress_percent=50.0,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        completed_lesson_ids=completed,
+    )
+
+
+@pytest.fixture
+def rows(monkeypatch: pytest.MonkeyPatch) -> list[SimpleNamespace]:
+    rows = [roster_row(number, [LESSONS[0].id] if number % 2 else None) for number in range(5)]
+
+    async def iter_rows(course_id: uuid.UUID):
+        for row in rows:
+            yield row
+
+    monkeypatch.setattr(enrollments, "_iter_export_rows", iter_rows)
+    monkeypatch.setattr(enrollments, "EXPORT_BATCH_SIZE", 2)
+    return rows
+
+
+async def collect(chunks) -> list[str]:
+    return [chunk async for chunk in chunks]
+
+
+async def test_csv_has_one_column_per_lesson_and_streams_in_batches(rows: list[SimpleNamespace]) -> None:
+    chunks = await collect(enrollments._export_csv(uuid.uuid4(), LESSONS))
+
+    assert len(chunks) == 3
+    records = list(csv.reader(io.StringIO("".join(chunks))))
+    assert records[0][-2:] == ["lesson_1: Lesson 1", "lesson_2: Lesson 2"]
+    assert len(records) == 1 + len(rows)
+    student = rows[1]
+    assert records[2][:4] == [str(student.id), str(student.student_id), "Student 1", "student1@example.com"]
+    assert records[2][4:] == ["active", "50.0", "2026-01-01T00:00:00+00:00", "1", "0"]
+    assert records[1][-2:] == ["0", "0"]
+
+
+async def test_ndjson_has_one_object_per_enrollment(rows: list[SimpleNamespace]) -> None:
+    chunks = await collect(enrollments._export_ndjson(uuid.uuid4(), LESSONS))
+
+    assert len(chunks) == 3
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [record["student_name"] for record in records] == [f"Student {number}" for number in range(5)]
+    assert records[1]["lessons"] == [
+        {"lesson_id": str(LESSONS[0].id), "position": 1, "is_completed": True},
+        {"lesson_id": str(LESSONS[1].id), "position": 2, "is_completed": False},
+    ]
+
+
+async def test_empty_course_exports_the_csv_header_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def no_rows(course_id: uuid.UUID):
+        return
+        yield
+
+    monkeypatch.setattr(enrollments, "_iter_export_rows", no_rows)
+
+    header = "".join(await collect(enrollments._export_csv(uuid.uuid4(), [])))
+
+    assert header.splitlines() == ["enrollment_id,student_id,student_name,student_email,status,progress_percent,enrolled_at"]
+    assert await collect(enrollments._export_ndjson(uuid.uuid4(), LESSONS)) == []
+
+
+@pytest.mark.database
+async def test_export_streams_the_roster_to_the_instructor(api: httpx.AsyncClient, make_user) -> None:
+    _, instructor = await make_user(UserRole.INSTRUCTOR)
+    _, stranger = await make_user(UserRole.INSTRUCTOR)
+    student, student_headers = await make_user()
+    course = {"title": "Export course", "description": "A course to export.", "category": "testing", "status": "published"}
+    course_id = (await api.post("/courses", json=course, headers=instructor)).json()["id"]
+    lesson = {"course_id": course_id, "title": "Only lesson", "content": "Text"}
+    lesson_id = (await api.post("/lessons", json=lesson, headers=instructor)).json()["id"]
+    enrollment_id = (await api.post("/enrollments", json={"course_id": course_id}, headers=student_headers)).json()["id"]
+    progress = {"lesson_id": lesson_id, "is_completed": True}
+    await api.post(f"/enrollments/{enrollment_id}/progress", json=progress, headers=student_headers)
+    url = f"/enrollments/course/{course_id}/export"
+
+    response = await api.get(url, params={"format": "ndjson"}, headers=instructor)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == f'attachment; filename="course-{course_id}-enrollments.ndjson"'
+    [record] = [json.loads(line) for line in response.text.splitlines()]
+    assert (record["student_id"], record["status"], record["progress_percent"]) == (str(student.id), "completed", 100.0)
+    assert record["lessons"] == [{"lesson_id": lesson_id, "position": 0, "is_completed": True}]
+    assert (await api.get(url, headers=stranger)).status_code == 403
+    assert (await api.get(f"/enrollments/course/{uuid.uuid4()}/export", headers=instructor)).status_code == 404
@@ -0,0 +1,86 @@
+"""ETags, conditional GETs and the trigger-maintained catalog version."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from app.core.http_cache import etag_matches, make_etag, not_modified
+from app.models import UserRole
+
+
+pytestmark = pytest.mark.anyio
+
+
+def request(if_none_match: str | None = None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etags_are_strong_and_follow_the_version() -> None:
+    etag = make_etag((3, "2026-01-01"), "outline")
+
+    assert etag.startswith('"') and etag.endswith('"') and len(etag) == 34
+    assert make_etag((3, "2026-01-01"), "outline") == etag
+    assert make_etag((4, "2026-01-01"), "outline") != etag
+    assert make_etag((3, "2026-01-01"), "full") != etag
+
+
+@pytest.mark.parametrize(
+    ("header", "matches"),
+    [(None, False), ('"v1"', True), ('"v0", "v1"', True), ('W/"v1"', True), ("*", True), ('"v2"', False)],
+)
+def test_if_none_match_uses_weak_comparison(header: str | None, matches: bool) -> None:
+    assert etag_matches(request(header), '"v1"') is matches
+
+
+def test_not_modified_has_no_body_but_keeps_the_validators() -> None:
+    response = not_modified('"v1"', "public, no-cache")
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert (response.headers["ETag"], response.headers["Cache-Control"]) == ('"v1"', "public, no-cache")
+
+
+@pytest.mark.database
+async def test_catalog_version_is_bumped_by_course_and_enrollment_writes(api: httpx.AsyncClient, make_user) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.services.read_models import catalog_version
+
+    async def version() -> int:
+        async with AsyncSessionLocal() as session:
+            return (await catalog_version(session))[0]
+
+    _, instructor = await make_user(UserRole.INSTRUCTOR)
+    _, student = await make_user()
+    before = await version()
+    course = {"title": "Versioned course", "description": "Bumps the catalog.", "category": "testing"}
+    course_id = (await api.post("/courses", json={**course, "status": "published"}, headers=instructor)).json()["id"]
+    created = await version()
+    await api.put(f"/courses/{course_id}", json={"title": "Renamed versioned course"}, headers=instructor)
+    renamed = await version()
+    await api.post("/enrollments", json={"course_id": course_id}, headers=student)
+    enrolled = await version()
+
+    assert before < created < renamed < enrolled
+
+
+@pytest.mark.database
+async def test_unchanged_resources_answer_304(api: httpx.AsyncClient, make_user) -> None:
+    _, instructor = await make_user(UserRole.INSTRUCTOR)
+    course = {"title": "Cached course", "description": "Answered with 304.", "category": "testing"}
+    course_id = (await api.post("/courses", json={**course, "status": "published"}, headers=instructor)).json()["id"]
+
+    for url in ("/courses", f"/courses/{course_id}", f"/lessons/course/{course_id}"):
+        first = await api.get(url)
+        again = await api.get(url, headers={"If-None-Match": first.headers["ETag"]})
+        assert (first.status_code, again.status_code) == (200, 304), url
+        assert again.headers["ETag"] == first.headers["ETag"]
+
+    etag = (await api.get(f"/courses/{course_id}")).headers["ETag"]
+    lesson = {"course_id": course_id, "title": "New lesson", "content": "Text"}
+    await api.post("/lessons", json=lesson, headers=instructor)
+    changed = await api.get(f"/courses/{course_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["lessons"][0]["title"] == "New lesson"
@@ -0,0 +1,124 @@
+"""Replay, conflicts and concurrent duplicates in ``IdempotencyMiddleware``."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware, InMemoryIdempotencyStore
+from app.core.security import create_access_token
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Handler:
+    """Echo the request body with a call counter; ``?status=`` picks the status code."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.gate: asyncio.Event | None = None
+
+    async def endpoint(self, request: Request) -> JSONResponse:
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        status = int(request.query_params.get("status", 201))
+        return JSONResponse({"call": self.calls, "body": (await request.json())}, status_code=status)
+
+
+@pytest.fixture
+def handler() -> Handler:
+    return Handler()
+
+
+@pytest.fixture
+async def client(handler: Handler):
+    store = InMemoryIdempotencyStore(max_entries=100, ttl_seconds=60)
+    app = Starlette(
+        routes=[Route("/items", handler.endpoint, methods=["POST"])],
+        middleware=[Middleware(IdempotencyMiddleware, store=store)],
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_retry_replays_the_stored_response(client: httpx.AsyncClient, handler: Handler) -> None:
+    headers = {"Idempotency-Key": "abc"}
+    first = await client.post("/items", json={"name": "a"}, headers=headers)
+    second = await client.post("/items", json={"name": "a"}, headers=headers)
+
+    assert handler.calls == 1
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert REPLAYED_HEADER not in first.headers
+    assert second.headers[REPLAYED_HEADER] == "true"
+
+
+async def test_requests_without_a_key_always_run(client: httpx.AsyncClient, handler: Handler) -> None:
+    await client.post("/items", json={"name": "a"})
+    await client.post("/items", json={"name": "a"})
+
+    assert handler.calls == 2
+
+
+async def test_keys_are_scoped_to_the_principal(client: httpx.AsyncClient, handler: Handler) -> None:
+    for subject in ("alice", "bob", "alice"):
+        headers = {"Idempotency-Key": "abc", "Authorization": f"Bearer {create_access_token(subject)}"}
+        await client.post("/items", json={"name": "a"}, headers=headers)
+
+    assert handler.calls == 2
+
+
+async def test_reusing_a_key_with_another_body_conflicts(client: httpx.AsyncClient, handler: Handler) -> None:
+    headers = {"Idempotency-Key": "abc"}
+    await client.post("/items", json={"name": "a"}, headers=headers)
+    response = await client.post("/items", json={"name": "b"}, headers=headers)
+
+    assert response.status_code == 422
+    assert handler.calls == 1
+
+
+async def test_concurrent_duplicate_waits_for_the_first(client: httpx.AsyncClient, handler: Handler) -> None:
+    handler.gate = asyncio.Event()
+    headers = {"Idempotency-Key": "abc"}
+    first = asyncio.create_task(client.post("/items", json={"name": "a"}, headers=headers))
+    second = asyncio.create_task(client.post("/items", json={"name": "a"}, headers=headers))
+    while handler.calls == 0:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    handler.gate.set()
+
+    responses = await asyncio.gather(first, second)
+
+    assert handler.calls == 1
+    assert responses[0].json() == responses[1].json()
+    assert sorted(REPLAYED_HEADER in response.headers for response in responses) == [False, True]
+
+
+@pytest.mark.parametrize("status", [500, 503, 408, 409, 429])
+async def test_errors_and_retry_later_responses_are_not_stored(
+    client: httpx.AsyncClient, handler: Handler, status: int
+) -> None:
+    headers = {"Idempotency-Key": "abc"}
+    failed = await client.post(f"/items?status={status}", json={"name": "a"}, headers=headers)
+    retried = await client.post("/items", json={"name": "a"}, headers=headers)
+
+    assert failed.status_code == status
+    assert retried.status_code == 201
+    assert REPLAYED_HEADER not in retried.headers
+    assert handler.calls == 2
+
+
+async def test_oversized_key_is_rejected(client: httpx.AsyncClient, handler: Handler) -> None:
+    response = await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k" * 256})
+
+    assert response.status_code == 400
+    assert handler.calls == 0
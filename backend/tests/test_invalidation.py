@@ -0,0 +1,130 @@
+"""Worker-local caches, invalidation payloads and what the principal cache holds."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import asyncpg
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.services import invalidation
+from app.services.invalidation import LocalCache, listener, principal_cache, user_key
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def connected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(listener, "connected", True)
+
+
+@pytest.fixture
+def cache() -> LocalCache[str]:
+    cache = LocalCache("test", maxsize=2)
+    yield cache
+    invalidation._caches.remove(cache)
+
+
+class Loader:
+    def __init__(self, value: str | None = "value") -> None:
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self) -> str | None:
+        self.calls += 1
+        return self.value
+
+
+async def test_values_are_cached_per_variant_and_evicted_per_key(cache: LocalCache[str], connected) -> None:
+    load = Loader()
+    await cache.get("course:1", "detail", load)
+    await cache.get("course:1", "detail", load)
+    await cache.get("course:1", "lessons", load)
+    assert load.calls == 2
+    assert cache.peek("course:1", "detail") == "value"
+
+    listener.evict({"course:1"})
+
+    assert len(cache) == 0
+    assert cache.peek("course:1", "detail") is None
+
+
+async def test_least_recently_used_entries_are_dropped(cache: LocalCache[str], connected) -> None:
+    for key in ("a", "b", "a", "c"):
+        await cache.get(key, None, Loader(key))
+
+    assert [cache.peek(key, None) for key in "abc"] == ["a", None, "c"]
+
+
+async def test_nothing_is_cached_while_the_listener_is_down(cache: LocalCache[str]) -> None:
+    load = Loader()
+    await cache.get("catalog", None, load)
+    await cache.get("catalog", None, load)
+
+    assert load.calls == 2
+    assert len(cache) == 0
+
+
+async def test_missing_values_are_not_cached(cache: LocalCache[str], connected) -> None:
+    load = Loader(None)
+    await cache.get("user:1", None, load)
+    await cache.get("user:1", None, load)
+
+    assert load.calls == 2
+
+
+async def test_a_load_overtaken_by_an_eviction_is_not_stored(cache: LocalCache[str], connected) -> None:
+    async def slow_load() -> str:
+        listener.evict({"course:1"})  # a write committed while this read ran
+        return "stale"
+
+    assert await cache.get("course:1", None, slow_load) == "stale"
+    assert len(cache) == 0
+
+
+def test_payloads_stay_below_the_notify_limit() -> None:
+    keys = {user_key(uuid.uuid4()) for _ in range(500)}
+
+    payloads = list(invalidation._payloads(keys))
+
+    assert len(payloads) > 1
+    assert all(len(payload) <= invalidation.MAX_PAYLOAD_BYTES for payload in payloads)
+    assert {key for payload in payloads for key in payload.split(",")} == keys
+
+
+@pytest.mark.database
+async def test_principals_hold_only_what_authorization_needs(api: httpx.AsyncClient, make_user, connected) -> None:
+    user, headers = await make_user(bio="Hello")
+
+    profile = await api.get("/users/me", headers=headers)
+
+    assert profile.json()["bio"] == "Hello"
+    assert dict(principal_cache.peek(user_key(user.id), None)) == {"id": user.id, "role": user.role}
+    principal_cache.evict({user_key(user.id)})
+
+
+@pytest.mark.database
+async def test_any_orm_change_to_a_user_is_published(make_user, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.db.session import AsyncSessionLocal, asyncpg_dsn
+    from app.models import User, UserRole
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "invalidation_enabled", True)
+    user, _ = await make_user()
+    received: asyncio.Queue[str] = asyncio.Queue()
+    connection = await asyncpg.connect(asyncpg_dsn())
+    try:
+        await connection.add_listener(settings.invalidation_channel, lambda *args: received.put_nowait(args[-1]))
+        async with AsyncSessionLocal() as session:
+            stored = await session.get(User, user.id)
+            stored.role = UserRole.INSTRUCTOR
+            stored.hashed_password = "!!"
+            await session.commit()
+
+        assert await asyncio.wait_for(received.get(), 5) == user_key(user.id)
+    finally:
+        await connection.close()
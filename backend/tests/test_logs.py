@@ -0,0 +1,156 @@
+"""Redaction, truncation, sampling, the non-blocking queue and request ids in logs."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import sys
+
+import httpx
+import orjson
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core import logs
+from app.core.logs import (
+    REDACTED,
+    REQUEST_ID_HEADER,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RequestContextFilter,
+    RequestContextMiddleware,
+    SamplingFilter,
+    redact,
+    redact_text,
+    truncate,
+)
+
+
+class Clock:
+    """Stands in for the ``time`` module in ``app.core.logs``."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+def make_record(msg: str = "hello", level: int = logging.WARNING, lineno: int = 10, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", level, "/app/test.py", lineno, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_redact_replaces_sensitive_values_recursively() -> None:
+    payload = {
+        "email": "a@example.com",
+        "Password": "hunter2",
+        "nested": [{"access_token": "abc", "name": "x"}],
+        "headers": {"Authorization": "Bearer abc", "accept": "json"},
+    }
+
+    assert redact(payload) == {
+        "email": "a@example.com",
+        "Password": REDACTED,
+        "nested": [{"access_token": REDACTED, "name": "x"}],
+        "headers": {"Authorization": REDACTED, "accept": "json"},
+    }
+
+
+def test_redact_text_handles_cut_off_json() -> None:
+    text = '{"email": "a@example.com", "new_password": "hun\\"ter2", "api_key": 12345, "secret": "abc'
+
+    redacted = redact_text(text)
+
+    assert "hunter2" not in redacted and "ter2" not in redacted
+    assert "12345" not in redacted and "abc" not in redacted
+    assert '"email": "a@example.com"' in redacted
+    assert redacted.count(REDACTED) == 3
+
+
+def test_truncate_notes_how_much_was_cut() -> None:
+    assert truncate("short", 10) == "short"
+    assert truncate("x" * 25, 10) == "x" * 10 + "... [15 more chars]"
+
+
+def test_sampling_suppresses_a_site_until_the_window_ends(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = Clock()
+    monkeypatch.setattr(logs, "time", clock)
+    sampler = SamplingFilter(burst=3, window=60)
+
+    passed = [sampler.filter(make_record()) for _ in range(5)]
+    other_site = sampler.filter(make_record(lineno=11))
+    info = [sampler.filter(make_record(level=logging.INFO)) for _ in range(5)]
+    clock.now += 60
+    after_window = make_record()
+
+    assert passed == [True, True, True, False, False]
+    assert other_site is True
+    assert info == [True] * 5
+    assert sampler.filter(after_window) is True
+    assert after_window.suppressed == 2
+
+
+def test_full_queue_drops_records_and_reports_the_count() -> None:
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    for n in range(3):
+        handler.emit(make_record(f"message {n}"))
+    handler.queue.get_nowait()
+    handler.emit(make_record("after"))
+
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "after"
+    assert record.dropped == 2
+    assert handler.dropped == 0
+
+
+def test_prepared_records_are_rendered_truncated_and_redacted(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(logs.get_settings(), "log_max_message_chars", 20)
+    handler = NonBlockingQueueHandler(queue.Queue())
+    record = make_record("%s", user={"email": "a@example.com", "password": "x"}, token="abc")
+    record.args = ("y" * 50,)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record.exc_info = sys.exc_info()
+
+    prepared = handler.prepare(record)
+    line = orjson.loads(JsonFormatter().format(prepared))
+
+    assert line["message"] == "y" * 20 + "... [30 more chars]"
+    assert line["user"] == {"email": "a@example.com", "password": REDACTED}
+    assert line["token"] == REDACTED
+    assert "ValueError: boom" in line["exception"]
+    assert prepared.exc_info is None
+
+
+async def endpoint(request: Request) -> JSONResponse:
+    record = make_record(level=logging.INFO)
+    RequestContextFilter().filter(record)
+    return JSONResponse({"request_id": record.request_id, "method": record.method, "path": record.path})
+
+
+@pytest.fixture
+async def client():
+    app = RequestContextMiddleware(Starlette(routes=[Route("/items", endpoint, methods=["GET", "POST"])]))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_request_id_reaches_records_and_the_response(client: httpx.AsyncClient) -> None:
+    given = await client.post("/items", headers={REQUEST_ID_HEADER: "abc-123"})
+    generated = await client.get("/items", headers={REQUEST_ID_HEADER: "not valid!"})
+
+    assert given.headers[REQUEST_ID_HEADER] == "abc-123"
+    assert given.json() == {"request_id": "abc-123", "method": "POST", "path": "/items"}
+    assert generated.headers[REQUEST_ID_HEADER] == generated.json()["request_id"] != "not valid!"
+    assert logs.current_request_id() is None
@@ -0,0 +1,151 @@
+"""Memory tracing, snapshots and object counts from ``app.core.memory`` and the debug routes."""
+
+from __future__ import annotations
+
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.routes import debug
+from app.core import memory
+from app.core.config import get_settings
+from app.core.dependencies import get_user_from_token
+from app.models import Course, User, UserRole
+
+
+API = get_settings().api_v1_prefix
+
+
+@pytest.fixture(autouse=True)
+def tracing():
+    """Leave tracing off and no snapshots behind, whatever the test did."""
+
+    memory.stop_tracing()
+    yield
+    memory.stop_tracing()
+
+
+def allocate(count: int) -> list[bytes]:
+    return [bytes(1000) for _ in range(count)]
+
+
+def test_snapshots_need_tracing_and_report_allocation_sites() -> None:
+    assert not memory.is_tracing()
+    assert memory.traced_memory() == (0, 0)
+
+    memory.start_tracing()
+    older = memory.take_snapshot()
+    kept = allocate(200)
+    newer = memory.take_snapshot()
+
+    assert memory.is_tracing()
+    assert [entry.id for entry in memory.list_snapshots()] == [older.id, newer.id]
+    assert memory.get_snapshot(newer.id) is newer
+    assert newer.traced_bytes - older.traced_bytes >= 200 * 1000
+
+    site = f"{__file__}:{allocate.__code__.co_firstlineno + 1}"
+    assert site in [stat.location for stat in memory.top_allocations(newer, limit=10)]
+    [grown] = [stat for stat in memory.compare_snapshots(older, newer, limit=10) if stat.location == site]
+    assert grown.count_diff >= 200
+    assert grown.size_diff_bytes >= 200 * 1000
+    del kept
+
+
+def test_only_the_latest_snapshots_are_kept(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(memory.settings, "memory_max_snapshots", 2)
+    memory.start_tracing()
+
+    taken = [memory.take_snapshot().id for _ in range(3)]
+
+    assert [entry.id for entry in memory.list_snapshots()] == taken[1:]
+    assert memory.get_snapshot(taken[0]) is None
+
+
+def test_stopping_drops_the_snapshots() -> None:
+    memory.start_tracing()
+    entry = memory.take_snapshot()
+
+    memory.stop_tracing()
+
+    assert not memory.is_tracing()
+    assert memory.list_snapshots() == []
+    assert memory.get_snapshot(entry.id) is None
+
+
+def test_object_counts_lists_every_mapped_class() -> None:
+    users = [User(email=f"{n}@example.com", full_name="Counted", hashed_password="!") for n in range(3)]
+
+    counts = memory.object_counts()
+
+    assert set(counts) == {"pid", "gc_objects", "sessions", "identity_map_entries", "orm", "pydantic"}
+    assert counts["orm"]["User"] >= len(users)
+    assert "Course" in counts["orm"]
+    assert counts["gc_objects"] > 0
+
+
+def principal(role: UserRole):
+    async def current_user() -> User:
+        return User(id=uuid.uuid4(), role=role)
+
+    return current_user
+
+
+@pytest.fixture
+def app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(debug.router, prefix=API)
+    app.dependency_overrides[get_user_from_token] = principal(UserRole.ADMIN)
+    return app
+
+
+@pytest.fixture
+async def client(app: FastAPI):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=f"http://test{API}") as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_memory_routes_start_snapshot_compare_and_stop(client: httpx.AsyncClient) -> None:
+    assert (await client.post("/debug/memory/snapshots")).status_code == 409
+
+    started = await client.post("/debug/memory/tracing", params={"frames": 2})
+    first = await client.post("/debug/memory/snapshots", params={"limit": 5})
+    second = await client.post("/debug/memory/snapshots", params={"limit": 5})
+    first_id, second_id = first.json()["snapshot"]["id"], second.json()["snapshot"]["id"]
+
+    assert started.json()["tracing"] is True
+    assert first.status_code == second.status_code == 201
+    assert len(second.json()["top"]) <= 5
+    report = await client.get(f"/debug/memory/snapshots/{first_id}")
+    assert report.json()["snapshot"] == first.json()["snapshot"]
+    comparison = await client.get(f"/debug/memory/snapshots/{first_id}/compare/{second_id}")
+    assert comparison.status_code == 200
+    assert (comparison.json()["older"]["id"], comparison.json()["newer"]["id"]) == (first_id, second_id)
+    status = await client.get("/debug/memory")
+    assert [entry["id"] for entry in status.json()["snapshots"]] == [first_id, second_id]
+
+    stopped = await client.delete("/debug/memory/tracing")
+
+    assert (stopped.json()["tracing"], stopped.json()["snapshots"]) == (False, [])
+    assert (await client.get(f"/debug/memory/snapshots/{first_id}")).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_object_counts_route(client: httpx.AsyncClient) -> None:
+    course = Course(title="Counted", description="Kept alive for the count.")
+
+    response = await client.get("/debug/memory/objects")
+
+    assert response.status_code == 200
+    assert response.json()["orm"]["Course"] >= 1
+    del course
+
+
+@pytest.mark.anyio
+async def test_memory_routes_are_for_admins_only(app: FastAPI, client: httpx.AsyncClient) -> None:
+    app.dependency_overrides[get_user_from_token] = principal(UserRole.INSTRUCTOR)
+
+    assert (await client.post("/debug/memory/tracing")).status_code == 403
+    assert not memory.is_tracing()
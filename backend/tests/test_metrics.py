@@ -0,0 +1,79 @@
+"""Route-template labels in ``MetricsMiddleware`` and the ``/metrics`` output."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from prometheus_client import REGISTRY
+
+from app.core.metrics import UNMATCHED_ROUTE, MetricsMiddleware, metrics_response, record_cache
+
+
+pytestmark = pytest.mark.anyio
+
+router = APIRouter(prefix="/items")
+
+
+@router.get("/{item_id}")
+async def read_item(item_id: str) -> dict[str, str]:
+    return {"id": item_id}
+
+
+@router.get("/{item_id}/fail")
+async def fail(item_id: str) -> None:
+    raise RuntimeError("boom")
+
+
+def requests_total(method: str, route: str, status: str) -> float:
+    labels = {"method": method, "route": route, "status": status}
+    return REGISTRY.get_sample_value("http_requests_total", labels) or 0.0
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.include_router(router, prefix="/api/test")
+    transport = httpx.ASGITransport(app=MetricsMiddleware(app), raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_requests_are_labelled_with_the_route_template(client: httpx.AsyncClient) -> None:
+    template = "/api/test/items/{item_id}"
+
+    def observed() -> float:
+        labels = {"method": "GET", "route": template}
+        return REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0.0
+
+    before, durations = requests_total("GET", template, "200"), observed()
+
+    for item_id in ("1", "2", "3"):
+        assert (await client.get(f"/api/test/items/{item_id}")).status_code == 200
+
+    assert requests_total("GET", template, "200") == before + 3
+    assert observed() == durations + 3
+    assert requests_total("GET", "/api/test/items/1", "200") == 0
+
+
+async def test_unmatched_paths_and_errors_are_counted(client: httpx.AsyncClient) -> None:
+    unmatched = requests_total("GET", UNMATCHED_ROUTE, "404")
+    failed = requests_total("GET", "/api/test/items/{item_id}/fail", "500")
+
+    await client.get("/no/such/path")
+    await client.get("/api/test/items/1/fail")
+
+    assert requests_total("GET", UNMATCHED_ROUTE, "404") == unmatched + 1
+    assert requests_total("GET", "/api/test/items/{item_id}/fail", "500") == failed + 1
+    assert REGISTRY.get_sample_value("http_requests_in_progress", {"method": "GET"}) == 0
+
+
+def test_scrape_includes_pool_gauges_and_cache_counters() -> None:
+    record_cache("test_cache", True)
+
+    response = metrics_response()
+
+    body = response.body.decode()
+    assert response.media_type.startswith("text/plain")
+    assert "db_pool_size " in body
+    assert 'cache_requests_total{cache="test_cache",result="hit"}' in body
@@ -0,0 +1,77 @@
+"""Ownership-checked course and lesson writes: 404 for missing, 403 for someone else's."""
+
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.models import UserRole
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.database]
+
+COURSE = {"title": "Owned course", "description": "Owned by one instructor.", "category": "testing"}
+
+
+@pytest.fixture
+async def owned(api: httpx.AsyncClient, make_user) -> dict:
+    _, owner = await make_user(UserRole.INSTRUCTOR)
+    _, other = await make_user(UserRole.INSTRUCTOR)
+    _, admin = await make_user(UserRole.ADMIN)
+    course_id = (await api.post("/courses", json=COURSE, headers=owner)).json()["id"]
+    lesson = {"course_id": course_id, "title": "Owned lesson", "content": "Text"}
+    lesson_id = (await api.post("/lessons", json=lesson, headers=owner)).json()["id"]
+    return {"course": course_id, "lesson": lesson_id, "owner": owner, "other": other, "admin": admin}
+
+
+async def test_course_updates_are_checked_in_the_update(api: httpx.AsyncClient, owned: dict) -> None:
+    url = f"/courses/{owned['course']}"
+
+    assert (await api.put(url, json={"title": "Taken over"}, headers=owned["other"])).status_code == 403
+    missing = await api.put(f"/courses/{uuid.uuid4()}", json={"title": "Nothing"}, headers=owned["owner"])
+    assert missing.status_code == 404
+    updated = await api.put(url, json={"title": "Renamed course"}, headers=owned["owner"])
+    assert (updated.status_code, updated.json()["title"]) == (200, "Renamed course")
+    unchanged = await api.put(url, json={}, headers=owned["owner"])
+    assert unchanged.json()["title"] == "Renamed course"
+    assert (await api.put(url, json={"title": "By the admin"}, headers=owned["admin"])).status_code == 200
+
+
+async def test_lesson_writes_are_checked_against_the_course_owner(api: httpx.AsyncClient, owned: dict) -> None:
+    url = f"/lessons/{owned['lesson']}"
+
+    assert (await api.put(url, json={"title": "Taken over"}, headers=owned["other"])).status_code == 403
+    assert (await api.delete(url, headers=owned["other"])).status_code == 403
+    missing = await api.put(f"/lessons/{uuid.uuid4()}", json={"title": "Nothing"}, headers=owned["owner"])
+    assert missing.status_code == 404
+    updated = await api.put(url, json={"title": "Renamed lesson"}, headers=owned["owner"])
+    assert (updated.status_code, updated.json()["title"]) == (200, "Renamed lesson")
+    assert (await api.delete(url, headers=owned["owner"])).status_code == 204
+    assert (await api.delete(url, headers=owned["owner"])).status_code == 404
+
+
+async def test_lessons_of_a_deleted_course_are_missing(api: httpx.AsyncClient, owned: dict) -> None:
+    assert (await api.delete(f"/courses/{owned['course']}", headers=owned["owner"])).status_code == 204
+
+    for url in (f"/lessons/{owned['lesson']}", f"/courses/{owned['course']}"):
+        assert (await api.put(url, json={"title": "Too late"}, headers=owned["owner"])).status_code == 404
+    assert (await api.delete(f"/courses/{owned['course']}", headers=owned["owner"])).status_code == 404
+
+
+async def test_thumbnail_is_published_only_after_the_checked_update(
+    api: httpx.AsyncClient, owned: dict, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    url = f"/courses/{owned['course']}/thumbnail"
+    upload = {"file": ("cover.png", b"png bytes", "image/png")}
+
+    refused = await api.post(url, files=upload, headers=owned["other"])
+    assert refused.status_code == 403
+    assert list((tmp_path / "media/thumbnails").iterdir()) == []
+
+    accepted = await api.post(url, files=upload, headers=owned["owner"])
+    assert accepted.json()["thumbnail_url"] == f"/media/thumbnails/{owned['course']}.png"
+    assert [path.name for path in (tmp_path / "media/thumbnails").iterdir()] == [f"{owned['course']}.png"]
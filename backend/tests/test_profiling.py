@@ -0,0 +1,109 @@
+"""Who gets profiled by ``ProfilingMiddleware`` and what a profile holds."""
+
+from __future__ import annotations
+
+import uuid
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core import profiling
+from app.core.profiling import PROFILE_ID_HEADER, ProfileStore, ProfilingMiddleware
+from app.core.security import create_access_token
+from app.models import UserRole
+from app.services import invalidation
+from app.services.invalidation import principal_cache, user_key
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def hello(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("hello")
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> ProfileStore:
+    store = ProfileStore(max_entries=10)
+    monkeypatch.setattr(profiling, "profile_store", store)
+    monkeypatch.setattr(profiling.settings, "profiling_sample_rate", 0.0)
+    return store
+
+
+@pytest.fixture
+async def client(store: ProfileStore):
+    app = Starlette(routes=[Route("/hello", hello)], middleware=[Middleware(ProfilingMiddleware)])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def cached_principal(monkeypatch: pytest.MonkeyPatch):
+    """Put a principal with ``role`` into the principal cache and return its headers."""
+
+    monkeypatch.setattr(invalidation.listener, "connected", True)
+    cached: list[str] = []
+
+    async def cache(role: UserRole) -> dict[str, str]:
+        user_id = uuid.uuid4()
+
+        async def load():
+            return {"id": user_id, "role": role}
+
+        await principal_cache.get(user_key(user_id), None, load)
+        cached.append(user_key(user_id))
+        return {"Authorization": f"Bearer {create_access_token(str(user_id))}", "X-Debug-Profile": "1"}
+
+    yield cache
+    principal_cache.evict(cached)
+
+
+async def test_admin_header_profiles_the_request(client: httpx.AsyncClient, store: ProfileStore, cached_principal) -> None:
+    response = await client.get("/hello", headers=await cached_principal(UserRole.ADMIN))
+
+    profile = store.get(response.headers[PROFILE_ID_HEADER])
+    assert profile is not None
+    assert (profile.trigger, profile.method, profile.path, profile.status) == ("header", "GET", "/hello", 200)
+
+
+async def test_header_of_other_users_is_ignored(client: httpx.AsyncClient, store: ProfileStore, cached_principal) -> None:
+    student = await cached_principal(UserRole.STUDENT)
+    unknown = {"Authorization": f"Bearer {create_access_token(str(uuid.uuid4()))}", "X-Debug-Profile": "1"}
+
+    for headers in (student, unknown, {"X-Debug-Profile": "1"}, {"Authorization": "Bearer junk", "X-Debug-Profile": "1"}):
+        response = await client.get("/hello", headers=headers)
+        assert response.status_code == 200
+        assert PROFILE_ID_HEADER not in response.headers
+
+    assert store.recent() == []
+
+
+async def test_sampled_requests_are_profiled(
+    client: httpx.AsyncClient, store: ProfileStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(profiling.settings, "profiling_sample_rate", 1.0)
+
+    response = await client.get("/hello")
+
+    assert store.get(response.headers[PROFILE_ID_HEADER]).trigger == "sampled"
+
+
+def test_store_keeps_the_most_recent_profiles() -> None:
+    store = ProfileStore(max_entries=2)
+    for name in "abc":
+        store.add(profiling.RequestProfile(id=name, method="GET", path="/", trigger="sampled", started_at=None))
+
+    assert [profile.id for profile in store.recent()] == ["c", "b"]
+    assert store.get("a") is None
+
+
+def test_collapsed_stacks_are_folded_most_common_first() -> None:
+    profile = profiling.RequestProfile(id="a", method="GET", path="/", trigger="sampled", started_at=None)
+    profile.samples.update({"main;handler": 1, "main;handler;query": 3})
+
+    assert profile.collapsed() == "main;handler;query 3\nmain;handler 1"
@@ -0,0 +1,46 @@
+"""Query plans of the hot routes against ``benchmarks/query_plans.json``.
+
+The snapshot was recorded on the dataset of ``python -m benchmarks.seed
+generate --yes`` with default arguments. The test takes a few minutes and
+``update_progress`` writes to the database, so it only runs with
+``--query-plans``, and is skipped unless the database in ``DATABASE_URL``
+holds exactly that dataset (restore the seed snapshot after other runs).
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import asyncpg
+import pytest
+
+from app.db.session import asyncpg_dsn
+from benchmarks import query_plans
+
+
+# Row counts ``benchmarks.seed generate`` produces with its default arguments.
+SEEDED_COUNTS = {"users": 10_000, "courses": 500, "enrollments": 50_000}
+
+
+async def _seeded() -> bool:
+    try:
+        connection = await asyncpg.connect(asyncpg_dsn(), timeout=5)
+    except (OSError, asyncpg.PostgresError):
+        return False
+    try:
+        for table, count in SEEDED_COUNTS.items():
+            if await connection.fetchval(f"SELECT count(*) FROM {table}") != count:
+                return False
+    except asyncpg.PostgresError:
+        return False
+    finally:
+        await connection.close()
+    return True
+
+
+@pytest.mark.query_plans
+def test_query_plans_match_snapshot(capsys: pytest.CaptureFixture[str]) -> None:
+    if not asyncio.run(_seeded()):
+        pytest.skip("needs the database seeded with python -m benchmarks.seed generate --yes")
+
+    assert query_plans.main([]) == 0, capsys.readouterr().out
@@ -0,0 +1,167 @@
+"""Token buckets, the rate-limit middleware and per-email limits on the auth routes."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.responses import PlainTextResponse
+from starlette.types import Receive, Scope, Send
+
+from app.api.routes import auth
+from app.core import rate_limit
+from app.core.config import get_settings
+from app.core.rate_limit import MemoryBackend, RateLimitMiddleware
+from app.core.security import create_access_token
+from app.db.session import get_session
+
+
+pytestmark = pytest.mark.anyio
+
+API = get_settings().api_v1_prefix
+
+
+class Clock:
+    """Stands in for the ``time`` module in ``app.core.rate_limit``."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def buckets(monkeypatch: pytest.MonkeyPatch) -> MemoryBackend:
+    backend = MemoryBackend()
+    monkeypatch.setattr(rate_limit, "backend", backend)
+    monkeypatch.setattr(get_settings(), "rate_limit_enabled", True)
+    return backend
+
+
+async def test_bucket_allows_a_burst_then_refills(clock: Clock) -> None:
+    backend = MemoryBackend()
+
+    assert [await backend.take("key", rate=1.0, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert await backend.take("key", rate=1.0, burst=3) == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert await backend.take("key", rate=1.0, burst=3) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert await backend.take("key", rate=1.0, burst=3) == 0.0
+
+
+async def test_refill_is_capped_at_the_burst(clock: Clock) -> None:
+    backend = MemoryBackend()
+    await backend.take("key", rate=1.0, burst=2)
+
+    clock.now += 3600
+    assert [await backend.take("key", rate=1.0, burst=2) for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+
+async def test_least_recently_used_keys_are_forgotten(clock: Clock) -> None:
+    backend = MemoryBackend(max_keys=2)
+    await backend.take("a", rate=1.0, burst=1)
+    assert await backend.take("a", rate=1.0, burst=1) > 0
+
+    await backend.take("b", rate=1.0, burst=1)
+    await backend.take("c", rate=1.0, burst=1)
+
+    assert await backend.take("a", rate=1.0, burst=1) == 0.0
+
+
+def test_route_limits() -> None:
+    limits = rate_limit.DEFAULT_LIMITS
+    assert rate_limit.route_limits("POST", f"{API}/auth/token") == ("POST /auth/token", limits["POST /auth/token"])
+    assert rate_limit.route_limits("PUT", f"{API}/courses/abc") == ("write", limits["write"])
+    assert rate_limit.route_limits("GET", f"{API}/courses") is None
+    assert rate_limit.route_limits("GET", "/healthz") is None
+
+
+async def ok(scope: Scope, receive: Receive, send: Send) -> None:
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=RateLimitMiddleware(ok), client=("203.0.113.7", 4000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_middleware_answers_429_with_retry_after_per_ip(client: httpx.AsyncClient) -> None:
+    per_minute, burst = rate_limit.DEFAULT_LIMITS["POST /auth/token"][rate_limit.IP]
+    statuses = [(await client.post(f"{API}/auth/token")).status_code for _ in range(burst)]
+    limited = await client.post(f"{API}/auth/token")
+
+    assert statuses == [200] * burst
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == str(round(60 / per_minute))
+    # Routes without limits are not affected.
+    assert (await client.get(f"{API}/courses")).status_code == 200
+
+
+async def test_middleware_limits_writes_per_user(client: httpx.AsyncClient) -> None:
+    _, burst = rate_limit.DEFAULT_LIMITS["write"][rate_limit.USER]
+    alice = {"Authorization": f"Bearer {create_access_token('alice')}"}
+    bob = {"Authorization": f"Bearer {create_access_token('bob')}"}
+
+    for _ in range(burst):
+        assert (await client.put(f"{API}/courses/abc", headers=alice)).status_code == 200
+
+    assert (await client.put(f"{API}/courses/abc", headers=alice)).status_code == 429
+    assert (await client.put(f"{API}/courses/abc", headers=bob)).status_code == 200
+
+
+async def test_middleware_can_be_disabled(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_settings(), "rate_limit_enabled", False)
+
+    statuses = {(await client.post(f"{API}/auth/token")).status_code for _ in range(50)}
+
+    assert statuses == {200}
+
+
+class NoUsers:
+    """A session in which no account exists."""
+
+    async def execute(self, statement):
+        return self
+
+    def scalars(self):
+        return self
+
+    def first(self) -> None:
+        return None
+
+
+@pytest.fixture
+async def auth_client():
+    app = FastAPI()
+    app.include_router(auth.router, prefix=API)
+    app.dependency_overrides[get_session] = NoUsers
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_login_is_limited_per_email(auth_client: httpx.AsyncClient) -> None:
+    per_minute, burst = rate_limit.DEFAULT_LIMITS["POST /auth/token"][rate_limit.EMAIL]
+
+    async def login(email: str) -> httpx.Response:
+        return await auth_client.post(f"{API}/auth/token", data={"username": email, "password": "wrong"})
+
+    # Case and surrounding spaces do not make a new key.
+    statuses = [(await login(email)).status_code for email in ["Student@Example.com", " student@example.com"] * burst]
+    limited = await login("student@example.com")
+
+    assert statuses[:burst] == [401] * burst
+    assert set(statuses[burst:]) == {429}
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) == round(60 / per_minute)
+    assert (await login("other@example.com")).status_code == 401
@@ -0,0 +1,117 @@
+"""The seed dataset is a pure function of its arguments, whatever the chunking."""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+
+import pytest
+
+from app.models import CourseStatus, EnrollmentStatus, UserRole
+from benchmarks import seed
+
+
+ARGS = dict(
+    seed=1,
+    users=120,
+    instructors=None,
+    courses=30,
+    enrollments=400,
+    lessons="0-6",
+    zipf=1.1,
+    published=0.8,
+    content_bytes=100,
+    password="seed-password",
+)
+
+
+@pytest.fixture(autouse=True)
+def cheap_hash(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(seed, "get_password_hash", lambda password: f"hashed:{password}")
+
+
+def plan(**overrides) -> seed.SeedPlan:
+    return seed.make_plan(argparse.Namespace(**{**ARGS, **overrides}))
+
+
+def table(plan: seed.SeedPlan, name: str, chunks: int = 1) -> list[dict]:
+    factory, units = seed.GENERATORS[name]
+    total = units(plan)
+    bounds = [total * n // chunks for n in range(chunks + 1)]
+    return [row for start, stop in zip(bounds, bounds[1:]) for row in factory(plan, start, stop)]
+
+
+def dataset(plan: seed.SeedPlan, chunks: int = 1) -> dict[str, list[dict]]:
+    return {name: table(plan, name, chunks) for name in seed.GENERATORS}
+
+
+def test_same_seed_gives_the_same_rows_however_it_is_chunked() -> None:
+    expected = dataset(plan())
+
+    assert dataset(plan()) == expected
+    assert dataset(plan(), chunks=7) == expected
+
+
+def test_another_seed_gives_other_rows() -> None:
+    first, second = dataset(plan()), dataset(plan(seed=2))
+
+    assert {row["id"] for row in first["users"]}.isdisjoint(row["id"] for row in second["users"])
+    assert first["enrollments"] != second["enrollments"]
+
+
+def test_rows_reference_each_other() -> None:
+    the_plan = plan()
+    rows = dataset(the_plan)
+    users = {row["id"]: row["role"] for row in rows["users"]}
+    courses = {row["id"]: row for row in rows["courses"]}
+    lessons = {row["id"]: row["course_id"] for row in rows["lessons"]}
+    enrollments = {row["id"]: row for row in rows["enrollments"]}
+
+    assert len(users) == the_plan.users
+    assert Counter(users.values()) == {UserRole.INSTRUCTOR: 3, UserRole.STUDENT: 117}
+    assert all(users[course["instructor_id"]] == UserRole.INSTRUCTOR for course in courses.values())
+    assert set(lessons.values()) <= set(courses)
+    assert len(enrollments) == the_plan.enrollments
+    assert len({(row["student_id"], row["course_id"]) for row in enrollments.values()}) == len(enrollments)
+    for row in enrollments.values():
+        assert users[row["student_id"]] == UserRole.STUDENT
+        assert courses[row["course_id"]]["status"] == CourseStatus.PUBLISHED
+    for row in rows["lesson_progress"]:
+        enrollment = enrollments[row["enrollment_id"]]
+        assert lessons[row["lesson_id"]] == enrollment["course_id"]
+
+
+def test_progress_matches_completed_lessons() -> None:
+    rows = dataset(plan())
+    lesson_counts = Counter(row["course_id"] for row in rows["lessons"])
+    completed = Counter(row["enrollment_id"] for row in rows["lesson_progress"])
+
+    for row in rows["enrollments"]:
+        lessons, done = lesson_counts[row["course_id"]], completed[row["id"]]
+        assert row["progress_percent"] == (round(done / lessons * 100, 2) if lessons else 0.0)
+        finished = lessons > 0 and done == lessons
+        assert row["status"] == (EnrollmentStatus.COMPLETED if finished else EnrollmentStatus.ACTIVE)
+
+
+def test_course_popularity_is_skewed() -> None:
+    per_course = Counter(row["course_id"] for row in table(plan(zipf=1.5), "enrollments")).most_common()
+
+    assert per_course[0][1] > 5 * per_course[-1][1]
+
+
+def test_plan_rejects_impossible_arguments() -> None:
+    with pytest.raises(SystemExit, match="--lessons"):
+        plan(lessons="5-2000")
+    with pytest.raises(SystemExit, match="--users"):
+        plan(users=3)
+
+
+def test_tables_load_after_the_tables_they_reference() -> None:
+    loaded: set[str] = set()
+    for level in seed.load_levels():
+        for table_ in level:
+            parents = {key.column.table.name for key in table_.foreign_keys} - {table_.name}
+            assert parents <= loaded
+        loaded.update(table_.name for table_ in level)
+
+    assert set(seed.GENERATORS) <= loaded
@@ -0,0 +1,67 @@
+"""JSON rendering in ``app.core.serialization`` matches what pydantic would produce."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import MappingProxyType
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.serialization import FastJSONResponse, dumps, type_adapter
+
+
+class Item(BaseModel):
+    id: uuid.UUID
+    title: str
+    created_at: datetime
+
+
+class DriverUUID(uuid.UUID):
+    """Like asyncpg's UUID: a subclass orjson does not serialize by itself."""
+
+
+ITEM_ID = uuid.UUID("6b1f0c55-2f0d-4c8c-9d0e-3f3c1b7a9e21")
+CREATED = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def test_models_and_lists_of_models_use_their_pydantic_serializer() -> None:
+    item = Item(id=ITEM_ID, title="Intro", created_at=CREATED)
+
+    assert dumps(item) == item.model_dump_json().encode()
+    assert json.loads(dumps([item, item])) == [item.model_dump(mode="json")] * 2
+
+
+def test_row_mappings_render_like_the_validated_model() -> None:
+    row = MappingProxyType({"id": DriverUUID(str(ITEM_ID)), "title": "Intro", "created_at": CREATED})
+    model = Item(id=ITEM_ID, title="Intro", created_at=CREATED)
+
+    assert dumps(row) == model.model_dump_json().encode()
+    assert json.loads(dumps([{"item": row, "nested": [model]}])) == [
+        {"item": model.model_dump(mode="json"), "nested": [model.model_dump(mode="json")]}
+    ]
+
+
+def test_bytes_and_empty_lists_pass_through() -> None:
+    assert dumps(b'{"cached": true}') == b'{"cached": true}'
+    assert dumps([]) == b"[]"
+
+
+def test_unknown_types_are_rejected() -> None:
+    with pytest.raises(TypeError):
+        dumps({"amount": Decimal("1.5")})
+
+
+def test_type_adapters_are_built_once() -> None:
+    assert type_adapter(list[Item]) is type_adapter(list[Item])
+
+
+def test_fast_response_renders_without_validation() -> None:
+    response = FastJSONResponse([{"id": ITEM_ID}], headers={"ETag": '"v1"'})
+
+    assert response.body == f'[{{"id":"{ITEM_ID}"}}]'.encode()
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == '"v1"'
@@ -0,0 +1,78 @@
+"""How ``Master`` replaces workers that exit, without forking any."""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+import pytest
+
+from app import server
+from app.server import MAX_RESPAWN_DELAY, STARTUP_FAILED, Master
+
+
+class FakeMaster(Master):
+    """Spawns numbered fake workers; ``exits`` scripts the exit code of each one in turn."""
+
+    def __init__(self, exits: list[int]) -> None:
+        super().__init__(None, None, argparse.Namespace(workers=1))
+        self.exits = exits
+        self.spawned = 0
+
+    def spawn(self) -> None:
+        self.spawned += 1
+        self.workers[self.spawned] = 0.0
+
+    def wait(self) -> tuple[int, int]:
+        if not self.exits:
+            raise ChildProcessError
+        return next(iter(self.workers)), self.exits.pop(0) << 8
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    slept: list[float] = []
+    monkeypatch.setattr(server.signal, "signal", lambda *args: None)
+    monkeypatch.setattr(server.time, "sleep", slept.append)
+    return slept
+
+
+def run(master: FakeMaster, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(os, "wait", master.wait)
+    master.run()
+
+
+def test_recycled_workers_are_replaced_at_once(sleeps: list[float], monkeypatch: pytest.MonkeyPatch) -> None:
+    master = FakeMaster([0, 0, 0])
+
+    run(master, monkeypatch)
+
+    assert master.spawned == 4
+    assert sleeps == []
+
+
+def test_startup_failures_back_off_until_a_worker_starts(
+    sleeps: list[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    master = FakeMaster([STARTUP_FAILED] * 7 + [0, STARTUP_FAILED, 1, STARTUP_FAILED, 0])
+
+    run(master, monkeypatch)
+
+    assert sleeps == [1, 2, 4, 8, 16, MAX_RESPAWN_DELAY, MAX_RESPAWN_DELAY, 1, 1]
+    assert master.spawned == 13
+
+
+def test_no_worker_is_spawned_after_a_stop_during_backoff(
+    sleeps: list[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    master = FakeMaster([STARTUP_FAILED])
+
+    def stop_while_sleeping(delay: float) -> None:
+        sleeps.append(delay)
+        master.stopping = True
+
+    monkeypatch.setattr(server.time, "sleep", stop_while_sleeping)
+    run(master, monkeypatch)
+
+    assert sleeps == [1]
+    assert master.spawned == 1
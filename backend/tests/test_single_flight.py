@@ -0,0 +1,106 @@
+"""Coalescing and cancellation of ``SingleFlight`` computations."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Computation:
+    """A compute callable that blocks until released and counts its runs."""
+
+    def __init__(self, result: object = "result") -> None:
+        self.result = result
+        self.started = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> object:
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.result
+
+
+async def test_concurrent_callers_share_one_computation() -> None:
+    flights: SingleFlight[object] = SingleFlight("test")
+    compute = Computation()
+
+    callers = [asyncio.create_task(flights.do("key", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await asyncio.gather(*callers) == ["result"] * 5
+    assert compute.started == 1
+    assert len(flights) == 0
+
+
+async def test_cancelled_waiter_does_not_cancel_the_others() -> None:
+    flights: SingleFlight[object] = SingleFlight("test")
+    compute = Computation()
+
+    leaving = asyncio.create_task(flights.do("key", compute))
+    staying = asyncio.create_task(flights.do("key", compute))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await staying == "result"
+    assert leaving.cancelled()
+    assert compute.started == 1
+    assert compute.cancelled == 0
+
+
+async def test_last_waiter_leaving_cancels_the_computation() -> None:
+    flights: SingleFlight[object] = SingleFlight("test")
+    abandoned = Computation()
+
+    callers = [asyncio.create_task(flights.do("key", abandoned)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert abandoned.cancelled == 1
+    assert len(flights) == 0
+
+    # The next caller starts over instead of joining the cancelled computation.
+    fresh = Computation("fresh")
+    fresh.release.set()
+    assert await flights.do("key", fresh) == "fresh"
+    assert fresh.started == 1
+
+
+async def test_timeout_fails_every_waiter_and_forgets_the_key() -> None:
+    flights: SingleFlight[object] = SingleFlight("test", timeout=0.01)
+    compute = Computation()
+
+    results = await asyncio.gather(*(flights.do("key", compute) for _ in range(3)), return_exceptions=True)
+
+    assert [type(result) for result in results] == [TimeoutError] * 3
+    assert compute.cancelled == 1
+    assert len(flights) == 0
+
+
+async def test_errors_reach_every_waiter() -> None:
+    flights: SingleFlight[object] = SingleFlight("test")
+
+    async def fail() -> object:
+        await asyncio.sleep(0)
+        raise LookupError("missing")
+
+    results = await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert [type(result) for result in results] == [LookupError] * 3
+    assert len(flights) == 0
@@ -0,0 +1,132 @@
+"""Warm-up before taking traffic: readiness, retries and what gets built."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import lifespan
+from app.core.config import get_settings
+from app.core.serialization import type_adapter
+from app.db.session import engine
+from app.main import app
+from app.schemas import CourseRead
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeWarmUp:
+    """Stands in for the database steps; fails ``failures`` times, then waits for ``gate``."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.attempts = 0
+        self.gate = asyncio.Event()
+
+    async def preconnect(self, count: int) -> int:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionRefusedError("database is not up yet")
+        await self.gate.wait()
+        return count
+
+    async def run_hot_queries(self) -> None:
+        pass
+
+
+@pytest.fixture
+def warm(monkeypatch: pytest.MonkeyPatch) -> FakeWarmUp:
+    fake = FakeWarmUp()
+    monkeypatch.setattr(lifespan, "preconnect", fake.preconnect)
+    monkeypatch.setattr(lifespan, "run_hot_queries", fake.run_hot_queries)
+    monkeypatch.setattr(lifespan, "build_serializers", lambda app: None)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "warmup_retry_seconds", 0)
+    for name in ("invalidation_enabled", "course_purge_interval_seconds"):
+        monkeypatch.setattr(settings, name, False)
+    return fake
+
+
+async def wait_until(condition) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0)
+
+
+async def test_ready_only_after_the_warm_up(monkeypatch: pytest.MonkeyPatch, warm: FakeWarmUp) -> None:
+    monkeypatch.setattr(get_settings(), "warmup_enabled", True)
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/healthz")).status_code == 200
+            assert (await client.get("/readyz")).status_code == 503
+
+            warm.gate.set()
+            await wait_until(lambda: app.state.ready)
+
+            assert (await client.get("/readyz")).json()["status"] == "ready"
+
+    assert app.state.ready is False
+
+
+async def test_ready_at_once_when_disabled(monkeypatch: pytest.MonkeyPatch, warm: FakeWarmUp) -> None:
+    monkeypatch.setattr(get_settings(), "warmup_enabled", False)
+
+    async with app.router.lifespan_context(app):
+        assert app.state.ready is True
+
+    assert warm.attempts == 0
+
+
+async def test_failed_warm_up_is_retried(warm: FakeWarmUp) -> None:
+    target = FastAPI()
+    target.state.ready = False
+    warm.failures = 2
+    warm.gate.set()
+
+    await lifespan.warm_up(target)
+
+    assert warm.attempts == 3
+    assert target.state.ready is True
+
+
+async def test_shutdown_stops_a_pending_warm_up(monkeypatch: pytest.MonkeyPatch, warm: FakeWarmUp) -> None:
+    monkeypatch.setattr(get_settings(), "warmup_enabled", True)
+    warm.failures = 10**9
+
+    async with app.router.lifespan_context(app):
+        await wait_until(lambda: warm.attempts > 3)
+
+    attempts = warm.attempts
+    await asyncio.sleep(0.01)
+    assert warm.attempts == attempts
+    assert app.state.ready is False
+
+
+def test_build_serializers_covers_every_response_model() -> None:
+    type_adapter.cache_clear()
+    app.openapi_schema = None
+
+    lifespan.build_serializers(app)
+
+    assert type_adapter.cache_info().currsize > 10
+    assert app.openapi_schema is not None
+    hits = type_adapter.cache_info().hits
+    type_adapter(list[CourseRead])
+    assert type_adapter.cache_info().hits == hits + 1
+
+
+@pytest.mark.database
+async def test_preconnect_opens_at_most_the_pool_size() -> None:
+    await engine.dispose()
+    pool = engine.sync_engine.pool
+    try:
+        assert await lifespan.preconnect(0) == 0
+        assert await lifespan.preconnect(pool.size() + 5) == pool.size()
+        assert pool.checkedin() == pool.size()
+    finally:
+        await engine.dispose()
@@ -1,19 +1,24 @@
-import type { Lesson, LessonProgress } from "../types";
+import type { LessonOutline, LessonProgress } from "../types";
 import { Icon } from "./Icon";
 
-interface LessonListProps {
-  lessons: Lesson[];
+interface LessonListProps<T extends LessonOutline> {
+  lessons: T[];
   activeLessonId?: string;
-  onSelect: (lesson: Lesson) => void;
+  onSelect: (lesson: T) => void;
   progressMap?: Map<string, LessonProgress>;
 }
 
-export default function LessonList({ lessons, activeLessonId, onSelect, progressMap }: LessonListProps) {
+export default function LessonList<T extends LessonOutline>({
+  lessons,
+  activeLessonId,
+  onSelect,
+  progressMap,
+}: LessonListProps<T>) {
   // Sort lessons by position
   const sortedLessons = [...lessons].sort((a, b) => a.position - b.position);
   
   // Check if a lesson can be completed (all previous lessons must be completed)
-  const canComplete = (lesson: Lesson): boolean => {
+  const canComplete = (lesson: T): boolean => {
     if (!progressMap) return true;
     const currentIndex = sortedLessons.findIndex(l => l.id === lesson.id);
     for (let i = 0; i < currentIndex; i++) {
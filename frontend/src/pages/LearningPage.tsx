@@ -2,7 +2,7 @@ import { useEffect, useMemo, useState } from "react";
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import { useParams } from "react-router-dom";
 import api from "../lib/api";
-import type { Course, Enrollment, Lesson, LessonProgress } from "../types";
+import type { CourseOutline, Enrollment, Lesson, LessonOutline, LessonProgress } from "../types";
 import LessonList from "../components/LessonList";
 import ProgressBar from "../components/ProgressBar";
 import { Icon } from "../components/Icon";
@@ -84,8 +84,14 @@ const CertificateBlock = ({
   );
 };
 
+// The outline leaves out lesson bodies; each lesson is fetched when opened.
 async function fetchCourse(courseId: string) {
-  const { data } = await api.get<Course>(`/courses/${courseId}`);
+  const { data } = await api.get<CourseOutline>(`/courses/${courseId}`, { params: { view: "outline" } });
+  return data;
+}
+
+async function fetchLesson(lessonId: string) {
+  const { data } = await api.get<Lesson>(`/lessons/${lessonId}`);
   return data;
 }
 
@@ -125,7 +131,15 @@ export default function LearningPage() {
     enabled: Boolean(enrollment?.id),
   });
 
-  const [activeLesson, setActiveLesson] = useState<Lesson | null>(null);
+  const [activeLesson, setActiveLesson] = useState<LessonOutline | null>(null);
+
+  const lessonQuery = useQuery({
+    queryKey: ["lesson", activeLesson?.id],
+    queryFn: () => fetchLesson(activeLesson!.id),
+    enabled: Boolean(activeLesson?.id),
+    staleTime: 5 * 60 * 1000,
+  });
+  const lessonBody = lessonQuery.data?.id === activeLesson?.id ? lessonQuery.data : undefined;
 
   useEffect(() => {
     if (course?.lessons?.length) {
@@ -304,10 +318,10 @@ export default function LearningPage() {
               </div>
             )}
 
-            {activeLesson.video_url && (
+            {lessonBody?.video_url && (
               <div className="aspect-video w-full overflow-hidden rounded-xl bg-base-300 shadow-lg">
                 <iframe
-                  src={activeLesson.video_url}
+                  src={lessonBody.video_url}
                   title={activeLesson.title}
                   className="h-full w-full"
                   allowFullScreen
@@ -316,7 +330,13 @@ export default function LearningPage() {
             )}
 
             <div className="prose max-w-none text-base-content">
-              <p>{activeLesson.content}</p>
+              {lessonBody ? (
+                <p>{lessonBody.content}</p>
+              ) : lessonQuery.isError ? (
+                <p className="text-sm text-error">Failed to load this lesson. Please try again.</p>
+              ) : (
+                <div className="h-6 w-6 animate-spin rounded-full border-2 border-primary border-t-transparent" />
+              )}
             </div>
 
             <div className="flex justify-between">
@@ -13,16 +13,19 @@ export interface User {
 export type CourseLevel = "beginner" | "intermediate" | "advanced";
 export type CourseStatus = "draft" | "published";
 
-export interface Lesson {
+export interface LessonOutline {
   id: string;
   course_id: string;
   title: string;
-  content: string;
-  video_url?: string | null;
   thumbnail_url?: string | null;
   position: number;
 }
 
+export interface Lesson extends LessonOutline {
+  content: string;
+  video_url?: string | null;
+}
+
 export interface Course {
   id: string;
   title: string;
@@ -36,6 +39,10 @@ export interface Course {
   enrollment_count?: number;
 }
 
+export interface CourseOutline extends Omit<Course, "lessons"> {
+  lessons?: LessonOutline[];
+}
+
 export type EnrollmentStatus = "active" | "completed" | "cancelled";
 
 export interface Enrollment {